@@ -1,5 +1,6 @@
 import os
-from flask import Flask, jsonify
+import click
+from flask import Flask, current_app, jsonify
 from flask_sqlalchemy import SQLAlchemy
 from flask_security import Security, SQLAlchemyUserDatastore
 from flask_cors import CORS
@@ -8,9 +9,19 @@ from datetime import datetime, timezone
 import uuid
 import mysql.connector
 from mysql.connector import Error
+from sqlalchemy.engine import make_url
 
 from app.config import Config
 from app.models import db, User, Role
+from app.documents import init_document_store
+from app.auth_tokens import init_token_auth, init_token_cache
+from app.passwords import init_password_hashing
+from app.throttling import init_throttling
+from app.offer_letters import init_offer_letter_cache
+from app.counters import init_counters, seed_counters
+from app.response_cache import init_response_cache
+from app.search import init_search_index
+from app.serializers import init_json_backend
 
 # Initialize user datastore
 user_datastore = SQLAlchemyUserDatastore(db, User, Role)
@@ -24,7 +35,7 @@ def create_database_if_not_exists():
         db_password = Config.DB_PASSWORD
         db_name = Config.DB_NAME
         
-        print(f"Checking database connection to {db_host}...")
+        current_app.logger.info("Checking database connection to %s...", db_host)
         
         # Connect to MySQL server (without specifying database)
         connection = mysql.connector.connect(
@@ -43,9 +54,9 @@ def create_database_if_not_exists():
             if db_name not in databases:
                 # Create database if it doesn't exist
                 cursor.execute(f"CREATE DATABASE {db_name}")
-                print(f"Database '{db_name}' created successfully!")
+                current_app.logger.info("Database '%s' created successfully!", db_name)
             else:
-                print(f"Database '{db_name}' already exists")
+                current_app.logger.info("Database '%s' already exists", db_name)
             
             cursor.close()
             connection.close()
@@ -53,16 +64,14 @@ def create_database_if_not_exists():
         return True
         
     except Error as e:
-        print(f"Database setup failed: {e}")
+        current_app.logger.error("Database setup failed: %s", e)
         return False
     except Exception as e:
-        print(f"Database error: {e}")
+        current_app.logger.error("Database error: %s", e)
         return False
 
 def create_default_admin(user_datastore):
     """Create default admin user if it doesn't exist"""
-    from flask import current_app
-    
     admin_email = current_app.config['ADMIN_EMAIL']
     admin = User.query.filter_by(email=admin_email).first()
     if not admin:
@@ -91,17 +100,37 @@ def create_default_admin(user_datastore):
         
         user_datastore.add_role_to_user(admin_user, admin_role)
         db.session.commit()
-        print("Admin user created")
+        current_app.logger.info("Admin user created")
     # Admin already exists - no message needed
 
+def init_database(app):
+    """Create the database, its tables and the default admin, and fill
+    empty dashboard counters.
+
+    Run once before serving (``flask --app app init-db``; run.py and
+    gunicorn.conf.py do it on start) rather than in every process that
+    creates the app, so workers never race to create the admin. The
+    connections it used are closed, so a server can fork afterwards.
+    """
+    with app.app_context():
+        # Step 1: Create the MySQL database if it doesn't exist
+        if make_url(app.config['SQLALCHEMY_DATABASE_URI']).get_backend_name() == 'mysql':
+            if not create_database_if_not_exists():
+                app.logger.warning("Database setup failed")
+
+        # Step 2: Create tables, counters and the default admin
+        db.create_all()
+        seed_counters()
+        create_default_admin(user_datastore)
+        db.session.remove()
+        db.engine.dispose()
+
 def create_app():
     """Application factory"""
     app = Flask(__name__)
     app.config.from_object(Config)
     app.url_map.strict_slashes = False
 
-    print("Starting UniAdmit System...")
-    
     # Add request size limit error handler
     @app.errorhandler(413)
     def request_entity_too_large(error):
@@ -110,13 +139,19 @@ def create_app():
             'message': 'The uploaded file exceeds the maximum size limit of 16MB'
         }), 413
 
-    # Step 1: Create database if it doesn't exist
-    if not create_database_if_not_exists():
-        print("Warning: Database setup failed")
-
-    # Step 2: Initialize extensions
+    # Step 1: Initialize extensions
     db.init_app(app)
     security = Security(app, user_datastore)
+    init_token_auth(security)
+    init_token_cache(app)
+    init_password_hashing(app)
+    init_throttling(app)
+    init_document_store(app)
+    init_offer_letter_cache(app)
+    init_counters()
+    init_response_cache(app)
+    init_search_index(app)
+    init_json_backend(app)
     
     # Configure CORS
     CORS(
@@ -127,15 +162,7 @@ def create_app():
         methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"]
     )
 
-    # Step 3: Create tables and default admin
-    with app.app_context():
-        try:
-            db.create_all()
-            create_default_admin(user_datastore)
-        except Exception as e:
-            print(f"Database setup failed: {e}")
-
-    # Step 4: Register Blueprints
+    # Step 2: Register Blueprints
     from app.routes.auth import auth_bp
     from app.routes.application import application_bp
     app.register_blueprint(auth_bp, url_prefix='/api/auth')
@@ -159,6 +186,10 @@ def create_app():
             }
         }, 200
 
-    print("UniAdmit API ready at http://localhost:5000")
+    @app.cli.command('init-db')
+    def init_db_command():
+        """Create the database tables and the default admin"""
+        init_database(app)
+        click.echo("Database ready")
     
     return app
@@ -0,0 +1,211 @@
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from datetime import datetime, timezone
+from itertools import chain
+from flask import current_app, g
+from flask_security.utils import get_request_attr, set_request_attr
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import make_transient_to_detached
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.models import db, Role, User
+
+CachedToken = namedtuple('CachedToken', 'expires_at user_id columns roles')
+
+
+class TokenCache:
+    """In-process LRU cache of verified authentication tokens with a TTL.
+
+    Each entry keeps the column values of the token's user and of its roles,
+    so an authenticated request needs no query to know who is calling and
+    what they may do. Entries expire after the TTL (or with the token, if
+    sooner) and are dropped as soon as the user changes in this process;
+    other processes see a change once their entries expire.
+    """
+
+    def __init__(self, ttl, max_entries):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._tokens_by_user = {}
+        self._lock = threading.Lock()
+
+    def get(self, token):
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                return None
+            if entry.expires_at <= time.monotonic():
+                self._remove(token)
+                return None
+            self._entries.move_to_end(token)
+            return entry
+
+    def put(self, token, user, lifetime):
+        if self.ttl <= 0 or self.max_entries <= 0:
+            return
+        entry = CachedToken(
+            time.monotonic() + min(self.ttl, lifetime),
+            user.id,
+            {attribute.key: getattr(user, attribute.key) for attribute in inspect(User).column_attrs},
+            [{attribute.key: getattr(role, attribute.key) for attribute in inspect(Role).column_attrs}
+             for role in user.roles]
+        )
+        with self._lock:
+            self._remove(token)
+            self._entries[token] = entry
+            self._tokens_by_user.setdefault(user.id, set()).add(token)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+
+    def discard(self, token):
+        with self._lock:
+            self._remove(token)
+
+    def invalidate_user(self, user_id):
+        """Drop every cached token of a user"""
+        with self._lock:
+            for token in self._tokens_by_user.pop(user_id, ()):
+                self._entries.pop(token, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._tokens_by_user.clear()
+
+    def _remove(self, token):
+        entry = self._entries.pop(token, None)
+        if entry is not None:
+            tokens = self._tokens_by_user.get(entry.user_id)
+            if tokens is not None:
+                tokens.discard(token)
+                if not tokens:
+                    del self._tokens_by_user[entry.user_id]
+
+
+def cached_user(entry):
+    """The entry's user as a persistent object of the current session,
+    built from the cached values without querying the database"""
+    user = User(**entry.columns)
+    make_transient_to_detached(user)
+    roles = []
+    for columns in entry.roles:
+        role = Role(**columns)
+        make_transient_to_detached(role)
+        roles.append(role)
+    set_committed_value(user, 'roles', roles)
+    return db.session.merge(user, load=False)
+
+
+def get_token_cache():
+    return current_app.extensions.get('token_cache')
+
+
+def load_user_from_token(security, token):
+    """Return the active user an authentication token belongs to, or None"""
+    cache = get_token_cache()
+    if cache is not None:
+        entry = cache.get(token)
+        if entry is not None:
+            return cached_user(entry)
+
+    try:
+        data, signed_at = security.remember_token_serializer.loads(
+            token, max_age=security.token_max_age, return_timestamp=True
+        )
+        # Tokens from Flask-Security 3.x carry the uniquifier as the last of three elements
+        uniquifier = data[0] if len(data) == 1 else data[2]
+        user = security.datastore.find_user(fs_uniquifier=uniquifier)
+    except Exception:
+        return None
+
+    if user and user.active and user.verify_auth_token(data):
+        if cache is not None:
+            lifetime = float('inf')
+            if security.token_max_age:
+                lifetime = security.token_max_age - (datetime.now(timezone.utc) - signed_at).total_seconds()
+            cache.put(token, user, lifetime)
+        return user
+    return None
+
+
+def request_token(security, request):
+    """The token sent in the Authentication-Token header or query string"""
+    return (request.args.get(security.token_authentication_key)
+            or request.headers.get(security.token_authentication_header))
+
+
+def forget_request_token(request):
+    """Drop the request's token from the cache, e.g. on logout"""
+    cache = get_token_cache()
+    token = request_token(current_app.extensions['security'], request)
+    if cache is not None and token:
+        cache.discard(token)
+
+
+def invalidate_changed_users(session, flush_context):
+    """Drop the cached tokens of users changed or deleted by a flush.
+
+    They are dropped again after the commit, in case another request cached
+    the old row in between.
+    """
+    cache = get_token_cache()
+    if cache is None:
+        return
+    changed = session.info.setdefault('token_cache_users', set())
+    for obj in chain(session.dirty, session.deleted):
+        if isinstance(obj, User):
+            changed.add(obj.id)
+            cache.invalidate_user(obj.id)
+
+
+def invalidate_committed_users(session):
+    cache = get_token_cache()
+    for user_id in session.info.pop('token_cache_users', ()):
+        if cache is not None:
+            cache.invalidate_user(user_id)
+
+
+def discard_changed_users(session):
+    session.info.pop('token_cache_users', None)
+
+
+def init_token_cache(app):
+    cache = TokenCache(app.config['TOKEN_CACHE_TTL'], app.config['TOKEN_CACHE_MAX_ENTRIES'])
+    app.extensions['token_cache'] = cache
+    if not event.contains(db.session, 'after_flush', invalidate_changed_users):
+        event.listen(db.session, 'after_flush', invalidate_changed_users)
+        event.listen(db.session, 'after_commit', invalidate_committed_users)
+        event.listen(db.session, 'after_rollback', discard_changed_users)
+    return cache
+
+
+def init_token_auth(security):
+    """Install a token request loader that does not parse the request body.
+
+    Flask-Security looks for the token inside JSON bodies too, which forces
+    every JSON request to be parsed in full before the view runs and defeats
+    streaming ingestion of large submissions. Tokens sent in the
+    Authentication-Token header or query string are verified here directly;
+    requests without one fall back to the stock loader.
+    """
+    fallback_loader = security.login_manager.request_callback
+
+    def request_loader(request):
+        # Already verified for this request
+        if get_request_attr('fs_authn_via') == 'token':
+            return g._login_user
+
+        token = request_token(security, request)
+        if not token:
+            return fallback_loader(request)
+
+        user = load_user_from_token(security, token)
+        if user is None:
+            return security.login_manager.anonymous_user()
+
+        set_request_attr('fs_authn_via', 'token')
+        return user
+
+    security.login_manager.request_loader(request_loader)
@@ -0,0 +1,135 @@
+from collections import Counter
+from datetime import datetime, timezone
+from sqlalchemy import select
+
+from app.models import db, Application, User
+from app.counters import application_key, apply_counter_deltas
+from app.response_cache import mark_dashboards_changed
+from app.search import get_search_index
+
+# Status a pending application moves to for each review action
+BULK_ACTION_STATUSES = {'approve': 'approved', 'reject': 'rejected'}
+
+
+def chunks(ids, size):
+    for start in range(0, len(ids), size):
+        yield ids[start:start + size]
+
+
+def _lock_chunk(ids):
+    """The chunk's applications that exist, locked until the chunk commits.
+
+    Only the columns the results and counters need are read, never the
+    documents or the rest of the row.
+    """
+    return db.session.execute(
+        select(
+            Application.id, Application.status, Application.course_applied,
+            Application.date_created, User.name.label('student_name')
+        )
+        .join(User, User.id == Application.student_id)
+        .where(Application.id.in_(ids))
+        .order_by(Application.id)
+        .with_for_update(of=Application)
+    ).all()
+
+
+def _finish_chunk(application_deltas, deleted_ids=()):
+    """Do what the session hooks would have done for the chunk's statements
+    and commit it"""
+    connection = db.session.connection()
+    apply_counter_deltas(connection, application_deltas, Counter())
+    mark_dashboards_changed(db.session)
+    if deleted_ids:
+        get_search_index().remove(connection, Application, deleted_ids)
+    db.session.commit()
+
+
+def review_applications(ids, action, reviewer_id, comments, chunk_size):
+    """Approve or reject the pending applications among ``ids``.
+
+    Each chunk is one ``UPDATE ... WHERE id IN (...) AND status = 'pending'``
+    committed on its own, so locks are held for one chunk at a time. Returns
+    the updated applications and the ids that could not be updated, with
+    the reason; ids that do not exist are left out of both.
+    """
+    status = BULK_ACTION_STATUSES[action]
+    table = Application.__table__
+    updated, failed = [], []
+
+    for chunk in chunks(ids, chunk_size):
+        try:
+            rows = _lock_chunk(chunk)
+            pending = [row for row in rows if row.status == 'pending']
+            if not pending:
+                db.session.rollback()
+            else:
+                db.session.execute(
+                    table.update()
+                    .where(table.c.id.in_([row.id for row in pending]), table.c.status == 'pending')
+                    .values(
+                        status=status,
+                        reviewed_by=reviewer_id,
+                        review_comments=comments,
+                        reviewed_at=datetime.now(timezone.utc),
+                        admission_letter_path=None
+                    )
+                )
+                deltas = Counter()
+                for row in pending:
+                    deltas[application_key(row.status, row.course_applied, row.date_created)] -= 1
+                    deltas[application_key(status, row.course_applied, row.date_created)] += 1
+                _finish_chunk(deltas)
+        except Exception as e:
+            db.session.rollback()
+            failed.extend({'id': application_id, 'reason': str(e)} for application_id in chunk)
+            continue
+
+        failed.extend({
+            'id': row.id,
+            'reason': f'Cannot {action} application with status: {row.status}'
+        } for row in rows if row.status != 'pending')
+        updated.extend({
+            'id': row.id,
+            'student_name': row.student_name,
+            'course': row.course_applied,
+            'new_status': status
+        } for row in pending)
+
+    return updated, failed
+
+
+def delete_applications(ids, chunk_size):
+    """Delete the applications among ``ids``, one ``DELETE`` per chunk.
+
+    Returns the deleted applications and the ids whose chunk failed.
+    """
+    table = Application.__table__
+    deleted, failed = [], []
+
+    for chunk in chunks(ids, chunk_size):
+        try:
+            rows = _lock_chunk(chunk)
+            if not rows:
+                db.session.rollback()
+                continue
+
+            deleted_ids = [row.id for row in rows]
+            db.session.execute(table.delete().where(table.c.id.in_(deleted_ids)))
+            deltas = Counter()
+            for row in rows:
+                deltas[application_key(row.status, row.course_applied, row.date_created)] -= 1
+            _finish_chunk(deltas, deleted_ids)
+        except Exception as e:
+            db.session.rollback()
+            failed.extend({'id': application_id, 'reason': str(e)} for application_id in chunk)
+            continue
+
+        deleted.extend({
+            'id': row.id,
+            'student_name': row.student_name,
+            'course': row.course_applied,
+            'action': 'deleted'
+        } for row in rows)
+
+    return deleted, failed
@@ -1,6 +1,7 @@
 import os
 from datetime import timedelta
 from dotenv import load_dotenv
+from sqlalchemy.engine import make_url
 
 # Load environment variables from .env file
 load_dotenv()
@@ -15,6 +16,33 @@ class Config:
     SQLALCHEMY_DATABASE_URI = os.environ.get('DATABASE_URL') or f'mysql+pymysql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}/{DB_NAME}'
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     
+    # Connections each server process keeps open, and how many more it may
+    # open under load; DB_MAX_CONNECTIONS is what all processes together may
+    # use (keep it below MySQL's max_connections)
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE') or 5)
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW') or 10)
+    DB_MAX_CONNECTIONS = int(os.environ.get('DB_MAX_CONNECTIONS') or 100)
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        'pool_recycle': 3600,  # before MySQL drops idle connections (wait_timeout)
+    }
+    # SQLite pools (a single connection for sqlite:// in memory) take no sizes
+    if make_url(SQLALCHEMY_DATABASE_URI).get_backend_name() != 'sqlite':
+        SQLALCHEMY_ENGINE_OPTIONS.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+    
+    # Production server (gunicorn.conf.py): worker processes and threads per
+    # worker (0 = sized from the CPU cores and the connection pool), seconds
+    # a request may take, and requests after which a worker is replaced
+    WEB_BIND = os.environ.get('WEB_BIND', '0.0.0.0:5000')
+    WEB_WORKERS = int(os.environ.get('WEB_WORKERS') or 0)
+    WEB_THREADS = int(os.environ.get('WEB_THREADS') or 0)
+    WEB_TIMEOUT = int(os.environ.get('WEB_TIMEOUT') or 60)
+    WEB_MAX_REQUESTS = int(os.environ.get('WEB_MAX_REQUESTS') or 5000)
+    # Create the app once in the master process before forking the workers
+    WEB_PRELOAD = os.environ.get('WEB_PRELOAD', 'true').lower() in ['true', 'on', '1']
+    # Reverse proxies in front of the server whose X-Forwarded-For to trust,
+    # so throttling sees client addresses
+    WEB_PROXY_COUNT = int(os.environ.get('WEB_PROXY_COUNT') or 0)
+    
     # Flask-Security configuration
     SECRET_KEY = os.environ.get('SECRET_KEY') or 'your-secret-key-here-change-in-production'
     SECURITY_PASSWORD_SALT = os.environ.get('SECURITY_PASSWORD_SALT') or 'your-password-salt-here'
@@ -22,6 +50,25 @@ class Config:
     # Use Argon2 for password hashing
     SECURITY_PASSWORD_HASH = 'argon2'
     
+    # Argon2 cost parameters (memory in KiB); pick them for the server with
+    # calibrate_password_hash.py. Hashes made with other parameters are
+    # upgraded when their users next log in, so unless set they stay what
+    # existing hashes use: Flask-Security's time cost and passlib's defaults
+    SECURITY_PASSWORD_HASH_PASSLIB_OPTIONS = {
+        'argon2__rounds': int(os.environ.get('ARGON2_TIME_COST') or 10),
+    }
+    if os.environ.get('ARGON2_MEMORY_COST'):
+        SECURITY_PASSWORD_HASH_PASSLIB_OPTIONS['argon2__memory_cost'] = int(os.environ['ARGON2_MEMORY_COST'])
+    if os.environ.get('ARGON2_PARALLELISM'):
+        SECURITY_PASSWORD_HASH_PASSLIB_OPTIONS['argon2__parallelism'] = int(os.environ['ARGON2_PARALLELISM'])
+    
+    # Password hashing pool: hashes run at once per process (0 = half the CPU
+    # cores), requests that may wait for one, and seconds a request waits
+    # for a place before getting a 503
+    PASSWORD_HASH_WORKERS = int(os.environ.get('PASSWORD_HASH_WORKERS') or 0)
+    PASSWORD_HASH_QUEUE = int(os.environ.get('PASSWORD_HASH_QUEUE') or 32)
+    PASSWORD_HASH_TIMEOUT = float(os.environ.get('PASSWORD_HASH_TIMEOUT') or 5)
+    
     # Token-based authentication
     SECURITY_TRACKABLE = True
     SECURITY_TOKEN_AUTHENTICATION_KEY = 'Authentication-Token'
@@ -33,6 +80,68 @@ class Config:
     UPLOAD_FOLDER = 'uploads'
     ALLOWED_EXTENSIONS = {'pdf', 'jpg', 'jpeg', 'png', 'doc', 'docx'}
     
+    # Application document storage (content-addressed, keyed by SHA-256)
+    DOCUMENT_STORE_BACKEND = os.environ.get('DOCUMENT_STORE_BACKEND', 'local')
+    DOCUMENT_STORE_PATH = os.environ.get('DOCUMENT_STORE_PATH', os.path.join(UPLOAD_FOLDER, 'documents'))
+    
+    # Seconds a browser may reuse a document without revalidating (0 = always revalidate via ETag)
+    DOCUMENT_CACHE_MAX_AGE = int(os.environ.get('DOCUMENT_CACHE_MAX_AGE') or 0)
+    
+    # Rendered offer letter cache
+    OFFER_LETTER_CACHE_PATH = os.environ.get('OFFER_LETTER_CACHE_PATH', os.path.join(UPLOAD_FOLDER, 'offer_letters'))
+    OFFER_LETTER_CACHE_MAX_BYTES = int(os.environ.get('OFFER_LETTER_CACHE_MAX_BYTES') or 256 * 1024 * 1024)  # 256MB
+    # How often each process relists the cache directory to account for
+    # letters other processes have written or evicted
+    OFFER_LETTER_CACHE_RESCAN_SECONDS = int(os.environ.get('OFFER_LETTER_CACHE_RESCAN_SECONDS') or 300)
+    OFFER_LETTER_WORKERS = int(os.environ.get('OFFER_LETTER_WORKERS') or 0)  # 0 = one per CPU core
+    
+    # Login and registration throttling: attempts allowed per client IP and
+    # per email address in a sliding window of THROTTLE_WINDOW seconds
+    # (0 = no limit); the login email limit counts failed logins only.
+    # 'memory' counts in each process; 'database' shares the
+    # counts between processes and servers
+    THROTTLE_BACKEND = os.environ.get('THROTTLE_BACKEND', 'memory')
+    THROTTLE_WINDOW = int(os.environ.get('THROTTLE_WINDOW') or 60)
+    LOGIN_LIMIT_PER_IP = int(os.environ.get('LOGIN_LIMIT_PER_IP') or 30)
+    LOGIN_LIMIT_PER_EMAIL = int(os.environ.get('LOGIN_LIMIT_PER_EMAIL') or 5)
+    REGISTER_LIMIT_PER_IP = int(os.environ.get('REGISTER_LIMIT_PER_IP') or 10)
+    REGISTER_LIMIT_PER_EMAIL = int(os.environ.get('REGISTER_LIMIT_PER_EMAIL') or 3)
+    
+    # Verified authentication token cache (TTL in seconds, 0 disables it);
+    # a change to a user drops their entries at once in this process
+    TOKEN_CACHE_TTL = int(os.environ.get('TOKEN_CACHE_TTL') or 60)
+    TOKEN_CACHE_MAX_ENTRIES = int(os.environ.get('TOKEN_CACHE_MAX_ENTRIES') or 10000)
+    
+    # Admin statistics response cache (TTL in seconds, 0 disables it)
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL') or 30)
+    RESPONSE_CACHE_MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES') or 4 * 1024 * 1024)  # 4MB
+    
+    # Admin search index: 'fulltext' (MySQL), 'trigram' (any database) or
+    # 'auto' to pick by database. Matches must share at least this fraction
+    # of the search term's trigrams (or of the best FULLTEXT score).
+    SEARCH_INDEX_BACKEND = os.environ.get('SEARCH_INDEX_BACKEND', 'auto')
+    SEARCH_MIN_SIMILARITY = float(os.environ.get('SEARCH_MIN_SIMILARITY') or 0.4)
+    
+    # Applications updated or deleted per statement (and per commit) by admin bulk actions
+    BULK_ACTION_CHUNK_SIZE = int(os.environ.get('BULK_ACTION_CHUNK_SIZE') or 500)
+    
+    # Applications fetched per round trip (and encoded per chunk) by exports
+    EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE') or 1000)
+    
+    # Applicant CSV imports: rows per batch (one commit each), and password
+    # hashing worker processes for import_applicants.py (0 = one per CPU core)
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE') or 500)
+    IMPORT_WORKERS = int(os.environ.get('IMPORT_WORKERS') or 0)
+    
+    # JSON encoder for requests and responses: 'stdlib', 'orjson' (optional
+    # dependency, not in requirements.txt), or 'auto' to use orjson when it
+    # is installed
+    JSON_BACKEND = os.environ.get('JSON_BACKEND', 'stdlib')
+    
+    # Decode base64 documents while JSON submissions are read instead of
+    # parsing the whole body first
+    STREAMING_JSON_UPLOADS = os.environ.get('STREAMING_JSON_UPLOADS', 'true').lower() in ['true', 'on', '1']
+    
     # Disable some Flask-Security features we don't need
     SECURITY_REGISTERABLE = False  # We'll handle registration ourselves
     SECURITY_CONFIRMABLE = False
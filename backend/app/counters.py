@@ -0,0 +1,212 @@
+from collections import Counter
+from datetime import datetime, timezone
+from sqlalchemy import event, func, insert, literal, literal_column, select
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.orm import attributes
+
+from app.models import db, Application, ApplicationCounter, User, UserCounter, Role, roles_users
+from app.statistics import ALL_USERS, year_month
+
+
+def application_key(status, course_applied, date_created):
+    # Rows without a creation date are counted under an empty month
+    return (status, course_applied, date_created.strftime('%Y-%m') if date_created else '')
+
+
+def user_keys(role_names, active):
+    return [(role, bool(active)) for role in (ALL_USERS, *role_names)]
+
+
+def _previous(obj, key):
+    """Value of an attribute as it was loaded from the database"""
+    history = attributes.get_history(obj, key)
+    if history.deleted:
+        return history.deleted[0]
+    return getattr(obj, key)
+
+
+def attributes_changed(obj, *keys):
+    # Attributes that were never loaded cannot have been changed
+    return any(
+        attributes.get_history(obj, key, passive=attributes.PASSIVE_NO_INITIALIZE).has_changes()
+        for key in keys
+    )
+
+
+def collect_counter_changes(session):
+    """Turn the objects being flushed into counter deltas"""
+    # Applications of deleted users were counted off before the flush, see
+    # count_cascaded_applications
+    cascaded_students, application_deltas = session.info.pop('cascaded_applications', ((), Counter()))
+    user_deltas = Counter()
+
+    for obj in session.new:
+        if isinstance(obj, Application):
+            application_deltas[application_key(obj.status, obj.course_applied, obj.date_created)] += 1
+        elif isinstance(obj, User):
+            for key in user_keys([role.name for role in obj.roles], obj.active):
+                user_deltas[key] += 1
+
+    for obj in session.dirty:
+        if isinstance(obj, Application):
+            if obj.student_id in cascaded_students:
+                continue
+            if attributes_changed(obj, 'status', 'course_applied', 'date_created'):
+                application_deltas[application_key(*[
+                    _previous(obj, key) for key in ('status', 'course_applied', 'date_created')
+                ])] -= 1
+                application_deltas[application_key(obj.status, obj.course_applied, obj.date_created)] += 1
+        elif isinstance(obj, User):
+            if attributes_changed(obj, 'active', 'roles'):
+                roles = attributes.get_history(obj, 'roles')
+                previous_roles = [role.name for role in (*(roles.unchanged or ()), *(roles.deleted or ()))]
+                for key in user_keys(previous_roles, _previous(obj, 'active')):
+                    user_deltas[key] -= 1
+                for key in user_keys([role.name for role in obj.roles], obj.active):
+                    user_deltas[key] += 1
+
+    for obj in session.deleted:
+        if isinstance(obj, Application):
+            if _previous(obj, 'student_id') in cascaded_students:
+                continue
+            application_deltas[application_key(*[
+                _previous(obj, key) for key in ('status', 'course_applied', 'date_created')
+            ])] -= 1
+        elif isinstance(obj, User):
+            for key in user_keys([role.name for role in obj.roles], _previous(obj, 'active')):
+                user_deltas[key] -= 1
+
+    return application_deltas, user_deltas
+
+
+def upsert_counter(connection, model, key_values, delta, column='count'):
+    """Add ``delta`` to a counter row, creating it if needed, in one statement"""
+    table = model.__table__
+    values = dict(key_values, **{column: delta})
+    dialect = connection.dialect.name
+
+    if dialect == 'mysql':
+        stmt = mysql.insert(table).values(**values)
+        stmt = stmt.on_duplicate_key_update({column: table.c[column] + stmt.inserted[column]})
+    elif dialect in ('sqlite', 'postgresql'):
+        insert_for = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        stmt = insert_for(table).values(**values)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(key_values),
+            set_={column: table.c[column] + stmt.excluded[column]}
+        )
+    else:
+        result = connection.execute(
+            table.update().where(*[table.c[key] == value for key, value in key_values.items()])
+            .values({column: table.c[column] + delta})
+        )
+        if result.rowcount:
+            return
+        stmt = table.insert().values(**values)
+    connection.execute(stmt)
+
+
+def apply_counter_deltas(connection, application_deltas, user_deltas):
+    for (status, course_applied, month), delta in application_deltas.items():
+        if delta:
+            upsert_counter(connection, ApplicationCounter, {
+                'status': status, 'course_applied': course_applied, 'month': month
+            }, delta)
+    for (role, active), delta in user_deltas.items():
+        if delta:
+            upsert_counter(connection, UserCounter, {'role': role, 'active': active}, delta)
+
+
+def fill_creation_dates(session, flush_context, instances):
+    """Give new rows their creation date before the flush, so it can be counted"""
+    for obj in session.new:
+        if isinstance(obj, (Application, User)) and obj.date_created is None:
+            obj.date_created = datetime.now(timezone.utc)
+
+
+def count_cascaded_applications(session, flush_context, instances):
+    """Count off every application of the users being deleted.
+
+    The database cascade removes applications that were never loaded, so
+    they never reach the flush; read them all while they still exist.
+    """
+    student_ids = {obj.id for obj in session.deleted if isinstance(obj, User) and obj.id is not None}
+    if not student_ids:
+        return
+    month = func.coalesce(year_month(Application.date_created), literal_column("''"))
+    rows = session.execute(
+        select(Application.status, Application.course_applied, month, func.count(Application.id))
+        .where(Application.student_id.in_(student_ids))
+        .group_by(Application.status, Application.course_applied, month)
+    ).all()
+    session.info['cascaded_applications'] = (
+        student_ids, Counter({(status, course_applied, key): -count for status, course_applied, key, count in rows})
+    )
+
+
+def update_counters(session, flush_context):
+    """Apply the flush's counter changes inside the same transaction"""
+    application_deltas, user_deltas = collect_counter_changes(session)
+    if application_deltas or user_deltas:
+        apply_counter_deltas(session.connection(), application_deltas, user_deltas)
+
+
+def _load_previous_value(target, value, oldvalue, initiator):
+    pass
+
+
+def init_counters():
+    """Keep the dashboard counters in step with every flush"""
+    if event.contains(db.session, 'after_flush', update_counters):
+        return
+    # Load the old value on assignment, so a change can be subtracted from
+    # the counter it used to fall under
+    for attribute in (Application.status, Application.course_applied, Application.date_created, User.active):
+        event.listen(attribute, 'set', _load_previous_value, active_history=True)
+    event.listen(db.session, 'before_flush', fill_creation_dates)
+    event.listen(db.session, 'before_flush', count_cascaded_applications)
+    event.listen(db.session, 'after_flush', update_counters)
+    event.listen(db.session, 'after_rollback', _discard_cascaded_applications)
+
+
+def _discard_cascaded_applications(session):
+    session.info.pop('cascaded_applications', None)
+
+
+def rebuild_counters():
+    """Recount everything from the application and user tables in one transaction"""
+    month = func.coalesce(year_month(Application.date_created), literal_column("''"))
+    active = func.coalesce(User.active, False)
+
+    db.session.execute(ApplicationCounter.__table__.delete())
+    db.session.execute(UserCounter.__table__.delete())
+
+    db.session.execute(insert(ApplicationCounter.__table__).from_select(
+        ['status', 'course_applied', 'month', 'count'],
+        select(Application.status, Application.course_applied, month, func.count(Application.id))
+        .group_by(Application.status, Application.course_applied, month)
+    ))
+    db.session.execute(insert(UserCounter.__table__).from_select(
+        ['role', 'active', 'count'],
+        select(literal(ALL_USERS), active, func.count(User.id)).group_by(active)
+    ))
+    db.session.execute(insert(UserCounter.__table__).from_select(
+        ['role', 'active', 'count'],
+        select(Role.name, active, func.count(User.id))
+        .select_from(User)
+        .join(roles_users, roles_users.c.user_id == User.id)
+        .join(Role, Role.id == roles_users.c.role_id)
+        .group_by(Role.name, active)
+    ))
+    db.session.commit()
+
+
+def seed_counters():
+    """Fill empty counter tables from existing data, e.g. the first time an
+    existing database is started with counters; returns whether it did"""
+    if db.session.query(UserCounter.role).first() or db.session.query(ApplicationCounter.status).first():
+        return False
+    if not (db.session.query(User.id).first() or db.session.query(Application.id).first()):
+        return False
+    rebuild_counters()
+    return True
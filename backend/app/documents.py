@@ -0,0 +1,249 @@
+import base64
+import hashlib
+import io
+import json
+import os
+import re
+import tempfile
+from abc import ABC, abstractmethod
+from flask import current_app
+
+# Document slots on an application
+DOCUMENT_TYPES = ('degree_certificate', 'id_proof')
+
+# Magic bytes of the file types we accept
+FILE_SIGNATURES = (
+    (b'%PDF', 'application/pdf'),
+    (b'\xff\xd8\xff', 'image/jpeg'),
+    (b'\x89PNG\r\n\x1a\n', 'image/png'),
+)
+
+# Fallback content types for documents stored before MIME types were recorded
+EXTENSION_MIMETYPES = {
+    'pdf': 'application/pdf',
+    'jpg': 'image/jpeg',
+    'jpeg': 'image/jpeg',
+    'png': 'image/png',
+    'gif': 'image/gif',
+    'doc': 'application/msword',
+    'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
+}
+
+_REF_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+# Raw bytes encoded per block when streaming base64; a multiple of 3 so
+# blocks never need padding
+BASE64_BLOCK_SIZE = 48 * 1024
+
+
+def detect_mimetype(data):
+    """Return the MIME type matching the file's magic bytes, or None"""
+    for signature, mimetype in FILE_SIGNATURES:
+        if data.startswith(signature):
+            return mimetype
+    return None
+
+
+def mimetype_for_filename(filename):
+    """Guess a content type from the file extension"""
+    file_ext = filename.lower().split('.')[-1] if filename and '.' in filename else ''
+    return EXTENSION_MIMETYPES.get(file_ext, 'application/octet-stream')
+
+
+class DocumentStore(ABC):
+    """Content-addressed storage for application documents.
+
+    Documents are keyed by the SHA-256 of their content, so identical uploads
+    share one stored copy and a reference never changes meaning.
+    """
+
+    # Directory for in-progress uploads (None means the system temp dir)
+    spool_dir = None
+
+    @abstractmethod
+    def put(self, data):
+        """Store bytes and return their reference"""
+
+    @abstractmethod
+    def put_file(self, path, ref=None):
+        """Move a finished file into the store and return its reference"""
+
+    @abstractmethod
+    def open(self, ref):
+        """Open a stored document for binary reading"""
+
+    @abstractmethod
+    def exists(self, ref):
+        """Whether a document is stored under the reference"""
+
+    @abstractmethod
+    def delete(self, ref):
+        """Remove a stored document"""
+
+    def read(self, ref):
+        with self.open(ref) as f:
+            return f.read()
+
+
+class LocalDocumentStore(DocumentStore):
+    """Document store backed by a directory on the local filesystem"""
+
+    def __init__(self, root):
+        self.root = root
+        # Spool uploads on the same filesystem so storing them is a rename
+        self.spool_dir = root
+        os.makedirs(self.root, exist_ok=True)
+
+    def path_for(self, ref):
+        if not _REF_PATTERN.match(ref or ''):
+            raise ValueError(f'Invalid document reference: {ref!r}')
+        # Two levels of fan-out keep directories small
+        return os.path.join(self.root, ref[:2], ref[2:4], ref)
+
+    def put(self, data):
+        ref = hashlib.sha256(data).hexdigest()
+        if not self.exists(ref):
+            fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.incoming-')
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            self._commit(tmp_path, ref)
+        return ref
+
+    def put_file(self, path, ref=None):
+        if ref is None:
+            digest = hashlib.sha256()
+            with open(path, 'rb') as f:
+                for chunk in iter(lambda: f.read(64 * 1024), b''):
+                    digest.update(chunk)
+            ref = digest.hexdigest()
+        if self.exists(ref):
+            os.remove(path)
+        else:
+            self._commit(path, ref)
+        return ref
+
+    def _commit(self, tmp_path, ref):
+        target = self.path_for(ref)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        # Atomic rename, so readers never observe a partially written document
+        os.replace(tmp_path, target)
+
+    def open(self, ref):
+        return open(self.path_for(ref), 'rb')
+
+    def exists(self, ref):
+        return os.path.exists(self.path_for(ref))
+
+    def delete(self, ref):
+        try:
+            os.remove(self.path_for(ref))
+        except FileNotFoundError:
+            pass
+
+
+DOCUMENT_STORE_BACKENDS = {
+    'local': LocalDocumentStore,
+}
+
+
+def resolve_storage_path(app, path):
+    """Resolve a configured storage path relative to the backend directory"""
+    if os.path.isabs(path):
+        return path
+    return os.path.join(os.path.dirname(app.root_path), path)
+
+
+def init_document_store(app):
+    """Create the configured document store and register it on the app"""
+    backend = app.config['DOCUMENT_STORE_BACKEND']
+    if backend not in DOCUMENT_STORE_BACKENDS:
+        raise ValueError(f'Unknown document store backend: {backend}')
+
+    root = resolve_storage_path(app, app.config['DOCUMENT_STORE_PATH'])
+    store = DOCUMENT_STORE_BACKENDS[backend](root)
+    app.extensions['document_store'] = store
+    return store
+
+
+def get_document_store():
+    return current_app.extensions['document_store']
+
+
+def attach_document(application, document_type, ref, size, mimetype, filename):
+    """Point an application's document slot at a stored document"""
+    setattr(application, f'{document_type}_ref', ref)
+    setattr(application, f'{document_type}_size', size)
+    setattr(application, f'{document_type}_mimetype', mimetype)
+    setattr(application, f'{document_type}_filename', filename)
+    # Clear any legacy inline copy
+    setattr(application, document_type, None)
+
+
+def store_document(application, document_type, data, filename):
+    """Store uploaded bytes and attach them to the application"""
+    if not data:
+        attach_document(application, document_type, None, None, None, filename)
+        return None
+    ref = get_document_store().put(data)
+    attach_document(application, document_type, ref, len(data), detect_mimetype(data), filename)
+    return ref
+
+
+def store_spooled_document(application, document_type, spool):
+    """Move a finished upload spool into the store and attach it"""
+    if spool is None:
+        attach_document(application, document_type, None, None, None, '')
+        return None
+    ref = get_document_store().put_file(spool.release(), spool.ref)
+    attach_document(application, document_type, ref, spool.size, spool.mimetype, spool.filename)
+    return ref
+
+
+def document_mimetype(application, document_type):
+    return (getattr(application, f'{document_type}_mimetype')
+            or mimetype_for_filename(getattr(application, f'{document_type}_filename')))
+
+
+def open_document(application, document_type):
+    """Open an application document for reading, or return None if missing.
+
+    Documents not yet moved out of the application table by
+    migrate_documents.py are served from the legacy blob column.
+    """
+    ref = getattr(application, f'{document_type}_ref')
+    if ref:
+        return get_document_store().open(ref)
+
+    legacy_data = getattr(application, document_type)
+    if legacy_data:
+        return io.BytesIO(legacy_data)
+    return None
+
+
+def iter_base64_json(file_obj, fields, data_key):
+    """Yield a JSON object holding ``fields`` plus the file's content as base64.
+
+    The document is read and encoded one block at a time, so memory use does
+    not depend on its size and the first bytes go out before it is read.
+    Closes ``file_obj`` when done.
+    """
+    head = json.dumps(fields)[:-1]
+    if fields:
+        head += ', '
+    yield f'{head}{json.dumps(data_key)}: "'.encode('utf-8')
+
+    with file_obj:
+        remainder = b''
+        while True:
+            block = file_obj.read(BASE64_BLOCK_SIZE)
+            if not block:
+                break
+            block = remainder + block
+            usable = len(block) - len(block) % 3
+            remainder = block[usable:]
+            if usable:
+                yield base64.b64encode(block[:usable])
+        if remainder:
+            yield base64.b64encode(remainder)
+
+    yield b'"}'
@@ -0,0 +1,83 @@
+import csv
+import io
+from flask import current_app
+
+from app.models import Application
+from app.search import filter_applications
+from app.serializers import EXPORT_FIELDS
+
+# Export formats and their content types
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+}
+
+# Leading characters that make spreadsheets read a cell as a formula
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+
+def export_query(filters, names):
+    """Applications matching the admin search ``filters``, newest first,
+    selecting only the columns the export ``names`` need (never documents)"""
+    query = Application.query.join(Application.student).options(
+        *EXPORT_FIELDS.load_options(names, joined=('student',))
+    )
+    query, _ = filter_applications(query, **filters)
+    return query.order_by(Application.date_created.desc(), Application.id.desc())
+
+
+def iter_records(query, names, batch_size):
+    """Serialize the query's applications one at a time.
+
+    Rows come from a server-side cursor ``batch_size`` at a time
+    (``yield_per`` turns on ``stream_results``), and each application can be
+    freed once it is written, so memory does not grow with the export.
+    """
+    serialize = EXPORT_FIELDS.plan(names)
+    for application in query.yield_per(batch_size):
+        yield serialize(application)
+
+
+def csv_cell(value):
+    """Quote text a spreadsheet would run as a formula, e.g. a student
+    named =HYPERLINK(...), so it opens as plain text"""
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+
+def iter_csv(records, names, batch_size):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(names)
+    for count, record in enumerate(records, 1):
+        writer.writerow([csv_cell(record[name]) for name in names])
+        if count % batch_size == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+
+def iter_ndjson(records, names, batch_size):
+    dumps = current_app.json.dumps
+    lines = []
+    for record in records:
+        lines.append(dumps(record))
+        if len(lines) == batch_size:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+            lines = []
+    if lines:
+        yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+
+EXPORT_WRITERS = {
+    'csv': iter_csv,
+    'ndjson': iter_ndjson,
+}
+
+
+def iter_export(records, names, export_format, batch_size):
+    """Encode ``records`` in ``export_format``, yielding a chunk of bytes per
+    ``batch_size`` records"""
+    return EXPORT_WRITERS[export_format](records, names, batch_size)
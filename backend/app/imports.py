@@ -0,0 +1,246 @@
+import os
+import time
+import uuid
+from collections import Counter
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from flask import current_app
+from sqlalchemy import or_, select
+
+from app.models import db, Application, Role, User, roles_users
+from app.counters import application_key, apply_counter_deltas, user_keys
+from app.passwords import hash_passwords
+from app.response_cache import mark_dashboards_changed
+from app.search import get_search_index
+from app.validators import validate_email, validate_phone
+
+# Columns every row needs, the same fields registration asks for
+USER_COLUMNS = ('name', 'email', 'phone', 'password', 'address', 'country', 'state', 'district', 'pincode')
+
+# Optional columns; a row with a course_applied also gets a draft
+# application, which the student completes and submits with documents
+APPLICATION_COLUMNS = (
+    'course_applied', 'tenth_percentage', 'tenth_board', 'twelfth_percentage', 'twelfth_board',
+    'previous_qualification', 'previous_institution', 'graduation_year'
+)
+
+
+class ImportReport:
+    """What an import created, and which rows were skipped and why"""
+
+    def __init__(self):
+        self.rows = 0
+        self.users = 0
+        self.applications = 0
+        self.errors = []
+        self.elapsed = 0.0
+        self.hashing = 0.0
+
+    def fail(self, line, email, error):
+        self.errors.append({'row': line, 'email': email, 'error': error})
+
+    def to_dict(self):
+        return {
+            'total_rows': self.rows,
+            'created_users': self.users,
+            'created_applications': self.applications,
+            'failed_rows': len(self.errors),
+            'errors': sorted(self.errors, key=lambda error: error['row']),
+            'elapsed_seconds': round(self.elapsed, 2),
+            'hashing_seconds': round(self.hashing, 2),
+            'rows_per_second': round(self.rows / self.elapsed, 1) if self.elapsed else 0.0,
+        }
+
+
+def missing_columns(fieldnames):
+    return [column for column in USER_COLUMNS if column not in (fieldnames or ())]
+
+
+def import_worker_count():
+    return current_app.config['IMPORT_WORKERS'] or os.cpu_count() or 1
+
+
+def _number(row, column, label, cast, low, high, default):
+    text = (row.get(column) or '').strip()
+    if not text:
+        return default
+    try:
+        value = cast(text)
+    except ValueError:
+        raise ValueError(f'Invalid {label} value')
+    if not (low <= value <= high):
+        raise ValueError(f'{label.capitalize()} must be between {low} and {high}')
+    return value
+
+
+def parse_row(row):
+    """Validate a CSV row like registration does; returns the user's values
+    and the draft application's, or None without a course"""
+    user = {column: (row.get(column) or '').strip() for column in USER_COLUMNS}
+    user['password'] = row.get('password') or ''
+    for column in USER_COLUMNS:
+        if not user[column]:
+            raise ValueError(f'{column} is required')
+    if not validate_email(user['email']):
+        raise ValueError('Invalid email format')
+    if not validate_phone(user['phone']):
+        raise ValueError('Invalid phone number format (10 digits required)')
+
+    course = (row.get('course_applied') or '').strip()
+    if not course:
+        return user, None
+    # Blank fields get the same defaults as a saved draft
+    application = {
+        'course_applied': course,
+        'tenth_percentage': _number(row, 'tenth_percentage', 'tenth percentage', float, 0, 100, 0.0),
+        'twelfth_percentage': _number(row, 'twelfth_percentage', 'twelfth percentage', float, 0, 100, 0.0),
+        'graduation_year': _number(row, 'graduation_year', 'graduation year', int, 1980, 2030, 2024),
+    }
+    for column in ('tenth_board', 'twelfth_board', 'previous_qualification', 'previous_institution'):
+        application[column] = (row.get(column) or '').strip() or 'Not Specified'
+    return user, application
+
+
+def student_role():
+    role = Role.query.filter_by(name='student').first()
+    if not role:
+        role = Role(name='student', description='Student')
+        db.session.add(role)
+        db.session.commit()
+    return role
+
+
+def import_applicants(rows, batch_size, executor=None):
+    """Create students (and draft applications) from CSV rows (dicts).
+
+    Rows are validated as they are read and inserted a batch at a time:
+    one query finds the batch's emails and phones that are taken, the
+    passwords are hashed on ``executor`` (see ``hash_passwords``), and
+    users, roles and applications go in with one executemany statement
+    each, committed per batch. Rows that fail are reported by line number
+    and skipped.
+    """
+    report = ImportReport()
+    started = time.perf_counter()
+    seen_emails, seen_phones = {}, {}
+    role_id = student_role().id
+
+    batch = []
+    for line, row in enumerate(rows, 2):  # line 1 is the header
+        report.rows += 1
+        try:
+            user, application = parse_row(row)
+        except ValueError as e:
+            report.fail(line, (row.get('email') or '').strip(), str(e))
+            continue
+
+        if user['email'] in seen_emails:
+            report.fail(line, user['email'], f"Duplicate email in file (row {seen_emails[user['email']]})")
+            continue
+        if user['phone'] in seen_phones:
+            report.fail(line, user['email'], f"Duplicate phone number in file (row {seen_phones[user['phone']]})")
+            continue
+        seen_emails[user['email']] = line
+        seen_phones[user['phone']] = line
+
+        batch.append((line, user, application))
+        if len(batch) == batch_size:
+            _import_batch(batch, role_id, report, executor)
+            batch = []
+    if batch:
+        _import_batch(batch, role_id, report, executor)
+
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def _import_batch(batch, role_id, report, executor):
+    emails = [user['email'] for _, user, _ in batch]
+    phones = [user['phone'] for _, user, _ in batch]
+    taken = db.session.execute(
+        select(User.email, User.phone).where(or_(User.email.in_(emails), User.phone.in_(phones)))
+    ).all()
+    taken_emails = {row.email for row in taken}
+    taken_phones = {row.phone for row in taken}
+
+    fresh = []
+    for line, user, application in batch:
+        if user['email'] in taken_emails:
+            report.fail(line, user['email'], 'Email already registered')
+        elif user['phone'] in taken_phones:
+            report.fail(line, user['email'], 'Phone number already registered')
+        else:
+            fresh.append((line, user, application))
+    if not fresh:
+        db.session.rollback()
+        return
+
+    hashing_started = time.perf_counter()
+    hashes = hash_passwords([user['password'] for _, user, _ in fresh], executor)
+    report.hashing += time.perf_counter() - hashing_started
+
+    now = datetime.now(timezone.utc)
+    users = [
+        dict(user, password=password_hash, fs_uniquifier=str(uuid.uuid4()),
+             active=True, confirmed_at=now, date_created=now)
+        for (_, user, _), password_hash in zip(fresh, hashes)
+    ]
+    try:
+        connection = db.session.connection()
+        connection.execute(User.__table__.insert(), users)
+        user_ids = dict(db.session.execute(
+            select(User.email, User.id).where(User.email.in_([user['email'] for user in users]))
+        ).all())
+        connection.execute(roles_users.insert(), [
+            {'user_id': user_ids[user['email']], 'role_id': role_id} for user in users
+        ])
+
+        applications = [
+            dict(
+                application,
+                student_id=user_ids[user['email']],
+                address=user['address'],
+                country=user['country'],
+                state=user['state'],
+                district=user['district'],
+                pincode=user['pincode'],
+                # Documents are attached on submission
+                degree_certificate_filename='draft.pdf',
+                id_proof_filename='draft.pdf',
+                status='draft',
+                date_created=now
+            )
+            for _, user, application in fresh if application
+        ]
+        if applications:
+            connection.execute(Application.__table__.insert(), applications)
+
+        # The statements bypass the session, so do the work of its flush
+        # hooks: counters, cached statistics and the search index
+        user_deltas = Counter({key: len(users) for key in user_keys(['student'], True)})
+        application_deltas = Counter(
+            application_key('draft', application['course_applied'], now) for application in applications
+        )
+        apply_counter_deltas(connection, application_deltas, user_deltas)
+        mark_dashboards_changed(db.session)
+
+        index = get_search_index()
+        index.add(connection, User, [SimpleNamespace(id=user_ids[user['email']], **user) for user in users])
+        if applications:
+            application_ids = dict(db.session.execute(
+                select(Application.student_id, Application.id)
+                .where(Application.student_id.in_([application['student_id'] for application in applications]))
+            ).all())
+            index.add(connection, Application, [
+                SimpleNamespace(id=application_ids[application['student_id']], **application)
+                for application in applications
+            ])
+        db.session.commit()
+    except Exception as e:
+        db.session.rollback()
+        for line, user, _ in fresh:
+            report.fail(line, user['email'], str(e))
+        return
+
+    report.users += len(users)
+    report.applications += len(applications)
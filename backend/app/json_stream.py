@@ -0,0 +1,225 @@
+import codecs
+import json
+
+WHITESPACE = ' \t\n\r'
+LITERAL_CHARS = set('+-0123456789.eEtruefalsn')
+SIMPLE_ESCAPES = {
+    '"': '"', '\\': '\\', '/': '/',
+    'b': '\b', 'f': '\f', 'n': '\n', 'r': '\r', 't': '\t'
+}
+
+
+class JSONStreamError(ValueError):
+    """Raised when the streamed body is not valid JSON or exceeds a limit"""
+
+
+class StreamingJSONParser:
+    """Incremental JSON parser that can stream selected string values.
+
+    The input is consumed chunk by chunk from an iterable of bytes. String
+    values found at the key paths in ``stream_strings`` are never built in
+    memory: their text is passed piece by piece to a sink created by the
+    matching factory, and the parsed value becomes whatever the sink's
+    ``close()`` returns. All other strings are capped at
+    ``max_string_length`` characters.
+    """
+
+    def __init__(self, chunks, stream_strings=None, max_string_length=64 * 1024, max_depth=32):
+        self.stream_strings = stream_strings or {}
+        self.max_string_length = max_string_length
+        self.max_depth = max_depth
+        self._chunks = iter(chunks)
+        self._decoder = codecs.getincrementaldecoder('utf-8')()
+        self._buffer = ''
+        self._pos = 0
+        self._eof = False
+
+    def parse(self):
+        value = self._parse_value((), 0)
+        if self._peek(required=False) is not None:
+            raise JSONStreamError('Extra data after JSON value')
+        return value
+
+    # Input handling
+
+    def _fill(self):
+        """Append more decoded text to the buffer; return False at end of input"""
+        while not self._eof:
+            chunk = next(self._chunks, b'')
+            if chunk:
+                text = self._decoder.decode(chunk)
+            else:
+                self._eof = True
+                text = self._decoder.decode(b'', final=True)
+            if text:
+                # Drop consumed text so the buffer stays around one chunk long
+                self._buffer = self._buffer[self._pos:] + text
+                self._pos = 0
+                return True
+        return False
+
+    def _peek(self, required=True):
+        """Skip whitespace and return the next character without consuming it"""
+        while True:
+            while self._pos < len(self._buffer):
+                char = self._buffer[self._pos]
+                if char not in WHITESPACE:
+                    return char
+                self._pos += 1
+            if not self._fill():
+                if required:
+                    raise JSONStreamError('Unexpected end of JSON input')
+                return None
+
+    def _expect(self, char):
+        if self._peek() != char:
+            raise JSONStreamError(f'Expected {char!r} at position {self._pos}')
+        self._pos += 1
+
+    # Values
+
+    def _parse_value(self, path, depth):
+        if depth > self.max_depth:
+            raise JSONStreamError('JSON nested too deeply')
+
+        char = self._peek()
+        if char == '{':
+            return self._parse_object(path, depth)
+        if char == '[':
+            return self._parse_array(path, depth)
+        if char == '"':
+            self._pos += 1
+            sink_factory = self.stream_strings.get(path)
+            if sink_factory is not None:
+                sink = sink_factory()
+                self._read_string(sink.write)
+                return sink.close()
+            return self._parse_string()
+        return self._parse_literal()
+
+    def _parse_object(self, path, depth):
+        self._expect('{')
+        result = {}
+        if self._peek() == '}':
+            self._pos += 1
+            return result
+
+        while True:
+            self._expect('"')
+            key = self._parse_string()
+            self._expect(':')
+            result[key] = self._parse_value(path + (key,), depth + 1)
+
+            char = self._peek()
+            self._pos += 1
+            if char == '}':
+                return result
+            if char != ',':
+                raise JSONStreamError(f'Expected "," or "}}" at position {self._pos - 1}')
+
+    def _parse_array(self, path, depth):
+        self._expect('[')
+        result = []
+        if self._peek() == ']':
+            self._pos += 1
+            return result
+
+        while True:
+            result.append(self._parse_value(path + (len(result),), depth + 1))
+
+            char = self._peek()
+            self._pos += 1
+            if char == ']':
+                return result
+            if char != ',':
+                raise JSONStreamError(f'Expected "," or "]" at position {self._pos - 1}')
+
+    def _parse_string(self):
+        parts = []
+        length = 0
+
+        def append(text):
+            nonlocal length
+            length += len(text)
+            if length > self.max_string_length:
+                raise JSONStreamError(f'String value longer than {self.max_string_length} characters')
+            parts.append(text)
+
+        self._read_string(append)
+        return ''.join(parts)
+
+    def _read_string(self, write):
+        """Pass the rest of a string to ``write`` in pieces, up to the closing quote"""
+        while True:
+            if self._pos >= len(self._buffer) and not self._fill():
+                raise JSONStreamError('Unterminated string')
+
+            buffer = self._buffer
+            end = buffer.find('"', self._pos)
+            escape = buffer.find('\\', self._pos, len(buffer) if end == -1 else end)
+
+            if escape != -1:
+                if escape > self._pos:
+                    write(buffer[self._pos:escape])
+                self._pos = escape
+                write(self._read_escape())
+            elif end == -1:
+                write(buffer[self._pos:])
+                self._pos = len(buffer)
+            else:
+                if end > self._pos:
+                    write(buffer[self._pos:end])
+                self._pos = end + 1
+                return
+
+    def _ensure(self, count):
+        while len(self._buffer) - self._pos < count:
+            if not self._fill():
+                raise JSONStreamError('Unexpected end of JSON input')
+
+    def _read_escape(self):
+        self._ensure(2)
+        char = self._buffer[self._pos + 1]
+        if char in SIMPLE_ESCAPES:
+            self._pos += 2
+            return SIMPLE_ESCAPES[char]
+        if char != 'u':
+            raise JSONStreamError(f'Invalid escape sequence \\{char}')
+
+        code = self._read_unicode_escape()
+        # Combine a UTF-16 surrogate pair into one character
+        if 0xD800 <= code < 0xDC00:
+            self._ensure(2)
+            if self._buffer[self._pos:self._pos + 2] == '\\u':
+                low = self._read_unicode_escape()
+                if 0xDC00 <= low < 0xE000:
+                    return chr(0x10000 + ((code - 0xD800) << 10) + (low - 0xDC00))
+                return chr(code) + chr(low)
+        return chr(code)
+
+    def _read_unicode_escape(self):
+        self._ensure(6)
+        digits = self._buffer[self._pos + 2:self._pos + 6]
+        try:
+            code = int(digits, 16)
+        except ValueError:
+            raise JSONStreamError(f'Invalid unicode escape \\u{digits}')
+        self._pos += 6
+        return code
+
+    def _parse_literal(self):
+        """Parse a number, true, false or null"""
+        token = ''
+        while True:
+            while self._pos < len(self._buffer) and self._buffer[self._pos] in LITERAL_CHARS:
+                token += self._buffer[self._pos]
+                self._pos += 1
+                if len(token) > 64:
+                    raise JSONStreamError('Literal value too long')
+            if self._pos < len(self._buffer) or not self._fill():
+                break
+
+        try:
+            return json.loads(token)
+        except ValueError:
+            raise JSONStreamError(f'Invalid JSON value {token!r}')
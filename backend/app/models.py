@@ -34,6 +34,15 @@ class User(db.Model, UserMixin):
     confirmed_at = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     date_created = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
 
+    __table_args__ = (
+        # Newest-first user listing and registration counts
+        db.Index('ix_user_date_created', 'date_created'),
+        # Admin search on MySQL; other databases use SearchTrigram
+        db.Index('ft_user_name', 'name', mysql_prefix='FULLTEXT', mysql_with_parser='ngram').ddl_if(dialect='mysql'),
+        db.Index('ft_user_contact', 'name', 'email', 'phone',
+                 mysql_prefix='FULLTEXT', mysql_with_parser='ngram').ddl_if(dialect='mysql'),
+    )
+
     roles = db.relationship(
         'Role',
         secondary=roles_users,
@@ -75,12 +84,33 @@ class Application(db.Model):
     district = db.Column(db.String(100), nullable=False)
     pincode = db.Column(db.String(10), nullable=False)
     
-    # Document files stored as binary data
-    degree_certificate = db.Column(db.LargeBinary(length=10*1024*1024), nullable=False)  # 10MB limit
+    # Document files live in the document store; the row only keeps a reference
+    degree_certificate_ref = db.Column(db.String(64), nullable=True)  # SHA-256 of the content
+    degree_certificate_size = db.Column(db.Integer, nullable=True)
+    degree_certificate_mimetype = db.Column(db.String(100), nullable=True)
     degree_certificate_filename = db.Column(db.String(255), nullable=False)
-    id_proof = db.Column(db.LargeBinary(length=10*1024*1024), nullable=False)  # 10MB limit
+    id_proof_ref = db.Column(db.String(64), nullable=True)  # SHA-256 of the content
+    id_proof_size = db.Column(db.Integer, nullable=True)
+    id_proof_mimetype = db.Column(db.String(100), nullable=True)
     id_proof_filename = db.Column(db.String(255), nullable=False)
     
+    # Legacy inline document storage, emptied by migrate_documents.py.
+    # Deferred so that loading a row never pulls the blobs; only the
+    # document-serving routes touch them.
+    degree_certificate = db.deferred(db.Column(db.LargeBinary(length=10*1024*1024), nullable=True))  # 10MB limit
+    id_proof = db.deferred(db.Column(db.LargeBinary(length=10*1024*1024), nullable=True))  # 10MB limit
+    
+    # Document sizes for presence checks, computed in SQL for rows whose
+    # documents are still inline. Load with undefer_group('document_lengths').
+    degree_certificate_length = db.column_property(
+        db.func.coalesce(degree_certificate_size, db.func.length(degree_certificate)),
+        deferred=True, group='document_lengths'
+    )
+    id_proof_length = db.column_property(
+        db.func.coalesce(id_proof_size, db.func.length(id_proof)),
+        deferred=True, group='document_lengths'
+    )
+    
     # Application status
     status = db.Column(db.String(20), default='pending', nullable=False)  # pending, approved, rejected
     
@@ -99,6 +129,68 @@ class Application(db.Model):
     date_created = db.Column(db.DateTime(timezone=True), default=lambda: datetime.now(timezone.utc))
     
     reviewer = db.relationship('User', foreign_keys=[reviewed_by])
+    
+    # Existing databases get these from migrate_indexes.py. Every InnoDB
+    # index also ends in the primary key, so the date_created indexes serve
+    # the (date_created, id) order of the listings as well.
+    __table_args__ = (
+        # A student's draft, pending or approved application
+        db.Index('ix_application_student_status', 'student_id', 'status'),
+        # Per-status listings and counts, newest first
+        db.Index('ix_application_status_date_created', 'status', 'date_created'),
+        # Unfiltered listings and recent submission counts
+        db.Index('ix_application_date_created', 'date_created'),
+        # Course filters, optionally with a percentage range
+        db.Index('ix_application_course_percentage', 'course_applied', 'twelfth_percentage'),
+        # Admin course search on MySQL; other databases use SearchTrigram
+        db.Index('ft_application_course', 'course_applied',
+                 mysql_prefix='FULLTEXT', mysql_with_parser='ngram').ddl_if(dialect='mysql'),
+    )
+
+# Materialized dashboard counters, kept up to date by app/counters.py
+class ApplicationCounter(db.Model):
+    __tablename__ = 'application_counter'
+    status = db.Column(db.String(20), primary_key=True)
+    course_applied = db.Column(db.String(255), primary_key=True)
+    month = db.Column(db.String(7), primary_key=True)  # YYYY-MM of date_created
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+class UserCounter(db.Model):
+    __tablename__ = 'user_counter'
+    role = db.Column(db.String(80), primary_key=True)  # '*' counts every user once
+    active = db.Column(db.Boolean(), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+# Version numbers of cached data, bumped on every change to it
+class CacheGeneration(db.Model):
+    __tablename__ = 'cache_generation'
+    name = db.Column(db.String(50), primary_key=True)
+    value = db.Column(db.BigInteger, nullable=False, default=0)
+
+# Trigrams of the searchable user and application fields, for databases
+# without FULLTEXT; kept up to date by app/search.py
+class SearchTrigram(db.Model):
+    __tablename__ = 'search_trigram'
+    source = db.Column(db.String(20), primary_key=True)  # table of the record
+    field = db.Column(db.String(30), primary_key=True)
+    trigram = db.Column(db.String(3), primary_key=True)
+    record_id = db.Column(db.Integer, primary_key=True)
+
+    __table_args__ = (
+        db.Index('ix_search_trigram_record', 'source', 'record_id'),
+    )
+
+# Login and registration attempts per sliding window, for throttling
+# shared between processes; kept by app/throttling.py
+class ThrottleCounter(db.Model):
+    __tablename__ = 'throttle_counter'
+    bucket = db.Column(db.String(64), primary_key=True)  # SHA-256 of action, scope and client
+    period = db.Column(db.BigInteger, primary_key=True)  # window number since the epoch
+    count = db.Column(db.Integer, nullable=False, default=0)
+
+    __table_args__ = (
+        db.Index('ix_throttle_counter_period', 'period'),
+    )
 
 # Enable foreign key support for SQLite
 @event.listens_for(Engine, "connect")
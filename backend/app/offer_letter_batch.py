@@ -0,0 +1,167 @@
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from flask import current_app
+
+from app.models import db, Application
+from app.offer_letters import get_offer_letter_cache, offer_letter_name, render_offer_letter
+from app.validators import parse_date
+
+# Letters handed to a worker process at a time
+BATCH_CHUNK_SIZE = 16
+
+
+def select_approved_applications(application_ids=None, course=None, start_date=None, end_date=None):
+    """Query approved applications by id list, course and approval date range.
+
+    Dates are YYYY-MM-DD and both days are included; raises ValueError for
+    a malformed date.
+    """
+    start_date, end_date = parse_date(start_date), parse_date(end_date)
+    query = Application.query.options(db.joinedload(Application.student)).filter(
+        Application.status == 'approved'
+    )
+    if application_ids:
+        query = query.filter(Application.id.in_(application_ids))
+    if course:
+        query = query.filter(Application.course_applied == course)
+    if start_date:
+        query = query.filter(Application.reviewed_at >= start_date)
+    if end_date:
+        query = query.filter(Application.reviewed_at < end_date + timedelta(days=1))
+    return query.order_by(Application.id)
+
+
+def offer_letter_snapshot(application, now=None):
+    """Copy the fields a letter needs into a plain object that can be sent to a worker"""
+    student = application.student
+    now = now or datetime.now()
+    return SimpleNamespace(
+        id=application.id,
+        issued_at=now,
+        letter_name=offer_letter_name(application, now),
+        download_name=f"offer_letter_{student.name.replace(' ', '_')}_{application.id}.pdf",
+        course_applied=application.course_applied,
+        graduation_year=application.graduation_year,
+        tenth_percentage=application.tenth_percentage,
+        tenth_board=application.tenth_board,
+        twelfth_percentage=application.twelfth_percentage,
+        twelfth_board=application.twelfth_board,
+        previous_qualification=application.previous_qualification,
+        previous_institution=application.previous_institution,
+        student=SimpleNamespace(name=student.name, email=student.email, phone=student.phone),
+    )
+
+
+def render_letter_to_cache(cache, snapshot):
+    """Worker entry point: render one letter straight into the cache directory"""
+    cache.write(snapshot.letter_name, render_offer_letter(snapshot, snapshot.issued_at))
+    return snapshot.id
+
+
+def batch_worker_count(letters):
+    workers = current_app.config['OFFER_LETTER_WORKERS'] or os.cpu_count() or 1
+    return max(1, min(workers, letters))
+
+
+def generate_offer_letters(snapshots, workers=None):
+    """Make sure every letter is in the cache, yielding (snapshot, path) as each one is ready.
+
+    Cached letters are yielded first. The rest are rendered in this thread,
+    or with ``workers`` > 1 across a pool of worker processes, which write
+    the PDFs into the cache directory themselves so only application ids
+    travel back to this process. Only single-threaded callers such as
+    generate_offer_letters.py may use processes: forking a threaded server
+    worker copies locks other threads hold.
+    """
+    cache = get_offer_letter_cache()
+    pending = []
+    for snapshot in snapshots:
+        path = cache.get(snapshot.letter_name)
+        if path is None:
+            pending.append(snapshot)
+        else:
+            yield snapshot, path
+
+    if not pending:
+        return
+
+    if not workers or workers == 1:
+        for snapshot in pending:
+            render_letter_to_cache(cache, snapshot)
+            yield snapshot, cache.path_for(snapshot.letter_name)
+    else:
+        # Workers only render; they never use the database connections a
+        # forked child inherits
+        executor = ProcessPoolExecutor(max_workers=workers)
+        try:
+            results = executor.map(
+                render_letter_to_cache,
+                [cache] * len(pending),
+                pending,
+                chunksize=BATCH_CHUNK_SIZE
+            )
+            for snapshot, _ in zip(pending, results):
+                # Adds the letter the worker wrote to this process's index
+                yield snapshot, cache.get(snapshot.letter_name) or cache.path_for(snapshot.letter_name)
+        finally:
+            # Stop rendering if the consumer goes away, e.g. an aborted download
+            executor.shutdown(cancel_futures=True)
+
+    cache.evict()
+
+
+def record_offer_letters(snapshots):
+    """Point admission_letter_path at the generated letters"""
+    db.session.bulk_update_mappings(Application, [
+        {'id': snapshot.id, 'admission_letter_path': snapshot.letter_name}
+        for snapshot in snapshots
+    ])
+    db.session.commit()
+
+
+def store_offer_letters(snapshots, workers=None):
+    """Generate the letters into the offer letter store and return how many there are"""
+    generated = [snapshot for snapshot, _ in generate_offer_letters(snapshots, workers)]
+    record_offer_letters(generated)
+    return len(generated)
+
+
+class _ZipOutput:
+    """Write-only file object that hands back whatever has been written so far"""
+
+    def __init__(self):
+        self._chunks = []
+
+    def write(self, data):
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self):
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_offer_letter_zip(snapshots, workers=None):
+    """Generate the letters and stream them as a ZIP archive built on the fly.
+
+    Each PDF is added to the archive as soon as it is rendered, so the
+    download starts before the batch is finished and the archive is never
+    held in memory. PDFs are already compressed and are stored as is.
+    """
+    output = _ZipOutput()
+    generated = []
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_STORED) as archive:
+        for snapshot, path in generate_offer_letters(snapshots, workers):
+            archive.write(path, arcname=snapshot.download_name)
+            generated.append(snapshot)
+            yield output.drain()
+    yield output.drain()
+
+    record_offer_letters(generated)
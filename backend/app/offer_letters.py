@@ -0,0 +1,616 @@
+import hashlib
+import io
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from xml.sax.saxutils import escape
+from flask import current_app
+from reportlab.lib.pagesizes import A4
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.lib import colors
+from reportlab.graphics.shapes import Drawing, Rect
+
+from app.documents import resolve_storage_path
+
+# Professional color scheme
+DARK_BLUE = colors.Color(0.2, 0.2, 0.4)
+LIGHT_GRAY = colors.Color(0.95, 0.95, 0.95)
+
+# Style shared by the student, program, academic and deadline tables
+DETAILS_TABLE_STYLE = [
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
+    ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
+    ('FONTSIZE', (0, 0), (-1, -1), 8),
+    ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
+    ('TOPPADDING', (0, 0), (-1, -1), 3),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('LINEBELOW', (0, 0), (-1, -1), 0.5, colors.lightgrey),
+]
+
+CONDITIONS_TEXT = [
+    "a) Accept this admission offer through the student portal within <b>15 calendar days</b> from the date of this letter.",
+    "b) Complete the fee payment process as outlined in the Fee Structure document (to be provided separately).",
+    "c) Submit original academic documents for verification to the Registrar's Office.",
+    "d) Complete medical examination and submit health clearance certificate.",
+    "e) Attend the mandatory orientation program scheduled before commencement of classes.",
+    "f) Comply with all university policies and regulations as outlined in the Student Handbook."
+]
+
+SIGNATURE_DATA = [
+    ['', ''],
+    ['_________________________', '_________________________'],
+    ['Dr. Sarah Johnson', 'Prof. Michael Chen'],
+    ['Director of Admissions', 'Registrar'],
+    ['UniAdmit University', 'UniAdmit University']
+]
+
+
+class CompiledParagraph(Paragraph):
+    """Paragraph that shares its parsed text and line breaks between letters.
+
+    Static text always breaks into the same lines at a given frame width, so
+    the first letter's layout is reused by every later one, including by
+    letters rendered at the same time on other threads: ReportLab only reads
+    the line breaks (blPara) when it draws a paragraph, except for
+    right-to-left text, which these paragraphs never hold. Splitting edits
+    the words it splits, so a paragraph that has to break across pages is
+    split as a plain Paragraph with a layout of its own. Each letter still
+    gets its own flowable, as drawing stores state on it.
+
+    The constructor is Paragraph's; set ``_layouts`` to the dict the
+    layouts are shared through, keyed by frame width.
+    """
+
+    _layouts = None
+
+    def wrap(self, availWidth, availHeight):
+        if self._layouts is None:
+            return super().wrap(availWidth, availHeight)
+        layout = self._layouts.get(availWidth)
+        if layout is None:
+            super().wrap(availWidth, availHeight)
+            layout = (self._wrapWidths, self.blPara, self.width, self.height)
+            self._layouts[availWidth] = layout
+        self._wrapWidths, self.blPara, self.width, self.height = layout
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        return Paragraph(self.text, self.style).split(availWidth, availHeight)
+
+
+class OfferLetterTemplate:
+    """Offer letter layout, compiled once and filled in per application.
+
+    Paragraph and table styles, and every paragraph that reads the same for
+    all students, are built and parsed when the template is created.
+    Rendering a letter only parses the paragraphs that carry student fields
+    and lays out the page.
+    """
+
+    def __init__(self):
+        self.styles = self._build_styles()
+        self.table_styles = {
+            'reference': TableStyle([
+                ('ALIGN', (0, 0), (0, 0), 'LEFT'),
+                ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+                ('FONTSIZE', (0, 0), (-1, -1), 8),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
+            ]),
+            'details': TableStyle(DETAILS_TABLE_STYLE),
+            'signature': TableStyle([
+                ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+                ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
+                ('FONTSIZE', (0, 0), (-1, -1), 8),
+                ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+                ('TOPPADDING', (0, 0), (-1, -1), 2),
+                ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ]),
+        }
+
+        self.paragraphs = {
+            'letterhead': self._compile("UNIADMIT UNIVERSITY", 'letterhead'),
+            'department': self._compile("OFFICE OF ADMISSIONS", 'department'),
+            'address': self._compile(
+                "123 Education Avenue, Academic City, State 12345<br/>Phone: +1-555-0123 | Email: admissions@uniadmit.edu",
+                'address'
+            ),
+            'title': self._compile("OFFICIAL LETTER OF ADMISSION", 'document_title'),
+            'conditions': [self._compile(condition, 'conditions') for condition in CONDITIONS_TEXT],
+            'contact': self._compile(
+                "For any queries or assistance regarding your admission, please contact:<br/><br/>"
+                "<b>Admissions Office</b><br/>"
+                "Phone: +1-555-0123 | Email: admissions@uniadmit.edu<br/>"
+                "Office Hours: Monday to Friday, 9:00 AM to 5:00 PM",
+                'contact'
+            ),
+            'closing': self._compile(
+                "We congratulate you on this achievement and look forward to welcoming you to the UniAdmit University community. "
+                "We are confident that you will make significant contributions to our academic environment.",
+                'closing'
+            ),
+            'sincerely': self._compile("Sincerely,", 'closing'),
+        }
+        self.section_titles = {
+            number: self._compile(f"{number}. {title}", 'section_title')
+            for number, title in enumerate([
+                "STUDENT INFORMATION",
+                "ADMISSION DECISION",
+                "PROGRAM DETAILS",
+                "ACADEMIC QUALIFICATIONS REVIEWED",
+                "CONDITIONS AND NEXT STEPS",
+                "IMPORTANT DEADLINES",
+                "CONTACT INFORMATION",
+            ], start=1)
+        }
+
+    @staticmethod
+    def _build_styles():
+        styles = getSampleStyleSheet()
+        return {
+            'letterhead': ParagraphStyle(
+                'Letterhead',
+                parent=styles['Heading1'],
+                fontSize=18,
+                spaceAfter=5,
+                textColor=DARK_BLUE,
+                alignment=1,
+                fontName='Helvetica-Bold',
+                letterSpacing=1
+            ),
+            'department': ParagraphStyle(
+                'Department',
+                parent=styles['Normal'],
+                fontSize=10,
+                spaceAfter=20,
+                textColor=colors.black,
+                alignment=1,
+                fontName='Helvetica',
+                letterSpacing=0.5
+            ),
+            'address': ParagraphStyle(
+                'AddressStyle',
+                parent=styles['Normal'],
+                fontSize=8,
+                textColor=colors.black,
+                alignment=1,
+                spaceAfter=8
+            ),
+            'document_title': ParagraphStyle(
+                'DocumentTitle',
+                parent=styles['Title'],
+                fontSize=12,
+                textColor=DARK_BLUE,
+                alignment=1,
+                fontName='Helvetica-Bold',
+                spaceAfter=10,
+                leading=14
+            ),
+            'section_title': ParagraphStyle(
+                'SectionTitle',
+                parent=styles['Heading2'],
+                fontSize=10,
+                spaceAfter=5,
+                spaceBefore=10,
+                textColor=DARK_BLUE,
+                fontName='Helvetica-Bold',
+                backColor=LIGHT_GRAY,
+                borderPadding=3
+            ),
+            'addressee': ParagraphStyle(
+                'AddresseeStyle',
+                parent=styles['Normal'],
+                fontSize=9,
+                textColor=colors.black,
+                spaceAfter=10,
+                leftIndent=0
+            ),
+            'subject': ParagraphStyle(
+                'SubjectStyle',
+                parent=styles['Normal'],
+                fontSize=10,
+                textColor=colors.black,
+                fontName='Helvetica-Bold',
+                spaceAfter=10
+            ),
+            'salutation': ParagraphStyle(
+                'SalutationStyle',
+                parent=styles['Normal'],
+                fontSize=9,
+                textColor=colors.black,
+                spaceAfter=10
+            ),
+            'admission_decision': ParagraphStyle(
+                'AdmissionDecision',
+                parent=styles['Normal'],
+                fontSize=9,
+                textColor=colors.black,
+                spaceAfter=8,
+                leading=11,
+                leftIndent=10,
+                rightIndent=10
+            ),
+            'conditions': ParagraphStyle(
+                'ConditionsStyle',
+                parent=styles['Normal'],
+                fontSize=8,
+                textColor=colors.black,
+                leftIndent=12,
+                bulletIndent=3,
+                spaceAfter=2,
+                leading=10
+            ),
+            'contact': ParagraphStyle(
+                'ContactStyle',
+                parent=styles['Normal'],
+                fontSize=8,
+                textColor=colors.black,
+                spaceAfter=8
+            ),
+            'closing': ParagraphStyle(
+                'ClosingStyle',
+                parent=styles['Normal'],
+                fontSize=9,
+                textColor=colors.black,
+                spaceAfter=10,
+                leading=12
+            ),
+            'footer': ParagraphStyle(
+                'FooterStyle',
+                parent=styles['Normal'],
+                fontSize=7,
+                textColor=colors.grey,
+                alignment=1,  # Center alignment
+                leading=8
+            ),
+        }
+
+    def _compile(self, text, style_name):
+        """Parse static paragraph markup once; returns the arguments to rebuild it"""
+        paragraph = Paragraph(text, self.styles[style_name])
+        return paragraph.text, paragraph.style, paragraph.frags, {}
+
+    @staticmethod
+    def _letterhead_rule():
+        # Horizontal line under letterhead; a new one per letter, as drawing
+        # it sets and then deletes attributes on the flowable
+        rule = Drawing(480, 2)
+        rule.add(Rect(0, 0, 480, 2, fillColor=DARK_BLUE, strokeColor=None))
+        return rule
+
+    @staticmethod
+    def _paragraph(compiled):
+        text, style, frags, layouts = compiled
+        paragraph = CompiledParagraph(text, style, frags=frags)
+        paragraph._layouts = layouts
+        return paragraph
+
+    def _details_table(self, data, col_widths):
+        table = Table(data, colWidths=col_widths)
+        table.setStyle(self.table_styles['details'])
+        return table
+
+    def render(self, application, now=None):
+        """Render the offer letter PDF for an approved application and return its bytes"""
+        now = now or datetime.now()
+        student = application.student
+        styles = self.styles
+        static = self.paragraphs
+        sections = self.section_titles
+
+        # Student supplied fields are escaped before they go into markup
+        name = escape(student.name)
+        course = escape(application.course_applied)
+        reference = f"ADM/{application.id:04d}/{now.year}"
+        academic_year = f"{application.graduation_year}-{application.graduation_year + 1}"
+
+        story = [
+            # LETTERHEAD
+            self._paragraph(static['letterhead']),
+            self._paragraph(static['department']),
+            self._paragraph(static['address']),
+            self._letterhead_rule(),
+            Spacer(1, 15),
+
+            # DOCUMENT TITLE
+            self._paragraph(static['title']),
+        ]
+
+        # Document reference and date
+        ref_table = Table([[f"Reference No: {reference}", f"Date: {now.strftime('%B %d, %Y')}"]],
+                          colWidths=[3*inch, 3*inch])
+        ref_table.setStyle(self.table_styles['reference'])
+        story.append(ref_table)
+        story.append(Spacer(1, 10))
+
+        # ADDRESSEE, SUBJECT AND SALUTATION
+        story.append(Paragraph(
+            f"<b>To:</b><br/>{name}<br/>{escape(student.email)}<br/>{escape(student.phone)}",
+            styles['addressee']
+        ))
+        story.append(Paragraph(f"<b>Subject: Admission Approval for {course}</b>", styles['subject']))
+        story.append(Paragraph("Dear Mr./Ms. " + escape(student.name.split()[-1]) + ",", styles['salutation']))
+
+        # Section 1: STUDENT INFORMATION
+        story.append(self._paragraph(sections[1]))
+        story.append(self._details_table([
+            ['Full Name:', student.name],
+            ['Email Address:', student.email],
+            ['Contact Number:', student.phone],
+            ['Application Reference:', reference]
+        ], [1.5*inch, 4*inch]))
+
+        # Section 2: ADMISSION DECISION
+        story.append(self._paragraph(sections[2]))
+        story.append(Paragraph(
+            f"We are pleased to inform you that your application for admission to <b>{course}</b> "
+            f"for the academic year <b>{academic_year}</b> has been "
+            f"<b>APPROVED</b> by our Admissions Committee.<br/><br/>"
+            f"Your academic credentials and qualifications have been thoroughly reviewed and found to meet "
+            f"our university's admission standards.",
+            styles['admission_decision']
+        ))
+
+        # Section 3: PROGRAM DETAILS
+        story.append(self._paragraph(sections[3]))
+        story.append(self._details_table([
+            ['Program of Study:', application.course_applied],
+            ['Academic Year:', academic_year],
+            ['Duration:', 'As per program curriculum'],
+            ['Campus:', 'Main Campus, Academic City']
+        ], [1.5*inch, 4*inch]))
+
+        # Section 4: ACADEMIC QUALIFICATIONS
+        story.append(self._paragraph(sections[4]))
+        story.append(self._details_table([
+            ['10th Grade Results:', f"{application.tenth_percentage}% from {application.tenth_board}"],
+            ['12th Grade Results:', f"{application.twelfth_percentage}% from {application.twelfth_board}"],
+            ['Previous Qualification:', application.previous_qualification],
+            ['Previous Institution:', application.previous_institution]
+        ], [1.8*inch, 3.7*inch]))
+
+        # Section 5: CONDITIONS AND REQUIREMENTS
+        story.append(self._paragraph(sections[5]))
+        story.extend(self._paragraph(condition) for condition in static['conditions'])
+        story.append(Spacer(1, 8))
+
+        # Section 6: IMPORTANT DEADLINES
+        story.append(self._paragraph(sections[6]))
+        story.append(self._details_table([
+            ['Acceptance Deadline:', (now + timedelta(days=15)).strftime('%B %d, %Y')],
+            ['Document Submission:', (now + timedelta(days=30)).strftime('%B %d, %Y')],
+            ['Fee Payment Deadline:', (now + timedelta(days=45)).strftime('%B %d, %Y')],
+            ['Orientation Date:', 'To be announced separately']
+        ], [2*inch, 3.5*inch]))
+
+        # Section 7: CONTACT INFORMATION
+        story.append(self._paragraph(sections[7]))
+        story.append(self._paragraph(static['contact']))
+
+        # CLOSING
+        story.append(self._paragraph(static['closing']))
+        story.append(self._paragraph(static['sincerely']))
+
+        # SIGNATURES SECTION
+        story.append(Spacer(1, 15))
+        signature_table = Table(SIGNATURE_DATA, colWidths=[2.7*inch, 2.7*inch])
+        signature_table.setStyle(self.table_styles['signature'])
+        story.append(signature_table)
+
+        # FOOTER
+        story.append(Spacer(1, 10))
+        story.append(Paragraph(
+            "This is an official document from UniAdmit University Admissions Office<br/>"
+            "Please retain this letter for your records<br/><br/>"
+            f"Document Generated: {now.strftime('%B %d, %Y at %I:%M %p')}",
+            styles['footer']
+        ))
+
+        buffer = io.BytesIO()
+        doc = SimpleDocTemplate(
+            buffer,
+            pagesize=A4,
+            rightMargin=40,
+            leftMargin=40,
+            topMargin=30,
+            bottomMargin=30
+        )
+        doc.build(story)
+
+        pdf_data = buffer.getvalue()
+        if not pdf_data:
+            raise ValueError("Generated PDF is empty")
+        return pdf_data
+
+
+_template = None
+_template_lock = threading.Lock()
+
+
+def get_offer_letter_template():
+    """Return the process-wide offer letter template, compiling it on first use"""
+    global _template
+    if _template is None:
+        with _template_lock:
+            if _template is None:
+                _template = OfferLetterTemplate()
+    return _template
+
+
+def render_offer_letter(application, now=None):
+    """Render the offer letter PDF for an approved application and return its bytes"""
+    return get_offer_letter_template().render(application, now)
+
+
+def offer_letter_revision(application):
+    """Fingerprint of everything the offer letter shows.
+
+    Any review, edit of the application or change to the student's contact
+    details produces a new revision, so a stale letter is never served.
+    """
+    student = application.student
+    parts = (
+        application.status,
+        application.reviewed_at.isoformat() if application.reviewed_at else '',
+        application.course_applied,
+        application.graduation_year,
+        application.tenth_percentage,
+        application.tenth_board,
+        application.twelfth_percentage,
+        application.twelfth_board,
+        application.previous_qualification,
+        application.previous_institution,
+        student.name,
+        student.email,
+        student.phone,
+    )
+    return hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()[:16]
+
+
+def offer_letter_name(application, now=None):
+    """Cache entry name for the application's current revision issued on ``now``'s day.
+
+    The letter body carries the issue date and the deadlines counted from
+    it, so a letter is only reused on the day it was rendered.
+    """
+    now = now or datetime.now()
+    return f'offer_letter_{application.id}_{offer_letter_revision(application)}_{now:%Y%m%d}.pdf'
+
+
+class OfferLetterCache:
+    """Size-bounded on-disk cache of rendered offer letters.
+
+    Entries are evicted least recently used first once the total size goes
+    over ``max_bytes``. Sizes and use order are kept in memory with a
+    running total, so lookups and eviction never list the directory; it is
+    rescanned every ``rescan_seconds`` to pick up letters other processes
+    have written or removed. A cache hit refreshes the entry's modification
+    time, which a rescan orders by.
+    """
+
+    def __init__(self, root, max_bytes, rescan_seconds=300):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.rescan_seconds = rescan_seconds
+        os.makedirs(self.root, exist_ok=True)
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._total = 0
+        self._scanned_at = None
+
+    def __getstate__(self):
+        # Batch worker processes only write letters; the index stays here
+        return {'root': self.root, 'max_bytes': self.max_bytes, 'rescan_seconds': self.rescan_seconds}
+
+    def __setstate__(self, state):
+        self.__init__(**state)
+
+    def path_for(self, name):
+        return os.path.join(self.root, os.path.basename(name))
+
+    def _refresh(self):
+        """Rebuild the index from the directory if it is due; call with the lock held"""
+        now = time.monotonic()
+        if self._scanned_at is not None and now - self._scanned_at < self.rescan_seconds:
+            return
+        entries = []
+        for entry in os.scandir(self.root):
+            if entry.is_file() and entry.name.startswith('offer_letter_'):
+                stat = entry.stat()
+                entries.append((stat.st_mtime, entry.path, stat.st_size))
+        self._entries = OrderedDict((path, size) for _, path, size in sorted(entries))
+        self._total = sum(self._entries.values())
+        self._scanned_at = now
+
+    def _track(self, path, size):
+        """Record ``path`` as the most recently used entry; call with the lock held"""
+        self._total += size - self._entries.pop(path, 0)
+        self._entries[path] = size
+
+    def _forget(self, path):
+        self._total -= self._entries.pop(path, 0)
+
+    def get(self, name):
+        """Return the path of a cached letter, or None on a miss"""
+        path = self.path_for(name)
+        try:
+            os.utime(path)
+            size = os.stat(path).st_size
+        except FileNotFoundError:
+            with self._lock:
+                self._forget(path)
+            return None
+        with self._lock:
+            self._refresh()
+            self._track(path, size)
+        return path
+
+    def put(self, name, pdf_data):
+        path = self.write(name, pdf_data)
+        self.evict(keep=path)
+        return path
+
+    def write(self, name, pdf_data):
+        """Store a letter without running eviction; batch generation evicts once at the end"""
+        path = self.path_for(name)
+        fd, tmp_path = tempfile.mkstemp(dir=self.root, prefix='.render-')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(pdf_data)
+        os.replace(tmp_path, path)
+        with self._lock:
+            self._track(path, len(pdf_data))
+        return path
+
+    def invalidate(self, name):
+        """Remove one cached letter"""
+        path = self.path_for(name)
+        with self._lock:
+            self._forget(path)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def evict(self, keep=None):
+        """Remove least recently used letters until the total fits in ``max_bytes``"""
+        with self._lock:
+            self._refresh()
+            while self._total > self.max_bytes:
+                # ``keep`` was just used, so it is only first once it is alone
+                path = next(iter(self._entries), keep)
+                if path == keep:
+                    break
+                self._forget(path)
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+
+
+def init_offer_letter_cache(app):
+    root = resolve_storage_path(app, app.config['OFFER_LETTER_CACHE_PATH'])
+    cache = OfferLetterCache(root, app.config['OFFER_LETTER_CACHE_MAX_BYTES'],
+                             app.config['OFFER_LETTER_CACHE_RESCAN_SECONDS'])
+    app.extensions['offer_letter_cache'] = cache
+    return cache
+
+
+def get_offer_letter_cache():
+    return current_app.extensions['offer_letter_cache']
+
+
+def invalidate_offer_letter(application):
+    """Drop today's cached letter before a change to the application.
+
+    Call it before changing the application: the change gives the letter a
+    new revision, so the old entry is unreachable afterwards and would only
+    be removed by eviction.
+    """
+    get_offer_letter_cache().invalidate(offer_letter_name(application))
+    application.admission_letter_path = None
@@ -0,0 +1,115 @@
+import base64
+import json
+from datetime import datetime
+from sqlalchemy import and_, or_
+from sqlalchemy.types import DateTime
+
+
+class InvalidCursor(ValueError):
+    """Raised when a pagination cursor cannot be decoded"""
+
+
+def encode_cursor(direction, values):
+    payload = [direction, [value.isoformat() if isinstance(value, datetime) else value for value in values]]
+    return base64.urlsafe_b64encode(json.dumps(payload, separators=(',', ':')).encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor, order_by):
+    """Return ``(direction, values)`` of a cursor made by ``encode_cursor``"""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        direction, values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+        if direction not in ('after', 'before') or len(values) != len(order_by):
+            raise InvalidCursor('Invalid cursor')
+        return direction, [
+            datetime.fromisoformat(value) if isinstance(column.type, DateTime) else value
+            for column, value in zip(order_by, values)
+        ]
+    except InvalidCursor:
+        raise
+    except (TypeError, ValueError) as e:
+        raise InvalidCursor('Invalid cursor') from e
+
+
+def _beyond(order_by, values, direction):
+    """Rows past ``values`` in the given direction of a descending order.
+
+    The leading column is also bounded on its own, which gives the database a
+    plain range to scan on an index over the order columns.
+    """
+    if direction == 'after':
+        past, past_or_equal = (lambda column, value: column < value), (lambda column, value: column <= value)
+    else:
+        past, past_or_equal = (lambda column, value: column > value), (lambda column, value: column >= value)
+
+    alternatives = [
+        and_(*[column == value for column, value in zip(order_by[:i], values[:i])], past(order_by[i], values[i]))
+        for i in range(len(order_by))
+    ]
+    return and_(past_or_equal(order_by[0], values[0]), or_(*alternatives))
+
+
+class KeysetPage:
+    """One page of a keyset (cursor) paginated query.
+
+    ``next_cursor`` and ``prev_cursor`` are opaque strings to pass back as
+    the ``cursor`` argument, or None at either end of the results.
+    """
+
+    def __init__(self, items, per_page, next_cursor, prev_cursor, total=None):
+        self.items = items
+        self.per_page = per_page
+        self.next_cursor = next_cursor
+        self.prev_cursor = prev_cursor
+        self.total = total
+
+    def pagination(self):
+        pagination = {
+            'per_page': self.per_page,
+            'next_cursor': self.next_cursor,
+            'prev_cursor': self.prev_cursor,
+            'has_next': self.next_cursor is not None,
+            'has_prev': self.prev_cursor is not None
+        }
+        if self.total is not None:
+            pagination['total'] = self.total
+        return pagination
+
+
+def keyset_paginate(query, order_by, per_page, cursor=None, with_total=False):
+    """Page through ``query`` newest first on the ``order_by`` columns.
+
+    ``order_by`` must end in a unique column (the primary key) so every row
+    has its own position. Each page costs one LIMIT query however deep it
+    is; the COUNT query only runs when ``with_total`` is set.
+    """
+    per_page = max(per_page, 1)
+    total = query.order_by(None).count() if with_total else None
+    direction, values = decode_cursor(cursor, order_by) if cursor else ('after', None)
+
+    if values is not None:
+        query = query.filter(_beyond(order_by, values, direction))
+    if direction == 'after':
+        query = query.order_by(*[column.desc() for column in order_by])
+    else:
+        query = query.order_by(*[column.asc() for column in order_by])
+
+    items = query.limit(per_page + 1).all()
+    more = len(items) > per_page
+    items = items[:per_page]
+    if direction == 'before':
+        items.reverse()
+
+    def key(item):
+        return [getattr(item, column.key) for column in order_by]
+
+    # Coming from one side means there is at least the cursor's row on it
+    has_next = more if direction == 'after' else True
+    has_prev = values is not None if direction == 'after' else more
+    return KeysetPage(
+        items,
+        per_page,
+        encode_cursor('after', key(items[-1])) if items and has_next else None,
+        encode_cursor('before', key(items[0])) if items and has_prev else None,
+        total
+    )
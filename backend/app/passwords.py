@@ -0,0 +1,153 @@
+import functools
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from flask import current_app
+from flask_security.utils import config_value, get_hmac, use_double_hash
+from passlib import hash as passlib_hash
+
+# Passwords handed to a hashing worker process at a time
+HASH_CHUNK_SIZE = 8
+
+
+class PasswordHashingBusy(Exception):
+    """Raised when the hashing pool has no free slot in time"""
+
+    def __init__(self, retry_after):
+        super().__init__('Password hashing pool is busy')
+        self.retry_after = retry_after
+
+
+class PasswordHashingPool:
+    """A bounded pool of threads that hash and verify passwords.
+
+    argon2-cffi releases the GIL while it derives a key, so ``workers``
+    threads hash in parallel and never more than that, leaving the other
+    cores (and Argon2's memory) to the rest of the application. Up to
+    ``queue`` more requests wait for a worker; beyond that a request waits
+    at most ``timeout`` seconds for a slot and then gets PasswordHashingBusy,
+    so a login storm is turned away early instead of holding every request
+    thread.
+    """
+
+    def __init__(self, workers, queue, timeout):
+        self.workers = workers
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='password-hashing')
+        self._slots = threading.BoundedSemaphore(workers + queue)
+
+    def run(self, function, *args, **kwargs):
+        if not self._slots.acquire(timeout=self.timeout):
+            raise PasswordHashingBusy(max(1, round(self.timeout)))
+        try:
+            return self._executor.submit(function, *args, **kwargs).result()
+        finally:
+            self._slots.release()
+
+    def map(self, function, *iterables, chunksize=1):
+        """Like ``Executor.map``, but one call at a time, so a bulk job such
+        as an import takes a single worker and queues with the logins"""
+        return [self.run(function, *args) for args in zip(*iterables)]
+
+    def shutdown(self):
+        self._executor.shutdown()
+
+
+def password_hash_settings():
+    """The configured hash scheme and its passlib settings, in a form that
+    can be sent to worker processes"""
+    scheme = config_value('PASSWORD_HASH')
+    prefix = f'{scheme}__'
+    settings = {
+        key[len(prefix):]: value
+        for key, value in config_value('PASSWORD_HASH_PASSLIB_OPTIONS', default={}).items()
+        if key.startswith(prefix)
+    }
+    settings.update(config_value('PASSWORD_HASH_OPTIONS', default={}).get(scheme, {}))
+    return scheme, tuple(sorted(settings.items()))
+
+
+def prepare_password(password):
+    """The secret Flask-Security actually hashes: the password itself, or
+    its HMAC with SECURITY_PASSWORD_SALT"""
+    return get_hmac(password).decode('ascii') if use_double_hash() else password
+
+
+@functools.lru_cache(maxsize=None)
+def _handler(scheme, settings):
+    return getattr(passlib_hash, scheme).using(**dict(settings))
+
+
+def hash_prepared(scheme, settings, secret):
+    """Worker entry point: hash one prepared secret like ``hash_password`` would"""
+    return _handler(scheme, settings).hash(secret)
+
+
+def hash_passwords(passwords, executor=None):
+    """Hash many passwords on ``executor`` if given: a process pool, or the
+    hashing pool.
+
+    The hashes are the same as ``flask_security.hash_password`` produces and
+    are verified by it as usual; only the slow key derivation runs in the
+    workers, which need no app context.
+    """
+    scheme, settings = password_hash_settings()
+    secrets = [prepare_password(password) for password in passwords]
+    if executor is None:
+        return [hash_prepared(scheme, settings, secret) for secret in secrets]
+    return list(executor.map(
+        hash_prepared,
+        [scheme] * len(secrets),
+        [settings] * len(secrets),
+        secrets,
+        chunksize=HASH_CHUNK_SIZE
+    ))
+
+
+def argon2_parameters(options):
+    """Time cost, memory cost (KiB) and parallelism of the passlib options,
+    with passlib's defaults for those left out"""
+    argon2 = passlib_hash.argon2
+    return (
+        options.get('argon2__rounds', argon2.default_rounds),
+        options.get('argon2__memory_cost', argon2.memory_cost),
+        options.get('argon2__parallelism', argon2.parallelism),
+    )
+
+
+def password_context():
+    """Flask-Security's passlib CryptContext"""
+    return current_app.extensions['security'].pwd_context
+
+
+def get_hashing_pool():
+    return current_app.extensions['password_hashing']
+
+
+def hash_password(password):
+    """``flask_security.hash_password``, run on the hashing pool"""
+    options = config_value('PASSWORD_HASH_OPTIONS', default={}).get(config_value('PASSWORD_HASH'), {})
+    return get_hashing_pool().run(password_context().hash, prepare_password(password), **options)
+
+
+def verify_and_update_password(password, user):
+    """Check a password on the hashing pool, like
+    ``flask_security.verify_and_update_password``.
+
+    A hash made with another scheme or older Argon2 parameters is replaced
+    with a current one; the caller commits the user.
+    """
+    context = password_context()
+    secret = get_hmac(password) if use_double_hash(user.password) else password
+    if not get_hashing_pool().run(context.verify, secret, user.password):
+        return False
+    if context.needs_update(user.password):
+        user.password = hash_password(password)
+    return True
+
+
+def init_password_hashing(app):
+    workers = app.config['PASSWORD_HASH_WORKERS'] or max(1, (os.cpu_count() or 1) // 2)
+    pool = PasswordHashingPool(workers, app.config['PASSWORD_HASH_QUEUE'], app.config['PASSWORD_HASH_TIMEOUT'])
+    app.extensions['password_hashing'] = pool
+    return pool
@@ -0,0 +1,157 @@
+import functools
+import threading
+import time
+from collections import OrderedDict, namedtuple
+from itertools import chain
+from flask import current_app, request
+from flask_security import current_user
+from sqlalchemy import event
+
+from app.models import db, Application, CacheGeneration, User
+from app.counters import attributes_changed, upsert_counter
+
+# Generation shared by every cached admin statistics response
+DASHBOARD_GENERATION = 'dashboard'
+
+# Fields shown by the dashboards, beyond the counted ones
+APPLICATION_FIELDS = ('status', 'course_applied', 'date_created', 'student_id')
+USER_FIELDS = ('name', 'email', 'active', 'roles', 'date_created')
+
+CachedResponse = namedtuple('CachedResponse', 'generation expires_at body status mimetype')
+
+
+class ResponseCache:
+    """In-process LRU cache of response bodies with a TTL.
+
+    Memory is bounded by the total size of the cached bodies. Every entry
+    records the data generation it was computed from and is dropped as soon
+    as the generation has moved on, so a change is visible on the next
+    request instead of after the TTL.
+    """
+
+    def __init__(self, ttl, max_bytes):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key, generation):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.generation != generation or entry.expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, generation, body, status, mimetype):
+        if len(body) > self.max_bytes:
+            return
+        entry = CachedResponse(generation, time.monotonic() + self.ttl, body, status, mimetype)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self._size += len(body)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted.body)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def _remove(self, key):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry.body)
+
+
+def current_generation(name=DASHBOARD_GENERATION):
+    value = db.session.query(CacheGeneration.value).filter_by(name=name).scalar()
+    return value or 0
+
+
+def bump_generation(connection, name=DASHBOARD_GENERATION):
+    """Invalidate cached responses built from the data; commits with the caller's transaction"""
+    upsert_counter(connection, CacheGeneration, {'name': name}, 1, column='value')
+
+
+def mark_dashboards_changed(session):
+    """Bump the dashboard generation once the session commits"""
+    session.info['dashboards_changed'] = True
+
+
+def changes_dashboards(session):
+    """Whether a flush touches data the cached statistics are built from"""
+    for obj in chain(session.new, session.deleted):
+        if isinstance(obj, (Application, User)):
+            return True
+    for obj in session.dirty:
+        if isinstance(obj, Application) and attributes_changed(obj, *APPLICATION_FIELDS):
+            return True
+        if isinstance(obj, User) and attributes_changed(obj, *USER_FIELDS):
+            return True
+    return False
+
+
+def mark_dashboards_changed_on_flush(session, flush_context):
+    if changes_dashboards(session):
+        mark_dashboards_changed(session)
+
+
+def bump_generation_after_commit(session):
+    """Bump the generation in a transaction of its own, so the single
+    generation row is locked for one statement instead of every writing
+    request's whole transaction"""
+    if not session.info.pop('dashboards_changed', False):
+        return
+    try:
+        with db.engine.begin() as connection:
+            bump_generation(connection)
+    except Exception as e:
+        # The change is committed; stale statistics expire with the TTL
+        current_app.logger.warning("Could not bump the dashboard generation: %s", e)
+
+
+def forget_dashboard_changes(session):
+    session.info.pop('dashboards_changed', None)
+
+
+def init_response_cache(app):
+    cache = ResponseCache(app.config['RESPONSE_CACHE_TTL'], app.config['RESPONSE_CACHE_MAX_BYTES'])
+    app.extensions['response_cache'] = cache
+    if not event.contains(db.session, 'after_flush', mark_dashboards_changed_on_flush):
+        event.listen(db.session, 'after_flush', mark_dashboards_changed_on_flush)
+        event.listen(db.session, 'after_commit', bump_generation_after_commit)
+        event.listen(db.session, 'after_rollback', forget_dashboard_changes)
+    return cache
+
+
+def cached_admin_response(view):
+    """Serve an admin-only aggregate endpoint from the response cache.
+
+    Entries are keyed by endpoint and query string and shared between
+    admins. Requests from anyone else always reach the view and its access
+    checks. Only successful responses are cached.
+    """
+    @functools.wraps(view)
+    def wrapper(*args, **kwargs):
+        cache = current_app.extensions['response_cache']
+        if not cache.ttl or not current_user.has_role('admin'):
+            return view(*args, **kwargs)
+
+        key = (request.endpoint, request.query_string)
+        generation = current_generation()
+        entry = cache.get(key, generation)
+        if entry is not None:
+            return current_app.response_class(entry.body, status=entry.status, mimetype=entry.mimetype)
+
+        response = current_app.make_response(view(*args, **kwargs))
+        if response.status_code == 200 and not response.is_streamed:
+            cache.put(key, generation, response.get_data(), response.status_code, response.mimetype)
+        return response
+    return wrapper
@@ -1,19 +1,36 @@
-from flask import Blueprint, request, jsonify, current_app, send_file
+from flask import Blueprint, request, jsonify, current_app, send_file, stream_with_context
 from flask_security import current_user, auth_token_required, roles_required
+from werkzeug.exceptions import RequestEntityTooLarge, RequestedRangeNotSatisfiable
 from werkzeug.utils import secure_filename
+from werkzeug.wsgi import wrap_file
 from app.models import Application, User, db
+from app.documents import (
+    DOCUMENT_TYPES, document_mimetype, iter_base64_json, open_document, store_document,
+    store_spooled_document
+)
+from app.uploads import parse_json_submission, parse_multipart_submission
+from app.offer_letters import (
+    get_offer_letter_cache, invalidate_offer_letter, offer_letter_name, render_offer_letter
+)
+from app.offer_letter_batch import (
+    iter_offer_letter_zip, offer_letter_snapshot, select_approved_applications, store_offer_letters
+)
+from app.statistics import application_breakdowns, application_summary
+from app.response_cache import cached_admin_response
+from app.pagination import InvalidCursor, keyset_paginate
+from app.search import InvalidFilter, filter_applications, search_filters
+from app.bulk_actions import delete_applications, review_applications
+from app.exports import EXPORT_FORMATS, export_query, iter_export, iter_records
+from app.serializers import (
+    ADMIN_APPLICATION_FIELDS, ADMIN_SEARCH_FIELDS, EXPORT_FIELDS, STUDENT_APPLICATION_FIELDS, InvalidFields
+)
 from datetime import datetime, timezone, timedelta
 import base64
 import binascii
+import functools
+import hashlib
+import operator
 import os
-import io
-from reportlab.lib.pagesizes import letter, A4
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
-from reportlab.lib import colors
-from reportlab.graphics.shapes import Drawing, Rect
-from reportlab.graphics import renderPDF
 
 application_bp = Blueprint('application', __name__)
 
@@ -117,10 +134,8 @@ def save_draft():
                 state=data.get('state') or 'Not Specified',
                 district=data.get('district') or 'Not Specified',
                 pincode=data.get('pincode') or '000000',
-                # Provide dummy binary data for documents (will be updated later)
-                degree_certificate=b'draft',
+                # Documents are attached on submission
                 degree_certificate_filename='draft.pdf',
-                id_proof=b'draft',
                 id_proof_filename='draft.pdf',
                 status='draft'
             )
@@ -197,33 +212,30 @@ def submit_application():
             return jsonify({'error': 'You already have a pending application'}), 400
         
         # Get data from request - handle both JSON and form data
-        if request.is_json:
+        data = None
+        uploaded_documents = None
+        try:
+            if not request.is_json:
+                # Handle form data (multipart/form-data). Files are streamed to
+                # spool files and validated while the body is parsed.
+                data, uploaded_documents = parse_multipart_submission()
+            elif current_app.config['STREAMING_JSON_UPLOADS']:
+                # Base64 documents are decoded while the JSON body is read
+                parsed = parse_json_submission()
+                if parsed is not None:
+                    data, uploaded_documents = parsed
+        except RequestEntityTooLarge:
+            return jsonify({
+                'error': 'File too large',
+                'message': 'The uploaded file exceeds the maximum size limit of 16MB'
+            }), 413
+        except ValueError as e:
+            print(f"ERROR: File upload failed: {e}")
+            return jsonify({'error': str(e)}), 400
+        
+        if request.is_json and uploaded_documents is None:
             data = request.get_json()
-            print(f"Received JSON data with keys: {list(data.keys()) if data else 'None'}")
-        else:
-            # Handle form data (multipart/form-data)
-            data = request.form.to_dict()
-            print(f"Received form data with keys: {list(data.keys()) if data else 'None'}")
-            
-            # Handle file uploads from form data
-            files = request.files
-            if 'degree_certificate' in files:
-                file = files['degree_certificate']
-                if file and file.filename:
-                    import base64
-                    data['degree_certificate'] = {
-                        'data': base64.b64encode(file.read()).decode('utf-8'),
-                        'filename': file.filename
-                    }
-            
-            if 'id_proof' in files:
-                file = files['id_proof']
-                if file and file.filename:
-                    import base64
-                    data['id_proof'] = {
-                        'data': base64.b64encode(file.read()).decode('utf-8'),
-                        'filename': file.filename
-                    }
+        print(f"Received data with keys: {list(data.keys()) if data else 'None'}")
         
         if not data:
             print("ERROR: No data provided")
@@ -344,17 +356,28 @@ def submit_application():
         
         # Process file uploads with error handling
         print("Processing file uploads...")
-        try:
-            degree_cert_data, degree_cert_filename = process_file_upload(
-                data.get('degree_certificate'), 'degree_certificate'
-            )
-            id_proof_data, id_proof_filename = process_file_upload(
-                data.get('id_proof'), 'id_proof'
-            )
-            print(f"File processing successful: {len(degree_cert_data)} bytes, {len(id_proof_data)} bytes")
-        except ValueError as e:
-            print(f"ERROR: File processing failed: {e}")
-            return jsonify({'error': str(e)}), 400
+        if uploaded_documents is None:
+            try:
+                degree_cert_data, degree_cert_filename = process_file_upload(
+                    data.get('degree_certificate'), 'degree_certificate'
+                )
+                id_proof_data, id_proof_filename = process_file_upload(
+                    data.get('id_proof'), 'id_proof'
+                )
+                print(f"File processing successful: {len(degree_cert_data)} bytes, {len(id_proof_data)} bytes")
+            except ValueError as e:
+                print(f"ERROR: File processing failed: {e}")
+                return jsonify({'error': str(e)}), 400
+        else:
+            print(f"Streamed files: {[(spool.filename, spool.size) for spool in uploaded_documents.values()]}")
+        
+        def attach_uploaded_documents(target):
+            if uploaded_documents is None:
+                store_document(target, 'degree_certificate', degree_cert_data, degree_cert_filename)
+                store_document(target, 'id_proof', id_proof_data, id_proof_filename)
+            else:
+                for document_type in DOCUMENT_TYPES:
+                    store_spooled_document(target, document_type, uploaded_documents.get(document_type))
         
         if draft:
             print("Updating existing draft...")
@@ -376,10 +399,7 @@ def submit_application():
                 draft.status = 'pending'
                 
                 # Update file uploads
-                draft.degree_certificate = degree_cert_data
-                draft.degree_certificate_filename = degree_cert_filename
-                draft.id_proof = id_proof_data
-                draft.id_proof_filename = id_proof_filename
+                attach_uploaded_documents(draft)
                 
                 print("Committing draft update to database...")
                 db.session.commit()
@@ -408,12 +428,9 @@ def submit_application():
                     state=data.get('state'),
                     district=data.get('district'),
                     pincode=data.get('pincode'),
-                    status='pending',
-                    degree_certificate=degree_cert_data,
-                    degree_certificate_filename=degree_cert_filename,
-                    id_proof=id_proof_data,
-                    id_proof_filename=id_proof_filename
+                    status='pending'
                 )
+                attach_uploaded_documents(application)
                 
                 print("Adding new application to database...")
                 db.session.add(application)
@@ -475,44 +492,17 @@ def get_application_status():
 def get_user_applications():
     """Get all applications for the current user"""
     try:
-        applications = Application.query.filter_by(student_id=current_user.id).all()
-        
-        applications_list = []
-        for app in applications:
-            app_data = {
-                'id': app.id,
-                'course_applied': app.course_applied,
-                'status': app.status,
-                'tenth_percentage': app.tenth_percentage,
-                'tenth_board': app.tenth_board,
-                'twelfth_percentage': app.twelfth_percentage,
-                'twelfth_board': app.twelfth_board,
-                'previous_qualification': app.previous_qualification,
-                'previous_institution': app.previous_institution,
-                'graduation_year': app.graduation_year,
-                'date_created': app.date_created.isoformat(),
-                'review_comments': app.review_comments,
-                'reviewed_at': app.reviewed_at.isoformat() if app.reviewed_at else None,
-                # Add address fields
-                'address': app.address,
-                'country': app.country,
-                'state': app.state,
-                'district': app.district,
-                'pincode': app.pincode,
-                # Add document info
-                'degree_certificate_filename': app.degree_certificate_filename,
-                'id_proof_filename': app.id_proof_filename,
-                'has_degree_certificate': bool(app.degree_certificate),
-                'has_id_proof': bool(app.id_proof)
-            }
-            
-            if app.reviewer:
-                app_data['reviewed_by'] = app.reviewer.name
-            
-            applications_list.append(app_data)
+        fields = STUDENT_APPLICATION_FIELDS.parse(request.args.get('fields'))
+        applications = Application.query.filter_by(student_id=current_user.id).options(
+            *STUDENT_APPLICATION_FIELDS.load_options(fields)
+        ).all()
+        
+        applications_list = STUDENT_APPLICATION_FIELDS.serialize_many(applications, fields)
         
         return jsonify({'applications': applications_list}), 200
         
+    except InvalidFields as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to retrieve applications', 'details': str(e)}), 500
 
@@ -621,65 +611,31 @@ def admin_list_all_applications():
         page = int(request.args.get('page', 1))
         per_page = int(request.args.get('per_page', 10))
         
-        # Build query
-        query = Application.query
+        # Select only the columns of the requested fields (document blobs
+        # stay deferred; only their sizes are selected)
+        fields = ADMIN_APPLICATION_FIELDS.parse(request.args.get('fields'))
+        query = Application.query.options(*ADMIN_APPLICATION_FIELDS.load_options(fields))
         
         if status:
             query = query.filter_by(status=status)
         
-        # Paginate results
-        applications = query.paginate(
-            page=page, 
-            per_page=per_page, 
-            error_out=False
-        )
-        
-        applications_list = []
-        for app in applications.items:
-            app_data = {
-                'id': app.id,
-                'course_applied': app.course_applied,
-                'status': app.status,
-                'tenth_percentage': app.tenth_percentage,
-                'tenth_board': app.tenth_board,
-                'twelfth_percentage': app.twelfth_percentage,
-                'twelfth_board': app.twelfth_board,
-                'previous_qualification': app.previous_qualification,
-                'previous_institution': app.previous_institution,
-                'graduation_year': app.graduation_year,
-                'date_created': app.date_created.isoformat(),
-                'review_comments': app.review_comments,
-                'reviewed_at': app.reviewed_at.isoformat() if app.reviewed_at else None,
-                # Add address fields
-                'address': app.address,
-                'country': app.country,
-                'state': app.state,
-                'district': app.district,
-                'pincode': app.pincode,
-                # Add document info (filenames only, not the binary data)
-                'degree_certificate_filename': app.degree_certificate_filename,
-                'id_proof_filename': app.id_proof_filename,
-                'has_degree_certificate': bool(app.degree_certificate),
-                'has_id_proof': bool(app.id_proof),
-                'student': {
-                    'id': app.student.id,
-                    'name': app.student.name,
-                    'email': app.student.email,
-                    'phone': app.student.phone
-                }
-            }
-            
-            if app.reviewer:
-                app_data['reviewed_by'] = {
-                    'name': app.reviewer.name,
-                    'email': app.reviewer.email
-                }
-            
-            applications_list.append(app_data)
-        
-        return jsonify({
-            'applications': applications_list,
-            'pagination': {
+        # Paginate results: by cursor when one is given (even empty, for the
+        # first page), otherwise by page number
+        order_by = (Application.date_created, Application.id)
+        if 'cursor' in request.args:
+            applications = keyset_paginate(
+                query, order_by, per_page,
+                cursor=request.args.get('cursor'),
+                with_total=request.args.get('include_total', 'false').lower() == 'true'
+            )
+            pagination = applications.pagination()
+        else:
+            applications = query.order_by(*[column.desc() for column in order_by]).paginate(
+                page=page, 
+                per_page=per_page, 
+                error_out=False
+            )
+            pagination = {
                 'page': page,
                 'per_page': per_page,
                 'total': applications.total,
@@ -687,8 +643,16 @@ def admin_list_all_applications():
                 'has_next': applications.has_next,
                 'has_prev': applications.has_prev
             }
+        
+        applications_list = ADMIN_APPLICATION_FIELDS.serialize_many(applications.items, fields)
+        
+        return jsonify({
+            'applications': applications_list,
+            'pagination': pagination
         }), 200
         
+    except (InvalidCursor, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to retrieve applications', 'details': str(e)}), 500
 
@@ -714,6 +678,7 @@ def admin_review_application(application_id):
         if action not in ['approve', 'reject']:
             return jsonify({'error': 'Action must be approve or reject'}), 400
         
+        invalidate_offer_letter(application)
         application.status = 'approved' if action == 'approve' else 'rejected'
         application.reviewer_id = current_user.id
         application.review_comments = comments
@@ -738,6 +703,84 @@ def admin_review_application(application_id):
         current_app.logger.error(f"Application review failed for ID {application_id}: {str(e)}")
         return jsonify({'error': 'Application review failed', 'details': str(e)}), 500
 
+def set_document_cache_headers(response):
+    """Let only the requesting browser cache a document, revalidating by ETag"""
+    response.cache_control.private = True
+    max_age = current_app.config['DOCUMENT_CACHE_MAX_AGE']
+    if max_age:
+        response.cache_control.max_age = max_age
+    else:
+        response.cache_control.no_cache = True
+
+def send_application_document(application, document_type):
+    """Build the response for a document view/download request"""
+    if document_type not in DOCUMENT_TYPES:
+        return jsonify({'error': 'Invalid document type'}), 400
+    
+    document_filename = getattr(application, f'{document_type}_filename')
+    
+    # Get the action parameter (view or download)
+    action = request.args.get('action', 'view')
+    
+    if action == 'base64':
+        file_obj = open_document(application, document_type)
+        if file_obj is None:
+            return jsonify({'error': 'Document not found'}), 404
+        
+        # Return base64 encoded data for preview, encoded as it is sent
+        return current_app.response_class(
+            iter_base64_json(file_obj, {
+                'filename': document_filename,
+                'content_type': 'application/octet-stream'
+            }, 'data'),
+            mimetype='application/json'
+        )
+    
+    # Revalidating an unchanged document never touches the document store
+    ref = getattr(application, f'{document_type}_ref')
+    if ref and request.if_none_match.contains_weak(ref):
+        response = current_app.response_class(status=304)
+        response.set_etag(ref)
+        set_document_cache_headers(response)
+        return response
+    
+    # Return file for download/view, streamed from the document store
+    file_obj = open_document(application, document_type)
+    if file_obj is None:
+        return jsonify({'error': 'Document not found'}), 404
+    
+    if ref:
+        etag = ref
+        size = getattr(application, f'{document_type}_size')
+        if size is None:
+            size = file_obj.seek(0, os.SEEK_END)
+            file_obj.seek(0)
+    else:
+        # Legacy inline document: hash it here, it is already in memory
+        etag = hashlib.sha256(file_obj.getbuffer()).hexdigest()
+        size = file_obj.getbuffer().nbytes
+    
+    response = current_app.response_class(
+        wrap_file(request.environ, file_obj),
+        mimetype=document_mimetype(application, document_type),
+        direct_passthrough=True
+    )
+    response.content_length = size
+    response.headers.set(
+        'Content-Disposition',
+        'attachment' if action == 'download' else 'inline',
+        filename=document_filename
+    )
+    response.set_etag(etag)
+    set_document_cache_headers(response)
+    
+    # Answers If-None-Match with 304 and Range requests with 206
+    try:
+        return response.make_conditional(request, accept_ranges=True, complete_length=size)
+    except RequestedRangeNotSatisfiable as e:
+        file_obj.close()
+        return e.get_response()
+
 @application_bp.route('/admin/document/<int:application_id>/<document_type>', methods=['GET'])
 @auth_token_required
 @roles_required('admin')
@@ -748,55 +791,7 @@ def admin_view_document(application_id, document_type):
         if not application:
             return jsonify({'error': 'Application not found'}), 404
         
-        # Map document types to database fields
-        document_fields = {
-            'degree_certificate': ('degree_certificate', 'degree_certificate_filename'),
-            'id_proof': ('id_proof', 'id_proof_filename')
-        }
-        
-        if document_type not in document_fields:
-            return jsonify({'error': 'Invalid document type'}), 400
-        
-        data_field, filename_field = document_fields[document_type]
-        document_data = getattr(application, data_field)
-        document_filename = getattr(application, filename_field)
-        
-        if not document_data:
-            return jsonify({'error': 'Document not found'}), 404
-        
-        # Get the action parameter (view or download)
-        action = request.args.get('action', 'view')
-        
-        if action == 'base64':
-            # Return base64 encoded data for preview
-            encoded_data = base64.b64encode(document_data).decode('utf-8')
-            return jsonify({
-                'filename': document_filename,
-                'data': encoded_data,
-                'content_type': 'application/octet-stream'
-            })
-        else:
-            # Return file for download/view
-            file_obj = io.BytesIO(document_data)
-            
-            # Determine content type based on file extension
-            file_ext = document_filename.lower().split('.')[-1] if '.' in document_filename else ''
-            content_type = {
-                'pdf': 'application/pdf',
-                'jpg': 'image/jpeg',
-                'jpeg': 'image/jpeg',
-                'png': 'image/png',
-                'gif': 'image/gif',
-                'doc': 'application/msword',
-                'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-            }.get(file_ext, 'application/octet-stream')
-            
-            return send_file(
-                file_obj,
-                as_attachment=(action == 'download'),
-                download_name=document_filename,
-                mimetype=content_type
-            )
+        return send_application_document(application, document_type)
     
     except Exception as e:
         current_app.logger.error(f"Document viewing failed for application {application_id}, document {document_type}: {str(e)}")
@@ -816,55 +811,7 @@ def view_document(application_id, document_type):
         if not application:
             return jsonify({'error': 'Application not found or access denied'}), 404
         
-        # Map document types to database fields
-        document_fields = {
-            'degree_certificate': ('degree_certificate', 'degree_certificate_filename'),
-            'id_proof': ('id_proof', 'id_proof_filename')
-        }
-        
-        if document_type not in document_fields:
-            return jsonify({'error': 'Invalid document type'}), 400
-        
-        data_field, filename_field = document_fields[document_type]
-        document_data = getattr(application, data_field)
-        document_filename = getattr(application, filename_field)
-        
-        if not document_data:
-            return jsonify({'error': 'Document not found'}), 404
-        
-        # Get the action parameter (view or download)
-        action = request.args.get('action', 'view')
-        
-        if action == 'base64':
-            # Return base64 encoded data for preview
-            encoded_data = base64.b64encode(document_data).decode('utf-8')
-            return jsonify({
-                'filename': document_filename,
-                'data': encoded_data,
-                'content_type': 'application/octet-stream'
-            })
-        else:
-            # Return file for download/view
-            file_obj = io.BytesIO(document_data)
-            
-            # Determine content type based on file extension
-            file_ext = document_filename.lower().split('.')[-1] if '.' in document_filename else ''
-            content_type = {
-                'pdf': 'application/pdf',
-                'jpg': 'image/jpeg',
-                'jpeg': 'image/jpeg',
-                'png': 'image/png',
-                'gif': 'image/gif',
-                'doc': 'application/msword',
-                'docx': 'application/vnd.openxmlformats-officedocument.wordprocessingml.document'
-            }.get(file_ext, 'application/octet-stream')
-            
-            return send_file(
-                file_obj,
-                as_attachment=(action == 'download'),
-                download_name=document_filename,
-                mimetype=content_type
-            )
+        return send_application_document(application, document_type)
     
     except Exception as e:
         current_app.logger.error(f"User document viewing failed for application {application_id}, document {document_type}: {str(e)}")
@@ -885,473 +832,125 @@ def download_offer_letter(application_id):
         if not application:
             return jsonify({'error': 'Approved application not found or access denied'}), 404
         
-        # Generate offer letter PDF
-        buffer = io.BytesIO()
+        # Serve the cached letter for this revision, rendering it on a miss
+        cache = get_offer_letter_cache()
+        now = datetime.now()
+        letter_name = offer_letter_name(application, now)
+        letter_path = cache.get(letter_name)
         
-        doc = SimpleDocTemplate(
-            buffer, 
-            pagesize=A4,
-            rightMargin=40,
-            leftMargin=40,
-            topMargin=30,
-            bottomMargin=30
-        )
-        
-        styles = getSampleStyleSheet()
-        story = []
-        
-        # Professional color scheme
-        dark_blue = colors.Color(0.2, 0.2, 0.4)
-        light_gray = colors.Color(0.95, 0.95, 0.95)
-        
-        # Enhanced typography styles
-        letterhead_style = ParagraphStyle(
-            'Letterhead',
-            parent=styles['Heading1'],
-            fontSize=18,
-            spaceAfter=5,
-            textColor=dark_blue,
-            alignment=1,
-            fontName='Helvetica-Bold',
-            letterSpacing=1
-        )
+        if letter_path is None:
+            pdf_data = render_offer_letter(application, now)
+            letter_path = cache.put(letter_name, pdf_data)
+            print(f"PDF generated successfully for application {application_id}, size: {len(pdf_data)} bytes")
         
-        department_style = ParagraphStyle(
-            'Department',
-            parent=styles['Normal'],
-            fontSize=10,
-            spaceAfter=20,
-            textColor=colors.black,
-            alignment=1,
-            fontName='Helvetica',
-            letterSpacing=0.5
-        )
-        
-        document_title_style = ParagraphStyle(
-            'DocumentTitle',
-            parent=styles['Heading1'],
-            fontSize=16,
-            spaceAfter=30,
-            spaceBefore=20,
-            textColor=colors.black,
-            alignment=1,
-            fontName='Helvetica-Bold',
-            letterSpacing=2
-        )
-        
-        section_title_style = ParagraphStyle(
-            'SectionTitle',
-            parent=styles['Heading2'],
-            fontSize=10,
-            spaceAfter=5,
-            spaceBefore=10,
-            textColor=dark_blue,
-            fontName='Helvetica-Bold',
-            backColor=light_gray,
-            borderPadding=3
-        )
-        
-        # LETTERHEAD
-        story.append(Paragraph("UNIADMIT UNIVERSITY", letterhead_style))
-        story.append(Paragraph("OFFICE OF ADMISSIONS", department_style))
-        
-        # University Address - reduced spacing
-        address_style = ParagraphStyle(
-            'AddressStyle',
-            parent=styles['Normal'],
-            fontSize=8,
-            textColor=colors.black,
-            alignment=1,
-            spaceAfter=8
-        )
-        story.append(Paragraph("123 Education Avenue, Academic City, State 12345<br/>Phone: +1-555-0123 | Email: admissions@uniadmit.edu", address_style))
-        
-        # Horizontal line under letterhead
-        line = Drawing(480, 2)
-        line.add(Rect(0, 0, 480, 2, fillColor=dark_blue, strokeColor=None))
-        story.append(line)
-        story.append(Spacer(1, 15))
-        
-        # DOCUMENT TITLE
-        document_title_style = ParagraphStyle(
-            'DocumentTitle',
-            parent=styles['Title'],
-            fontSize=12,
-            textColor=dark_blue,
-            alignment=1,
-            fontName='Helvetica-Bold',
-            spaceAfter=10,
-            leading=14
-        )
-        story.append(Paragraph("OFFICIAL LETTER OF ADMISSION", document_title_style))
-        
-        # Document reference and date - reduced spacing
-        ref_date_data = [
-            [f"Reference No: ADM/{application.id:04d}/{datetime.now().year}", f"Date: {datetime.now().strftime('%B %d, %Y')}"]
-        ]
-        ref_table = Table(ref_date_data, colWidths=[3*inch, 3*inch])
-        ref_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (0, 0), 'LEFT'),
-            ('ALIGN', (1, 0), (1, 0), 'RIGHT'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 5),
-        ]))
-        story.append(ref_table)
-        story.append(Spacer(1, 10))
-        
-        # ADDRESSEE SECTION - reduced spacing
-        addressee_style = ParagraphStyle(
-            'AddresseeStyle',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=colors.black,
-            spaceAfter=10,
-            leftIndent=0
-        )
-        
-        story.append(Paragraph(f"<b>To:</b><br/>{application.student.name}<br/>{application.student.email}<br/>{application.student.phone}", addressee_style))
-        
-        # SUBJECT LINE - reduced spacing
-        subject_style = ParagraphStyle(
-            'SubjectStyle',
-            parent=styles['Normal'],
-            fontSize=10,
-            textColor=colors.black,
-            fontName='Helvetica-Bold',
-            spaceAfter=10
-        )
-        story.append(Paragraph(f"<b>Subject: Admission Approval for {application.course_applied}</b>", subject_style))
-        
-        # SALUTATION - reduced spacing
-        salutation_style = ParagraphStyle(
-            'SalutationStyle',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=colors.black,
-            spaceAfter=10
-        )
-        story.append(Paragraph("Dear Mr./Ms. " + application.student.name.split()[-1] + ",", salutation_style))
-        
-        # MAIN CONTENT SECTIONS
-        
-        # Section 1: STUDENT INFORMATION
-        story.append(Paragraph("1. STUDENT INFORMATION", section_title_style))
-        student_data = [
-            ['Full Name:', application.student.name],
-            ['Email Address:', application.student.email],
-            ['Contact Number:', application.student.phone],
-            ['Application Reference:', f"ADM/{application.id:04d}/{datetime.now().year}"]
-        ]
-        
-        student_table = Table(student_data, colWidths=[1.5*inch, 4*inch])
-        student_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LINEBELOW', (0, 0), (-1, -1), 0.5, colors.lightgrey),
-        ]))
-        story.append(student_table)
-        
-        # Section 2: ADMISSION DECISION - reduced spacing
-        admission_decision_style = ParagraphStyle(
-            'AdmissionDecision',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=colors.black,
-            spaceAfter=8,
-            leading=11,
-            leftIndent=10,
-            rightIndent=10
-        )
-        
-        story.append(Paragraph("2. ADMISSION DECISION", section_title_style))
-        story.append(Paragraph(
-            f"We are pleased to inform you that your application for admission to <b>{application.course_applied}</b> "
-            f"for the academic year <b>{application.graduation_year}-{application.graduation_year + 1}</b> has been "
-            f"<b>APPROVED</b> by our Admissions Committee.<br/><br/>"
-            f"Your academic credentials and qualifications have been thoroughly reviewed and found to meet "
-            f"our university's admission standards.",
-            admission_decision_style
-        ))
-        
-        # Section 3: PROGRAM DETAILS
-        story.append(Paragraph("3. PROGRAM DETAILS", section_title_style))
-        program_data = [
-            ['Program of Study:', application.course_applied],
-            ['Academic Year:', f"{application.graduation_year}-{application.graduation_year + 1}"],
-            ['Duration:', 'As per program curriculum'],
-            ['Campus:', 'Main Campus, Academic City']
-        ]
-        
-        program_table = Table(program_data, colWidths=[1.5*inch, 4*inch])
-        program_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LINEBELOW', (0, 0), (-1, -1), 0.5, colors.lightgrey),
-        ]))
-        story.append(program_table)
-        
-        # Section 4: ACADEMIC QUALIFICATIONS
-        story.append(Paragraph("4. ACADEMIC QUALIFICATIONS REVIEWED", section_title_style))
-        academic_data = [
-            ['10th Grade Results:', f"{application.tenth_percentage}% from {application.tenth_board}"],
-            ['12th Grade Results:', f"{application.twelfth_percentage}% from {application.twelfth_board}"],
-            ['Previous Qualification:', application.previous_qualification],
-            ['Previous Institution:', application.previous_institution]
-        ]
-        
-        academic_table = Table(academic_data, colWidths=[1.8*inch, 3.7*inch])
-        academic_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LINEBELOW', (0, 0), (-1, -1), 0.5, colors.lightgrey),
-        ]))
-        story.append(academic_table)
-        
-        # Section 5: CONDITIONS AND REQUIREMENTS
-        story.append(Paragraph("5. CONDITIONS AND NEXT STEPS", section_title_style))
-        
-        conditions_style = ParagraphStyle(
-            'ConditionsStyle',
-            parent=styles['Normal'],
-            fontSize=8,
-            textColor=colors.black,
-            leftIndent=12,
-            bulletIndent=3,
-            spaceAfter=2,
-            leading=10
-        )
-        
-        conditions_text = [
-            "a) Accept this admission offer through the student portal within <b>15 calendar days</b> from the date of this letter.",
-            "b) Complete the fee payment process as outlined in the Fee Structure document (to be provided separately).",
-            "c) Submit original academic documents for verification to the Registrar's Office.",
-            "d) Complete medical examination and submit health clearance certificate.",
-            "e) Attend the mandatory orientation program scheduled before commencement of classes.",
-            "f) Comply with all university policies and regulations as outlined in the Student Handbook."
-        ]
-        
-        for condition in conditions_text:
-            story.append(Paragraph(condition, conditions_style))
-        
-        story.append(Spacer(1, 8))
-        
-        # Section 6: IMPORTANT DEADLINES
-        story.append(Paragraph("6. IMPORTANT DEADLINES", section_title_style))
-        
-        deadlines_data = [
-            ['Acceptance Deadline:', (datetime.now() + timedelta(days=15)).strftime('%B %d, %Y')],
-            ['Document Submission:', (datetime.now() + timedelta(days=30)).strftime('%B %d, %Y')],
-            ['Fee Payment Deadline:', (datetime.now() + timedelta(days=45)).strftime('%B %d, %Y')],
-            ['Orientation Date:', 'To be announced separately']
-        ]
-        
-        deadlines_table = Table(deadlines_data, colWidths=[2*inch, 3.5*inch])
-        deadlines_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-            ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-            ('FONTNAME', (1, 0), (1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 3),
-            ('TOPPADDING', (0, 0), (-1, -1), 3),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-            ('LINEBELOW', (0, 0), (-1, -1), 0.5, colors.lightgrey),
-        ]))
-        story.append(deadlines_table)
-        
-        # Section 7: CONTACT INFORMATION
-        story.append(Paragraph("7. CONTACT INFORMATION", section_title_style))
-        
-        contact_style = ParagraphStyle(
-            'ContactStyle',
-            parent=styles['Normal'],
-            fontSize=8,
-            textColor=colors.black,
-            spaceAfter=8
-        )
-        
-        story.append(Paragraph(
-            "For any queries or assistance regarding your admission, please contact:<br/><br/>"
-            "<b>Admissions Office</b><br/>"
-            "Phone: +1-555-0123 | Email: admissions@uniadmit.edu<br/>"
-            "Office Hours: Monday to Friday, 9:00 AM to 5:00 PM",
-            contact_style
-        ))
-        
-        # CLOSING - reduced spacing
-        closing_style = ParagraphStyle(
-            'ClosingStyle',
-            parent=styles['Normal'],
-            fontSize=9,
-            textColor=colors.black,
-            spaceAfter=10,
-            leading=12
-        )
-        
-        story.append(Paragraph(
-            "We congratulate you on this achievement and look forward to welcoming you to the UniAdmit University community. "
-            "We are confident that you will make significant contributions to our academic environment.",
-            closing_style
-        ))
-        
-        story.append(Paragraph("Sincerely,", closing_style))
-        
-        # SIGNATURES SECTION - reduced spacing
-        story.append(Spacer(1, 15))
+        if application.admission_letter_path != letter_name:
+            application.admission_letter_path = letter_name
+            db.session.commit()
         
-        signature_style = ParagraphStyle(
-            'SignatureStyle',
-            parent=styles['Normal'],
-            fontSize=8,
-            textColor=colors.black,
-            leading=10
-        )
+        filename = f"offer_letter_{application.student.name.replace(' ', '_')}_{application.id}.pdf"
         
-        # Create signature table - reduced spacing
-        signature_data = [
-            ['', ''],
-            ['_________________________', '_________________________'],
-            ['Dr. Sarah Johnson', 'Prof. Michael Chen'],
-            ['Director of Admissions', 'Registrar'],
-            ['UniAdmit University', 'UniAdmit University']
-        ]
-        
-        signature_table = Table(signature_data, colWidths=[2.7*inch, 2.7*inch])
-        signature_table.setStyle(TableStyle([
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 0), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
-            ('TOPPADDING', (0, 0), (-1, -1), 2),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
-        story.append(signature_table)
-        
-        # FOOTER - reduced spacing
-        story.append(Spacer(1, 10))
-        
-        footer_style = ParagraphStyle(
-            'FooterStyle',
-            parent=styles['Normal'],
-            fontSize=7,
-            textColor=colors.grey,
-            alignment=1,  # Center alignment
-            leading=8
+        return send_file(
+            letter_path,
+            as_attachment=True,
+            download_name=filename,
+            mimetype='application/pdf'
         )
         
-        story.append(Paragraph(
-            "This is an official document from UniAdmit University Admissions Office<br/>"
-            "Please retain this letter for your records<br/><br/>"
-            f"Document Generated: {datetime.now().strftime('%B %d, %Y at %I:%M %p')}",
-            footer_style
-        ))
+    except Exception as e:
+        current_app.logger.error(f"Offer letter generation failed for application {application_id}: {str(e)}")
+        return jsonify({'error': 'Failed to generate offer letter', 'details': str(e)}), 500
+
+@application_bp.route('/admin/offer-letters/batch', methods=['POST'])
+@auth_token_required
+@roles_required('admin')
+def admin_batch_offer_letters():
+    """Generate offer letters for approved applications in bulk (admin only)"""
+    try:
+        data = request.get_json() or {}
+        application_ids = data.get('application_ids', [])
+        course = data.get('course')
+        start_date = data.get('start_date')
+        end_date = data.get('end_date')
+        output = data.get('output', 'zip')  # 'zip' or 'store'
         
-        # Build PDF
-        doc.build(story)
-        buffer.seek(0)
+        if not (application_ids or course or start_date or end_date):
+            return jsonify({'error': 'Provide application_ids, course or a date range'}), 400
         
-        # Get the PDF data
-        pdf_data = buffer.getvalue()
-        pdf_size = len(pdf_data)
+        if output not in ['zip', 'store']:
+            return jsonify({'error': 'Output must be zip or store'}), 400
         
-        print(f"PDF generated successfully for application {application_id}, size: {pdf_size} bytes")
+        if not isinstance(application_ids, list):
+            return jsonify({'error': 'application_ids must be a list of integers'}), 400
+        try:
+            application_ids = [int(application_id) for application_id in application_ids]
+        except (TypeError, ValueError):
+            return jsonify({'error': 'application_ids must be a list of integers'}), 400
         
-        if pdf_size == 0:
-            raise ValueError("Generated PDF is empty")
+        try:
+            applications = select_approved_applications(application_ids, course, start_date, end_date)
+        except ValueError:
+            return jsonify({'error': 'Invalid date format. Use YYYY-MM-DD'}), 400
         
-        buffer.close()
+        snapshots = [offer_letter_snapshot(application) for application in applications]
         
-        filename = f"offer_letter_{application.student.name.replace(' ', '_')}_{application.id}.pdf"
+        if not snapshots:
+            return jsonify({'error': 'No approved applications found'}), 404
         
-        # Create a new BytesIO object with the PDF data
-        pdf_buffer = io.BytesIO(pdf_data)
+        if output == 'store':
+            generated = store_offer_letters(snapshots)
+            return jsonify({
+                'message': 'Offer letters generated successfully',
+                'generated': generated
+            }), 200
         
-        return send_file(
-            pdf_buffer,
-            as_attachment=True,
-            download_name=filename,
-            mimetype='application/pdf'
+        # Letters are rendered on this request's thread (forking worker
+        # processes from a threaded server is unsafe) and zipped as they
+        # finish; generate_offer_letters.py renders large batches in parallel
+        response = current_app.response_class(
+            stream_with_context(iter_offer_letter_zip(snapshots)),
+            mimetype='application/zip'
         )
+        response.headers['Content-Disposition'] = 'attachment; filename=offer_letters.zip'
+        return response
         
     except Exception as e:
-        current_app.logger.error(f"Offer letter generation failed for application {application_id}: {str(e)}")
-        return jsonify({'error': 'Failed to generate offer letter', 'details': str(e)}), 500
+        db.session.rollback()
+        current_app.logger.error(f"Batch offer letter generation failed: {str(e)}")
+        return jsonify({'error': 'Batch offer letter generation failed', 'details': str(e)}), 500
 
 @application_bp.route('/admin/stats', methods=['GET'])
 @auth_token_required
 @roles_required('admin')
+@cached_admin_response
 def admin_get_statistics():
     """Get comprehensive statistics for admin dashboard"""
     try:
-        from sqlalchemy import func
-        
-        # Total counts
-        total_applications = Application.query.count()
-        pending_applications = Application.query.filter_by(status='pending').count()
-        approved_applications = Application.query.filter_by(status='approved').count()
-        rejected_applications = Application.query.filter_by(status='rejected').count()
-        draft_applications = Application.query.filter_by(status='draft').count()
-        
-        # Course-wise statistics
-        course_stats = db.session.query(
-            Application.course_applied,
-            func.count(Application.id).label('count')
-        ).group_by(Application.course_applied).all()
-        
-        # Monthly statistics (last 12 months)
-        from datetime import datetime, timedelta
-        twelve_months_ago = datetime.now() - timedelta(days=365)
-        monthly_stats = db.session.query(
-            func.DATE_FORMAT(Application.date_created, '%Y-%m').label('month'),
-            func.count(Application.id).label('count')
-        ).filter(Application.date_created >= twelve_months_ago).group_by('month').all()
-        
-        # Recent activity
-        seven_days_ago = datetime.now() - timedelta(days=7)
-        recent_applications = Application.query.filter(
-            Application.date_created >= seven_days_ago
-        ).count()
-        
-        # Average approval rate
-        reviewed_apps = Application.query.filter(
-            Application.status.in_(['approved', 'rejected'])
-        ).count()
-        approval_rate = (approved_applications / reviewed_apps * 100) if reviewed_apps > 0 else 0
+        # Status counts and recent activity come from a single scan, the
+        # course and monthly breakdowns from one grouped query
+        summary = application_summary(recent_since=datetime.now() - timedelta(days=7))
+        course_stats, monthly_stats = application_breakdowns(
+            trend_since=datetime.now() - timedelta(days=365)  # last 12 months
+        )
         
         return jsonify({
             'overview': {
-                'total_applications': total_applications,
-                'pending_applications': pending_applications,
-                'approved_applications': approved_applications,
-                'rejected_applications': rejected_applications,
-                'draft_applications': draft_applications,
-                'approval_rate_percentage': round(approval_rate, 2)
+                'total_applications': summary['total'],
+                'pending_applications': summary['pending'],
+                'approved_applications': summary['approved'],
+                'rejected_applications': summary['rejected'],
+                'draft_applications': summary['draft'],
+                'approval_rate_percentage': summary['approval_rate']
             },
             'course_wise_stats': [
-                {'course': stat.course_applied, 'count': stat.count}
-                for stat in course_stats
+                {'course': course, 'count': count}
+                for course, count in course_stats
             ],
             'monthly_trends': [
-                {'month': stat.month, 'count': stat.count}
-                for stat in monthly_stats
+                {'month': month, 'count': count}
+                for month, count in monthly_stats
             ],
             'recent_activity': {
-                'applications_last_7_days': recent_applications
+                'applications_last_7_days': summary['recent']
             }
         }), 200
         
@@ -1368,30 +967,27 @@ def admin_download_application_file(application_id, file_type):
         if not application:
             return jsonify({'error': 'Application not found'}), 404
         
-        if file_type == 'degree_certificate':
-            file_data = application.degree_certificate
-            filename = application.degree_certificate_filename
-        elif file_type == 'id_proof':
-            file_data = application.id_proof
-            filename = application.id_proof_filename
-        else:
+        if file_type not in DOCUMENT_TYPES:
             return jsonify({'error': 'Invalid file type. Use degree_certificate or id_proof'}), 400
         
-        if not file_data:
-            return jsonify({'error': 'File not found'}), 404
+        file_obj = open_document(application, file_type)
+        filename = getattr(application, f'{file_type}_filename')
         
-        # Return file as base64 encoded string
-        file_base64 = base64.b64encode(file_data).decode('utf-8')
+        if file_obj is None:
+            return jsonify({'error': 'File not found'}), 404
         
-        return jsonify({
-            'filename': filename,
-            'file_data': file_base64,
-            'file_type': file_type,
-            'student': {
-                'name': application.student.name,
-                'email': application.student.email
-            }
-        }), 200
+        # Return file as base64 encoded string, encoded block by block as it is sent
+        return current_app.response_class(
+            iter_base64_json(file_obj, {
+                'filename': filename,
+                'file_type': file_type,
+                'student': {
+                    'name': application.student.name,
+                    'email': application.student.email
+                }
+            }, 'file_data'),
+            mimetype='application/json'
+        ), 200
         
     except Exception as e:
         return jsonify({'error': 'Failed to download file', 'details': str(e)}), 500
@@ -1402,80 +998,82 @@ def admin_download_application_file(application_id, file_type):
 def admin_search_applications():
     """Advanced search for applications (admin only)"""
     try:
-        query = Application.query
+        # The student join serves both the name filter and the student fields
+        fields = ADMIN_SEARCH_FIELDS.parse(request.args.get('fields'))
+        query = Application.query.join(Application.student).options(
+            *ADMIN_SEARCH_FIELDS.load_options(fields, joined=('student',))
+        )
         
-        # Filter by status
-        status = request.args.get('status')
-        if status:
-            query = query.filter(Application.status == status)
-        
-        # Filter by course
-        course = request.args.get('course')
-        if course:
-            query = query.filter(Application.course_applied.ilike(f'%{course}%'))
-        
-        # Filter by student name
-        student_name = request.args.get('student_name')
-        if student_name:
-            query = query.join(User).filter(User.name.ilike(f'%{student_name}%'))
-        
-        # Filter by date range
-        start_date = request.args.get('start_date')
-        end_date = request.args.get('end_date')
-        if start_date:
-            query = query.filter(Application.date_created >= start_date)
-        if end_date:
-            query = query.filter(Application.date_created <= end_date)
-        
-        # Filter by percentage range
-        min_percentage = request.args.get('min_percentage', type=float)
-        max_percentage = request.args.get('max_percentage', type=float)
-        if min_percentage is not None:
-            query = query.filter(Application.twelfth_percentage >= min_percentage)
-        if max_percentage is not None:
-            query = query.filter(Application.twelfth_percentage <= max_percentage)
+        filters = search_filters(request.args)
+        query, scores = filter_applications(query, **filters)
         
         # Pagination
         page = request.args.get('page', 1, type=int)
         per_page = request.args.get('per_page', 10, type=int)
         
-        applications = query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        return jsonify({
-            'applications': [{
-                'id': app.id,
-                'student': {
-                    'name': app.student.name,
-                    'email': app.student.email
-                },
-                'course_applied': app.course_applied,
-                'status': app.status,
-                'twelfth_percentage': app.twelfth_percentage,
-                'date_created': app.date_created.isoformat(),
-                'review_comments': app.review_comments
-            } for app in applications.items],
-            'pagination': {
+        # Pages of search results put the best matches first; cursor pages
+        # stay newest first
+        order_by = (Application.date_created, Application.id)
+        if 'cursor' in request.args:
+            applications = keyset_paginate(
+                query, order_by, per_page,
+                cursor=request.args.get('cursor'),
+                with_total=request.args.get('include_total', 'false').lower() == 'true'
+            )
+            pagination = applications.pagination()
+        else:
+            if scores:
+                query = query.order_by(functools.reduce(operator.add, scores).desc())
+            applications = query.order_by(*[column.desc() for column in order_by]).paginate(
+                page=page, per_page=per_page, error_out=False
+            )
+            pagination = {
                 'page': applications.page,
                 'per_page': applications.per_page,
                 'total': applications.total,
                 'pages': applications.pages
-            },
-            'filters_applied': {
-                'status': status,
-                'course': course,
-                'student_name': student_name,
-                'start_date': start_date,
-                'end_date': end_date,
-                'min_percentage': min_percentage,
-                'max_percentage': max_percentage
             }
+        
+        return jsonify({
+            'applications': ADMIN_SEARCH_FIELDS.serialize_many(applications.items, fields),
+            'pagination': pagination,
+            'filters_applied': {name: request.args.get(name) for name in filters}
         }), 200
         
+    except (InvalidCursor, InvalidFields, InvalidFilter) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Search failed', 'details': str(e)}), 500
 
+@application_bp.route('/admin/export', methods=['GET'])
+@auth_token_required
+@roles_required('admin')
+def admin_export_applications():
+    """Stream every application matching the search filters as CSV or NDJSON (admin only)"""
+    try:
+        export_format = request.args.get('format', 'csv')
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': 'Format must be csv or ndjson'}), 400
+        
+        fields = EXPORT_FIELDS.parse(request.args.get('fields'))
+        query = export_query(search_filters(request.args), fields)
+        batch_size = current_app.config['EXPORT_BATCH_SIZE']
+        
+        # Rows are read from a server-side cursor and written out as they
+        # arrive, so the export never sits in memory
+        records = iter_records(query, fields, batch_size)
+        response = current_app.response_class(
+            stream_with_context(iter_export(records, fields, export_format, batch_size)),
+            mimetype=EXPORT_FORMATS[export_format]
+        )
+        response.headers['Content-Disposition'] = f'attachment; filename=applications.{export_format}'
+        return response
+        
+    except (InvalidFields, InvalidFilter) as e:
+        return jsonify({'error': str(e)}), 400
+    except Exception as e:
+        return jsonify({'error': 'Export failed', 'details': str(e)}), 500
+
 @application_bp.route('/admin/bulk-action', methods=['POST'])
 @auth_token_required
 @roles_required('admin')
@@ -1493,49 +1091,23 @@ def admin_bulk_action():
         if action not in ['approve', 'reject', 'delete']:
             return jsonify({'error': 'Action must be approve, reject, or delete'}), 400
         
-        applications = Application.query.filter(Application.id.in_(application_ids)).all()
+        try:
+            application_ids = sorted({int(application_id) for application_id in application_ids})
+        except (TypeError, ValueError):
+            return jsonify({'error': 'application_ids must be a list of integers'}), 400
+        
+        # Set-based UPDATE/DELETE statements, committed a chunk at a time
+        chunk_size = current_app.config['BULK_ACTION_CHUNK_SIZE']
+        if action == 'delete':
+            updated_applications, failed_updates = delete_applications(application_ids, chunk_size)
+        else:
+            updated_applications, failed_updates = review_applications(
+                application_ids, action, current_user.id, comments, chunk_size
+            )
         
-        if not applications:
+        if not updated_applications and not failed_updates:
             return jsonify({'error': 'No applications found'}), 404
         
-        updated_applications = []
-        failed_updates = []
-        
-        for app in applications:
-            try:
-                if action in ['approve', 'reject']:
-                    if app.status == 'pending':
-                        app.status = 'approved' if action == 'approve' else 'rejected'
-                        app.reviewer_id = current_user.id
-                        app.review_comments = comments
-                        app.reviewed_at = datetime.now(timezone.utc)
-                        updated_applications.append({
-                            'id': app.id,
-                            'student_name': app.student.name,
-                            'course': app.course_applied,
-                            'new_status': app.status
-                        })
-                    else:
-                        failed_updates.append({
-                            'id': app.id,
-                            'reason': f'Cannot {action} application with status: {app.status}'
-                        })
-                elif action == 'delete':
-                    updated_applications.append({
-                        'id': app.id,
-                        'student_name': app.student.name,
-                        'course': app.course_applied,
-                        'action': 'deleted'
-                    })
-                    db.session.delete(app)
-            except Exception as e:
-                failed_updates.append({
-                    'id': app.id,
-                    'reason': str(e)
-                })
-        
-        db.session.commit()
-        
         return jsonify({
             'message': f'Bulk {action} operation completed',
             'total_processed': len(application_ids),
@@ -1,24 +1,25 @@
 from flask import Blueprint, request, jsonify, current_app
 from flask_security import auth_token_required, current_user, logout_user, roles_required
-from flask_security.utils import hash_password, verify_password
 from app.models import db, User, Role
+from app.auth_tokens import forget_request_token
+from app.passwords import PasswordHashingBusy, get_hashing_pool, hash_password, verify_and_update_password
+from app.throttling import throttled
+from app.statistics import application_breakdowns, application_summary, monthly_registrations, user_summary
+from app.response_cache import cached_admin_response
+from app.pagination import InvalidCursor, keyset_paginate
+from app.search import search_matches
+from app.serializers import PENDING_REVIEW_FIELDS, USER_ACCOUNT, USER_FIELDS, USER_PROFILE, InvalidFields
+from app.validators import validate_email, validate_phone
+from app.imports import import_applicants, missing_columns
+import csv
+import io
 import uuid
 from datetime import datetime, timezone
-import re
 
 auth_bp = Blueprint('auth', __name__)
 
-def validate_email(email):
-    """Validate email format"""
-    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
-    return re.match(pattern, email) is not None
-
-def validate_phone(phone):
-    """Validate phone number format"""
-    pattern = r'^[0-9]{10}$'
-    return re.match(pattern, phone) is not None
-
 @auth_bp.route('/register', methods=['POST'])
+@throttled('register')
 def register():
     """Register a new student"""
     try:
@@ -81,20 +82,18 @@ def register():
         
         return jsonify({
             'message': 'Student registered successfully',
-            'user': {
-                'id': new_user.id,
-                'name': new_user.name,
-                'email': new_user.email,
-                'phone': new_user.phone,
-                'roles': [role.name for role in new_user.roles]
-            }
+            'user': USER_FIELDS.serialize(new_user, USER_ACCOUNT)
         }), 201
         
+    except PasswordHashingBusy as e:
+        db.session.rollback()
+        return jsonify({'error': 'Server is busy, please try again shortly'}), 503, {'Retry-After': str(e.retry_after)}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Registration failed', 'details': str(e)}), 500
 
 @auth_bp.route('/login', methods=['POST'])
+@throttled('login')
 def login():
     """Login user and return authentication token"""
     try:
@@ -109,8 +108,8 @@ def login():
         if not user:
             return jsonify({'error': 'Invalid credentials'}), 401
         
-        # Verify password
-        if not verify_password(data['password'], user.password):
+        # Verify password; a hash with outdated parameters is upgraded
+        if not verify_and_update_password(data['password'], user):
             return jsonify({'error': 'Invalid credentials'}), 401
         
         # Check if user is active
@@ -120,18 +119,18 @@ def login():
         # Generate authentication token
         token = user.get_auth_token()
         
+        # Save an upgraded password hash
+        if db.session.is_modified(user):
+            db.session.commit()
+        
         return jsonify({
             'message': 'Login successful',
             'token': token,
-            'user': {
-                'id': user.id,
-                'name': user.name,
-                'email': user.email,
-                'phone': user.phone,
-                'roles': [role.name for role in user.roles]
-            }
+            'user': USER_FIELDS.serialize(user, USER_ACCOUNT)
         }), 200
         
+    except PasswordHashingBusy as e:
+        return jsonify({'error': 'Server is busy, please try again shortly'}), 503, {'Retry-After': str(e.retry_after)}
     except Exception as e:
         return jsonify({'error': 'Login failed', 'details': str(e)}), 500
 
@@ -143,7 +142,8 @@ def logout():
         # Get current user info before logout
         user_email = current_user.email
         
-        # Logout user (this invalidates the token)
+        # Logout user, and stop trusting the cached token right away
+        forget_request_token(request)
         logout_user()
         
         return jsonify({
@@ -159,19 +159,7 @@ def get_profile():
     """Get current user profile"""
     try:
         return jsonify({
-            'user': {
-                'id': current_user.id,
-                'name': current_user.name,
-                'email': current_user.email,
-                'phone': current_user.phone,
-                'address': current_user.address,
-                'country': current_user.country,
-                'state': current_user.state,
-                'district': current_user.district,
-                'pincode': current_user.pincode,
-                'roles': [role.name for role in current_user.roles],
-                'date_created': current_user.date_created.isoformat()
-            }
+            'user': USER_FIELDS.serialize(current_user, USER_PROFILE + ('date_created',))
         }), 200
         
     except Exception as e:
@@ -221,18 +209,7 @@ def edit_profile():
         return jsonify({
             'message': 'Profile updated successfully',
             'updated_fields': updated_fields,
-            'user': {
-                'id': current_user.id,
-                'name': current_user.name,
-                'email': current_user.email,
-                'phone': current_user.phone,
-                'address': current_user.address,
-                'country': current_user.country,
-                'state': current_user.state,
-                'district': current_user.district,
-                'pincode': current_user.pincode,
-                'roles': [role.name for role in current_user.roles]
-            }
+            'user': USER_FIELDS.serialize(current_user, USER_PROFILE)
         }), 200
         
     except Exception as e:
@@ -276,61 +253,58 @@ def get_all_users():
         role_filter = request.args.get('role')
         search = request.args.get('search')
         
-        # Build query
-        query = User.query
+        # Build query selecting only the requested fields; roles for the
+        # whole page are loaded in one extra query
+        fields = USER_FIELDS.parse(request.args.get('fields'))
+        query = User.query.options(*USER_FIELDS.load_options(fields))
         
         if role_filter:
             query = query.join(User.roles).filter(Role.name == role_filter)
         
+        # Search name, email and phone through the search index
+        matches = None
         if search:
-            search_term = f'%{search}%'
-            query = query.filter(
-                (User.name.ilike(search_term)) |
-                (User.email.ilike(search_term)) |
-                (User.phone.ilike(search_term))
+            matches = search_matches(User, ('name', 'email', 'phone'), search)
+            query = query.join(matches, matches.c.record_id == User.id)
+        
+        # Order by creation date (newest first), by cursor when one is given;
+        # pages of search results put the best matches first
+        order_by = (User.date_created, User.id)
+        if matches is not None and 'cursor' not in request.args:
+            query = query.order_by(matches.c.score.desc())
+        if 'cursor' in request.args:
+            users = keyset_paginate(
+                query, order_by, per_page,
+                cursor=request.args.get('cursor'),
+                with_total=request.args.get('include_total', 'false').lower() == 'true'
             )
-        
-        # Order by creation date (newest first)
-        query = query.order_by(User.date_created.desc())
-        
-        # Paginate
-        users = query.paginate(
-            page=page, per_page=per_page, error_out=False
-        )
-        
-        users_list = []
-        for user in users.items:
-            users_list.append({
-                'id': user.id,
-                'name': user.name,
-                'email': user.email,
-                'phone': user.phone,
-                'address': user.address,
-                'country': user.country,
-                'state': user.state,
-                'district': user.district,
-                'pincode': user.pincode,
-                'roles': [role.name for role in user.roles],
-                'date_created': user.date_created.isoformat(),
-                'is_active': user.active
-            })
-        
-        return jsonify({
-            'users': users_list,
-            'pagination': {
+            pagination = users.pagination()
+        else:
+            users = query.order_by(*[column.desc() for column in order_by]).paginate(
+                page=page, per_page=per_page, error_out=False
+            )
+            pagination = {
                 'page': page,
                 'per_page': per_page,
                 'total': users.total,
                 'pages': users.pages,
                 'has_next': users.has_next,
                 'has_prev': users.has_prev
-            },
+            }
+        
+        users_list = USER_FIELDS.serialize_many(users.items, fields)
+        
+        return jsonify({
+            'users': users_list,
+            'pagination': pagination,
             'filters': {
                 'role': role_filter,
                 'search': search
             }
         }), 200
         
+    except (InvalidCursor, InvalidFields) as e:
+        return jsonify({'error': str(e)}), 400
     except Exception as e:
         return jsonify({'error': 'Failed to retrieve users', 'details': str(e)}), 500
 
@@ -396,24 +370,54 @@ def admin_edit_user_profile(user_id):
         return jsonify({
             'message': 'User profile updated successfully by admin',
             'updated_fields': updated_fields,
-            'user': {
-                'id': user.id,
-                'name': user.name,
-                'email': user.email,
-                'phone': user.phone,
-                'address': user.address,
-                'country': user.country,
-                'state': user.state,
-                'district': user.district,
-                'pincode': user.pincode,
-                'roles': [role.name for role in user.roles]
-            }
+            'user': USER_FIELDS.serialize(user, USER_PROFILE)
         }), 200
         
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Profile update failed', 'details': str(e)}), 500
 
+@auth_bp.route('/admin/import', methods=['POST'])
+@auth_token_required
+def import_applicants_csv():
+    """Create students, and optionally draft applications, from an uploaded CSV file (admin only)"""
+    try:
+        # Check if user is admin
+        user_roles = [role.name for role in current_user.roles]
+        if 'admin' not in user_roles:
+            return jsonify({'error': 'Access denied. Admin privileges required.'}), 403
+        
+        upload = request.files.get('file')
+        if not upload:
+            return jsonify({'error': 'A CSV file is required'}), 400
+        
+        reader = csv.DictReader(io.TextIOWrapper(upload.stream, encoding='utf-8-sig', newline=''))
+        missing = missing_columns(reader.fieldnames)
+        if missing:
+            return jsonify({'error': f"Missing columns: {', '.join(missing)}"}), 400
+        
+        # Hash on the shared hashing pool, one password at a time, rather
+        # than forking processes inside a request; large files belong to
+        # import_applicants.py
+        report = import_applicants(
+            reader, current_app.config['IMPORT_BATCH_SIZE'], get_hashing_pool()
+        )
+        
+        return jsonify({
+            'message': 'Import completed',
+            **report.to_dict()
+        }), 200
+        
+    except UnicodeDecodeError:
+        db.session.rollback()
+        return jsonify({'error': 'The CSV file must be UTF-8 encoded'}), 400
+    except PasswordHashingBusy as e:
+        db.session.rollback()
+        return jsonify({'error': 'Server is busy, please try again shortly'}), 503, {'Retry-After': str(e.retry_after)}
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': 'Import failed', 'details': str(e)}), 500
+
 @auth_bp.route('/admin/user/<int:user_id>/toggle-status', methods=['POST'])
 @auth_token_required
 def toggle_user_status(user_id):
@@ -440,12 +444,7 @@ def toggle_user_status(user_id):
         
         return jsonify({
             'message': f'User {status} successfully',
-            'user': {
-                'id': user.id,
-                'name': user.name,
-                'email': user.email,
-                'is_active': user.active
-            }
+            'user': USER_FIELDS.serialize(user, ('id', 'name', 'email', 'is_active'))
         }), 200
         
     except Exception as e:
@@ -454,6 +453,7 @@ def toggle_user_status(user_id):
 
 @auth_bp.route('/admin/stats', methods=['GET'])
 @auth_token_required
+@cached_admin_response
 def get_user_stats():
     """Get user statistics (admin only)"""
     try:
@@ -462,49 +462,27 @@ def get_user_stats():
         if 'admin' not in user_roles:
             return jsonify({'error': 'Access denied. Admin privileges required.'}), 403
         
-        # Get user counts
-        total_users = User.query.count()
-        active_users = User.query.filter_by(active=True).count()
-        inactive_users = User.query.filter_by(active=False).count()
-        
-        # Get role-wise counts
-        from sqlalchemy import func
-        role_stats = db.session.query(
-            Role.name,
-            func.count(User.id).label('count')
-        ).join(User.roles).group_by(Role.name).all()
-        
-        role_breakdown = [{'role': role, 'count': count} for role, count in role_stats]
-        
-        # Get recent registrations (last 30 days)
         from datetime import datetime, timedelta
-        thirty_days_ago = datetime.now() - timedelta(days=30)
         
-        recent_registrations = User.query.filter(
-            User.date_created >= thirty_days_ago
-        ).count()
+        # User and role counts from the counters table, plus registrations
+        # in the last 30 days
+        users = user_summary(recent_since=datetime.now() - timedelta(days=30))
+        
+        role_breakdown = [{'role': role, 'count': count} for role, count in users['roles'].items()]
         
         # Get newest users
-        newest_users = User.query.order_by(
+        newest_users = User.query.options(db.selectinload(User.roles)).order_by(
             User.date_created.desc()
         ).limit(5).all()
         
-        newest_users_list = []
-        for user in newest_users:
-            newest_users_list.append({
-                'id': user.id,
-                'name': user.name,
-                'email': user.email,
-                'roles': [role.name for role in user.roles],
-                'date_created': user.date_created.isoformat()
-            })
+        newest_users_list = USER_FIELDS.serialize_many(newest_users, ('id', 'name', 'email', 'roles', 'date_created'))
         
         return jsonify({
             'summary': {
-                'total_users': total_users,
-                'active_users': active_users,
-                'inactive_users': inactive_users,
-                'recent_registrations': recent_registrations
+                'total_users': users['total'],
+                'active_users': users['active'],
+                'inactive_users': users['inactive'],
+                'recent_registrations': users['recent']
             },
             'role_breakdown': role_breakdown,
             'newest_users': newest_users_list
@@ -539,19 +517,19 @@ def admin_reset_password(user_id):
         
         return jsonify({
             'message': 'Password reset successfully',
-            'user': {
-                'id': user.id,
-                'name': user.name,
-                'email': user.email
-            }
+            'user': USER_FIELDS.serialize(user, ('id', 'name', 'email'))
         }), 200
         
+    except PasswordHashingBusy as e:
+        db.session.rollback()
+        return jsonify({'error': 'Server is busy, please try again shortly'}), 503, {'Retry-After': str(e.retry_after)}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Password reset failed', 'details': str(e)}), 500
 
 @auth_bp.route('/admin/dashboard', methods=['GET'])
 @auth_token_required
+@cached_admin_response
 def admin_dashboard():
     """Get comprehensive admin dashboard data"""
     try:
@@ -561,88 +539,46 @@ def admin_dashboard():
             return jsonify({'error': 'Access denied. Admin privileges required.'}), 403
         
         from app.models import Application
-        from sqlalchemy import func
         from datetime import datetime, timedelta
         
-        # User statistics
-        total_users = User.query.count()
-        active_users = User.query.filter_by(active=True).count()
-        students_count = User.query.join(User.roles).filter(Role.name == 'student').count()
-        admins_count = User.query.join(User.roles).filter(Role.name == 'admin').count()
-        
-        # Application statistics
-        total_applications = Application.query.count()
-        pending_applications = Application.query.filter_by(status='pending').count()
-        approved_applications = Application.query.filter_by(status='approved').count()
-        rejected_applications = Application.query.filter_by(status='rejected').count()
-        draft_applications = Application.query.filter_by(status='draft').count()
-        
-        # Recent activity (last 7 days)
         week_ago = datetime.now() - timedelta(days=7)
-        recent_users = User.query.filter(User.date_created >= week_ago).count()
-        recent_applications = Application.query.filter(Application.date_created >= week_ago).count()
-        
-        # Top courses
-        top_courses = db.session.query(
-            Application.course_applied,
-            func.count(Application.id).label('count')
-        ).group_by(Application.course_applied).order_by(
-            func.count(Application.id).desc()
-        ).limit(5).all()
+        six_months_ago = datetime.now() - timedelta(days=180)
         
-        top_courses_list = [{'course': course, 'applications': count} for course, count in top_courses]
+        # User and application counts, one aggregate query each
+        users = user_summary(recent_since=week_ago)
+        applications = application_summary(recent_since=week_ago)
+        
+        # Top courses and monthly trends (last 6 months) from one grouped query
+        course_stats, monthly_applications = application_breakdowns(trend_since=six_months_ago)
+        top_courses_list = [{'course': course, 'applications': count} for course, count in course_stats[:5]]
         
         # Recent applications needing review
-        pending_review = Application.query.filter_by(status='pending').order_by(
+        pending_review = Application.query.options(
+            *PENDING_REVIEW_FIELDS.load_options(PENDING_REVIEW_FIELDS.default)
+        ).filter_by(status='pending').order_by(
             Application.date_created.desc()
         ).limit(5).all()
         
-        pending_list = []
-        for app in pending_review:
-            pending_list.append({
-                'id': app.id,
-                'student_name': app.student.name,
-                'course_applied': app.course_applied,
-                'date_created': app.date_created.isoformat(),
-                'days_pending': (datetime.now(timezone.utc) - app.date_created).days
-            })
-        
-        # Monthly trends (last 6 months)
-        six_months_ago = datetime.now() - timedelta(days=180)
-        monthly_applications = db.session.query(
-            func.date_format(Application.date_created, '%Y-%m').label('month'),
-            func.count(Application.id).label('count')
-        ).filter(
-            Application.date_created >= six_months_ago
-        ).group_by(
-            func.date_format(Application.date_created, '%Y-%m')
-        ).order_by('month').all()
-        
-        monthly_users = db.session.query(
-            func.date_format(User.date_created, '%Y-%m').label('month'),
-            func.count(User.id).label('count')
-        ).filter(
-            User.date_created >= six_months_ago
-        ).group_by(
-            func.date_format(User.date_created, '%Y-%m')
-        ).order_by('month').all()
+        pending_list = PENDING_REVIEW_FIELDS.serialize_many(pending_review)
+        
+        monthly_users = monthly_registrations(since=six_months_ago)
         
         return jsonify({
             'user_stats': {
-                'total_users': total_users,
-                'active_users': active_users,
-                'students_count': students_count,
-                'admins_count': admins_count,
-                'recent_registrations': recent_users
+                'total_users': users['total'],
+                'active_users': users['active'],
+                'students_count': users['students'],
+                'admins_count': users['admins'],
+                'recent_registrations': users['recent']
             },
             'application_stats': {
-                'total_applications': total_applications,
-                'pending_applications': pending_applications,
-                'approved_applications': approved_applications,
-                'rejected_applications': rejected_applications,
-                'draft_applications': draft_applications,
-                'recent_submissions': recent_applications,
-                'approval_rate': round((approved_applications / max(total_applications - draft_applications, 1)) * 100, 2) if total_applications > 0 else 0
+                'total_applications': applications['total'],
+                'pending_applications': applications['pending'],
+                'approved_applications': applications['approved'],
+                'rejected_applications': applications['rejected'],
+                'draft_applications': applications['draft'],
+                'recent_submissions': applications['recent'],
+                'approval_rate': round((applications['approved'] / max(applications['total'] - applications['draft'], 1)) * 100, 2) if applications['total'] > 0 else 0
             },
             'top_courses': top_courses_list,
             'pending_review': pending_list,
@@ -651,9 +587,9 @@ def admin_dashboard():
                 'monthly_users': [{'month': month, 'count': count} for month, count in monthly_users]
             },
             'system_health': {
-                'total_admins': admins_count,
-                'active_users_percentage': round((active_users / max(total_users, 1)) * 100, 2),
-                'pending_review_count': pending_applications
+                'total_admins': users['admins'],
+                'active_users_percentage': round((users['active'] / max(users['total'], 1)) * 100, 2),
+                'pending_review_count': applications['pending']
             }
         }), 200
         
@@ -667,11 +603,7 @@ def verify_token():
     try:
         return jsonify({
             'valid': True,
-            'user': {
-                'id': current_user.id,
-                'email': current_user.email,
-                'roles': [role.name for role in current_user.roles]
-            }
+            'user': USER_FIELDS.serialize(current_user, ('id', 'email', 'roles'))
         }), 200
         
     except Exception as e:
@@ -746,19 +678,16 @@ def create_admin():
         
         return jsonify({
             'message': 'Admin user created successfully',
-            'admin': {
-                'id': new_admin.id,
-                'name': new_admin.name,
-                'email': new_admin.email,
-                'phone': new_admin.phone,
-                'roles': [role.name for role in new_admin.roles]
-            },
+            'admin': USER_FIELDS.serialize(new_admin, USER_ACCOUNT),
             'created_by': {
                 'id': current_user.id,
                 'email': current_user.email
             }
         }), 201
         
+    except PasswordHashingBusy as e:
+        db.session.rollback()
+        return jsonify({'error': 'Server is busy, please try again shortly'}), 503, {'Retry-After': str(e.retry_after)}
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': 'Admin creation failed', 'details': str(e)}), 500
@@ -0,0 +1,317 @@
+import math
+import re
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from flask import current_app
+from sqlalchemy import distinct, event, false, func, literal, select
+from sqlalchemy.dialects.mysql import match
+from sqlalchemy.engine import make_url
+
+from app.models import db, Application, SearchTrigram, User
+from app.counters import attributes_changed
+from app.validators import parse_date
+
+# Searchable fields of each model
+SEARCH_FIELDS = {
+    User: ('name', 'email', 'phone'),
+    Application: ('course_applied',),
+}
+
+_WORD_PATTERN = re.compile(r'\w+')
+
+# Records indexed per statement when rebuilding
+REBUILD_CHUNK_SIZE = 1000
+
+
+def trigrams(text):
+    """Set of the trigrams of every word in ``text``, case-insensitive.
+
+    Words are padded like PostgreSQL's pg_trgm ("  word "), so the start of
+    a word weighs more and a prefix typed so far already matches.
+    """
+    grams = set()
+    for word in _WORD_PATTERN.findall((text or '').casefold()):
+        padded = f'  {word} '
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+class SearchIndex(ABC):
+    """Ranked, typo-tolerant matching on the fields in SEARCH_FIELDS"""
+
+    def __init__(self, min_similarity):
+        self.min_similarity = min_similarity
+
+    @abstractmethod
+    def matches(self, model, fields, term):
+        """Subquery of ``(record_id, score)`` for the records whose ``fields``
+        match ``term``; a higher score is a better match"""
+
+    def prepare(self, session):
+        """Note what a flush is about to change while it can still be read (for side-table indexes)"""
+
+    def sync(self, session):
+        """Bring the index up to date with a flush (for side-table indexes)"""
+
+    def add(self, connection, model, records):
+        """Index records inserted without the session, e.g. by a bulk import"""
+
+    def remove(self, connection, model, record_ids):
+        """Drop records deleted without the session, e.g. by a bulk DELETE"""
+
+    def rebuild(self):
+        """Reindex every record; returns the number of records indexed"""
+        return 0
+
+
+class FulltextSearchIndex(SearchIndex):
+    """MySQL FULLTEXT indexes with the ngram parser, declared on the models.
+
+    InnoDB keeps them up to date itself. Natural language mode matches any
+    shared ngram and ranks by relevance; only records scoring at least
+    ``min_similarity`` of the best match are kept.
+    """
+
+    def matches(self, model, fields, term):
+        score = match(*[getattr(model, field) for field in fields], against=term).in_natural_language_mode()
+        ranked = select(
+            model.id.label('record_id'),
+            score.label('score'),
+            func.max(score).over().label('best')
+        ).where(score).subquery()
+        return select(ranked.c.record_id, ranked.c.score).where(
+            ranked.c.score >= ranked.c.best * self.min_similarity
+        ).subquery()
+
+
+class TrigramSearchIndex(SearchIndex):
+    """Trigram side table that works on any database.
+
+    A record's score is the share of the term's trigrams found in its
+    fields, so a typo only costs the few trigrams around it.
+    """
+
+    def matches(self, model, fields, term):
+        grams = trigrams(term)
+        if not grams:
+            return select(SearchTrigram.record_id, literal(0.0).label('score')).where(false()).subquery()
+
+        found = func.count(distinct(SearchTrigram.trigram))
+        return select(
+            SearchTrigram.record_id,
+            (found * 1.0 / len(grams)).label('score')
+        ).where(
+            SearchTrigram.source == model.__tablename__,
+            SearchTrigram.field.in_(fields),
+            SearchTrigram.trigram.in_(sorted(grams))
+        ).group_by(SearchTrigram.record_id).having(
+            found >= max(math.ceil(len(grams) * self.min_similarity), 1)
+        ).subquery()
+
+    def prepare(self, session):
+        # The database cascade removes the applications of deleted users
+        # without loading them, so they never reach the flush; read their
+        # ids while they still exist
+        student_ids = {obj.id for obj in session.deleted if isinstance(obj, User) and obj.id is not None}
+        if student_ids:
+            session.info['cascaded_search_records'] = session.scalars(
+                select(Application.id).where(Application.student_id.in_(student_ids))
+            ).all()
+
+    def sync(self, session):
+        stale = {}   # (source, field or None for all) -> record ids
+        cascaded = session.info.pop('cascaded_search_records', None)
+        if cascaded:
+            stale[(Application.__tablename__, None)] = list(cascaded)
+        fresh = []
+        for obj in session.new:
+            if type(obj) in SEARCH_FIELDS:
+                fresh.extend(trigram_rows(obj.__tablename__, obj, SEARCH_FIELDS[type(obj)]))
+        for obj in session.dirty:
+            if type(obj) in SEARCH_FIELDS:
+                for field in SEARCH_FIELDS[type(obj)]:
+                    if attributes_changed(obj, field):
+                        stale.setdefault((obj.__tablename__, field), []).append(obj.id)
+                        fresh.extend(trigram_rows(obj.__tablename__, obj, (field,)))
+        for obj in session.deleted:
+            if type(obj) in SEARCH_FIELDS:
+                stale.setdefault((obj.__tablename__, None), []).append(obj.id)
+
+        connection = session.connection()
+        table = SearchTrigram.__table__
+        for (source, field), record_ids in stale.items():
+            condition = [table.c.source == source, table.c.record_id.in_(record_ids)]
+            if field is not None:
+                condition.append(table.c.field == field)
+            connection.execute(table.delete().where(*condition))
+        if fresh:
+            connection.execute(table.insert(), fresh)
+
+    def add(self, connection, model, records):
+        rows = [
+            row
+            for record in records
+            for row in trigram_rows(model.__tablename__, record, SEARCH_FIELDS[model])
+        ]
+        if rows:
+            connection.execute(SearchTrigram.__table__.insert(), rows)
+
+    def remove(self, connection, model, record_ids):
+        table = SearchTrigram.__table__
+        connection.execute(table.delete().where(
+            table.c.source == model.__tablename__, table.c.record_id.in_(record_ids)
+        ))
+
+    def rebuild(self):
+        table = SearchTrigram.__table__
+        db.session.execute(table.delete())
+        indexed = 0
+        for model, fields in SEARCH_FIELDS.items():
+            # Read in id order, a chunk at a time, so the inserts can share
+            # the connection with the reads on any driver
+            last_id = 0
+            while True:
+                chunk = db.session.query(model.id, *[getattr(model, field) for field in fields]) \
+                    .filter(model.id > last_id).order_by(model.id).limit(REBUILD_CHUNK_SIZE).all()
+                if not chunk:
+                    break
+                rows = [
+                    row
+                    for record in chunk
+                    for row in trigram_rows(model.__tablename__, record, fields)
+                ]
+                if rows:
+                    db.session.execute(table.insert(), rows)
+                indexed += len(chunk)
+                last_id = chunk[-1].id
+        db.session.commit()
+        return indexed
+
+
+def trigram_rows(source, record, fields):
+    return [
+        {'source': source, 'field': field, 'trigram': gram, 'record_id': record.id}
+        for field in fields
+        for gram in trigrams(getattr(record, field))
+    ]
+
+
+SEARCH_INDEX_BACKENDS = {
+    'fulltext': FulltextSearchIndex,
+    'trigram': TrigramSearchIndex,
+}
+
+
+def prepare_search_index(session, flush_context, instances):
+    index = current_app.extensions.get('search_index')
+    if index is not None:
+        index.prepare(session)
+
+
+def sync_search_index(session, flush_context):
+    index = current_app.extensions.get('search_index')
+    if index is not None:
+        index.sync(session)
+
+
+def _discard_cascaded_records(session):
+    session.info.pop('cascaded_search_records', None)
+
+
+def init_search_index(app):
+    """Create the configured search index and register it on the app.
+
+    The default, ``auto``, uses FULLTEXT on MySQL and trigrams elsewhere.
+    """
+    backend = app.config['SEARCH_INDEX_BACKEND']
+    if backend == 'auto':
+        dialect = make_url(app.config['SQLALCHEMY_DATABASE_URI']).get_backend_name()
+        backend = 'fulltext' if dialect == 'mysql' else 'trigram'
+    if backend not in SEARCH_INDEX_BACKENDS:
+        raise ValueError(f'Unknown search index backend: {backend}')
+
+    index = SEARCH_INDEX_BACKENDS[backend](app.config['SEARCH_MIN_SIMILARITY'])
+    app.extensions['search_index'] = index
+    if not event.contains(db.session, 'after_flush', sync_search_index):
+        event.listen(db.session, 'before_flush', prepare_search_index)
+        event.listen(db.session, 'after_flush', sync_search_index)
+        event.listen(db.session, 'after_rollback', _discard_cascaded_records)
+    return index
+
+
+def get_search_index():
+    return current_app.extensions['search_index']
+
+
+def search_matches(model, fields, term):
+    """Subquery of ``(record_id, score)`` of the records matching ``term``;
+    join it on ``record_id`` to filter and order by its ``score``"""
+    return get_search_index().matches(model, fields, term)
+
+
+class InvalidFilter(ValueError):
+    """Raised when a search filter value cannot be parsed"""
+
+
+def search_filters(args):
+    """The admin application search filters given in ``args`` (request
+    arguments or any mapping), with None for those left out.
+
+    Raises InvalidFilter for a malformed date or percentage."""
+    return {
+        'status': args.get('status'),
+        'course': args.get('course'),
+        'student_name': args.get('student_name'),
+        'start_date': _date(args, 'start_date'),
+        'end_date': _date(args, 'end_date'),
+        'min_percentage': _percentage(args, 'min_percentage'),
+        'max_percentage': _percentage(args, 'max_percentage'),
+    }
+
+
+def _date(args, name):
+    try:
+        return parse_date(args.get(name))
+    except ValueError:
+        raise InvalidFilter(f'{name} must be a date in YYYY-MM-DD format') from None
+
+
+def _percentage(args, name):
+    value = args.get(name)
+    if value in (None, ''):
+        return None
+    try:
+        percentage = float(value)
+    except (TypeError, ValueError):
+        percentage = math.nan
+    if not math.isfinite(percentage):
+        raise InvalidFilter(f'{name} must be a number')
+    return percentage
+
+
+def filter_applications(query, status=None, course=None, student_name=None, start_date=None,
+                        end_date=None, min_percentage=None, max_percentage=None):
+    """Apply the admin search filters, as parsed by ``search_filters``, to a
+    query of applications joined to their student. Course and student name go through the search index;
+    returns the query and the match scores to rank the results by."""
+    scores = []
+    if status:
+        query = query.filter(Application.status == status)
+    if course:
+        matches = search_matches(Application, ('course_applied',), course)
+        query = query.join(matches, matches.c.record_id == Application.id)
+        scores.append(matches.c.score)
+    if student_name:
+        matches = search_matches(User, ('name',), student_name)
+        query = query.join(matches, matches.c.record_id == User.id)
+        scores.append(matches.c.score)
+    if start_date:
+        query = query.filter(Application.date_created >= start_date)
+    if end_date:
+        # Dates are whole days: take everything created on the end date too
+        query = query.filter(Application.date_created < end_date + timedelta(days=1))
+    if min_percentage is not None:
+        query = query.filter(Application.twelfth_percentage >= min_percentage)
+    if max_percentage is not None:
+        query = query.filter(Application.twelfth_percentage <= max_percentage)
+    return query, scores
@@ -0,0 +1,309 @@
+from datetime import datetime, timezone
+from operator import attrgetter
+from flask.json.provider import DefaultJSONProvider
+from sqlalchemy.orm import contains_eager, joinedload, load_only, selectinload
+
+from app.models import Application, User
+
+try:
+    import orjson
+except ImportError:  # optional, see JSON_BACKEND
+    orjson = None
+
+
+class InvalidFields(ValueError):
+    """Raised when a ``fields`` parameter names fields a listing does not have"""
+
+
+def isoformat(moment):
+    """ISO 8601 text of a datetime as stored, or None"""
+    return moment.isoformat() if moment is not None else None
+
+
+class Field:
+    """One key of a serialized record and the columns it is built from.
+
+    The value is the result of calling ``get(obj)``. ``columns`` are
+    attribute names on the record's model; ``related`` maps a relationship
+    name to the attribute names needed on the related object. Fields with
+    ``omit_none`` leave their key out instead of writing null.
+    """
+
+    def __init__(self, get, columns=(), related=None, omit_none=False):
+        self.get = get
+        self.columns = tuple(columns)
+        self.related = related or {}
+        self.omit_none = omit_none
+
+
+def value(attribute):
+    return Field(attrgetter(attribute), columns=(attribute,))
+
+
+def timestamp(attribute):
+    read = attrgetter(attribute)
+    return Field(lambda obj: isoformat(read(obj)), columns=(attribute,))
+
+
+def present(attribute):
+    read = attrgetter(attribute)
+    return Field(lambda obj: bool(read(obj)), columns=(attribute,))
+
+
+def nested(target, attributes):
+    """Dict of ``attributes`` of a related object, or None without one"""
+    if target is None:
+        return None
+    loaded = target.__dict__
+    return {
+        attribute: loaded[attribute] if attribute in loaded else getattr(target, attribute)
+        for attribute in attributes
+    }
+
+
+def related(relationship, attributes, column, omit_none=False):
+    """Field holding a to-one relationship as a dict of ``attributes``"""
+    read, attributes = attrgetter(relationship), tuple(attributes)
+    return Field(
+        lambda obj: nested(read(obj), attributes),
+        columns=(column,), related={relationship: attributes}, omit_none=omit_none
+    )
+
+
+class Fieldset:
+    """The fields a model can be serialized with, for listings and payloads.
+
+    Each combination of field names is resolved once into a serializer
+    holding the fields' getters, so serializing a row costs one call per
+    field and no lookups by name. For listings taking ``fields=``, only the
+    columns of the requested fields are selected; ``always`` columns are
+    loaded regardless, for the listing's ordering and cursors.
+    """
+
+    def __init__(self, model, fields, default, always=('id',)):
+        self.model = model
+        self.fields = fields
+        self.default = tuple(default)
+        self.always = tuple(always)
+        self._plans = {}
+
+    def parse(self, requested):
+        """Field names asked for by a comma separated ``fields`` value; the
+        id is always included"""
+        if not requested:
+            return self.default
+        names = ['id'] + [name.strip() for name in requested.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise InvalidFields(
+                f"Unknown fields: {', '.join(unknown)}. Available fields: {', '.join(self.fields)}"
+            )
+        return tuple(dict.fromkeys(names))
+
+    def load_options(self, names, joined=()):
+        """Loader options selecting just what ``names`` need.
+
+        To-one relationships are loaded with ``joinedload``, or from the
+        query's own join for those named in ``joined``; collections use
+        ``selectinload``.
+        """
+        columns = dict.fromkeys(self.always)
+        related = {}
+        for name in names:
+            field = self.fields[name]
+            columns.update(dict.fromkeys(field.columns))
+            for relationship, related_columns in field.related.items():
+                related.setdefault(relationship, {'id': None}).update(dict.fromkeys(related_columns))
+
+        options = [load_only(*[getattr(self.model, column) for column in columns])]
+        for relationship, related_columns in related.items():
+            attribute = getattr(self.model, relationship)
+            target = attribute.property.mapper.class_
+            if attribute.property.uselist:
+                loader = selectinload
+            else:
+                loader = contains_eager if relationship in joined else joinedload
+            options.append(loader(attribute).load_only(*[getattr(target, column) for column in related_columns]))
+        return options
+
+    def plan(self, names=None):
+        """Serializer function for ``names`` (default: the defaults)"""
+        names = self.default if names is None else tuple(names)
+        serialize = self._plans.get(names)
+        if serialize is None:
+            serialize = self._plans[names] = self._build(names)
+        return serialize
+
+    def _build(self, names):
+        required = tuple((name, self.fields[name].get) for name in names if not self.fields[name].omit_none)
+        optional = tuple((name, self.fields[name].get) for name in names if self.fields[name].omit_none)
+
+        def serialize(obj):
+            record = {name: get(obj) for name, get in required}
+            for name, get in optional:
+                value = get(obj)
+                if value is not None:
+                    record[name] = value
+            return record
+
+        return serialize
+
+    def serialize(self, obj, names=None):
+        return self.plan(names)(obj)
+
+    def serialize_many(self, objs, names=None):
+        serialize = self.plan(names)
+        return [serialize(obj) for obj in objs]
+
+
+_APPLICATION_DETAILS = {
+    'id': value('id'),
+    'course_applied': value('course_applied'),
+    'status': value('status'),
+    'tenth_percentage': value('tenth_percentage'),
+    'tenth_board': value('tenth_board'),
+    'twelfth_percentage': value('twelfth_percentage'),
+    'twelfth_board': value('twelfth_board'),
+    'previous_qualification': value('previous_qualification'),
+    'previous_institution': value('previous_institution'),
+    'graduation_year': value('graduation_year'),
+    'date_created': timestamp('date_created'),
+    'review_comments': value('review_comments'),
+    'reviewed_at': timestamp('reviewed_at'),
+    'address': value('address'),
+    'country': value('country'),
+    'state': value('state'),
+    'district': value('district'),
+    'pincode': value('pincode'),
+    # Document filenames and sizes, never the document data
+    'degree_certificate_filename': value('degree_certificate_filename'),
+    'id_proof_filename': value('id_proof_filename'),
+    'has_degree_certificate': present('degree_certificate_length'),
+    'has_id_proof': present('id_proof_length'),
+    'degree_certificate_size': value('degree_certificate_length'),
+    'id_proof_size': value('id_proof_length'),
+}
+
+# A student's own applications (GET /api/application/list)
+STUDENT_APPLICATION_FIELDS = Fieldset(Application, {
+    **_APPLICATION_DETAILS,
+    'reviewed_by': Field(
+        lambda obj: obj.reviewer.name if obj.reviewer else None,
+        columns=('reviewed_by',), related={'reviewer': ('name',)}, omit_none=True
+    ),
+}, default=[*_APPLICATION_DETAILS, 'reviewed_by'], always=('id', 'date_created'))
+
+# Admin application listing and search
+ADMIN_APPLICATION_FIELDS = Fieldset(Application, {
+    **_APPLICATION_DETAILS,
+    'student': related('student', ('id', 'name', 'email', 'phone'), 'student_id'),
+    'reviewed_by': related('reviewer', ('name', 'email'), 'reviewed_by', omit_none=True),
+}, default=[*_APPLICATION_DETAILS, 'student', 'reviewed_by'], always=('id', 'date_created'))
+
+ADMIN_SEARCH_FIELDS = Fieldset(Application, {
+    **ADMIN_APPLICATION_FIELDS.fields,
+    'student': related('student', ('name', 'email'), 'student_id'),
+}, default=[
+    'id', 'student', 'course_applied', 'status', 'twelfth_percentage', 'date_created', 'review_comments'
+], always=('id', 'date_created'))
+
+# Flat application records for CSV and NDJSON exports
+EXPORT_FIELDS = Fieldset(Application, {
+    **_APPLICATION_DETAILS,
+    'student_id': value('student_id'),
+    'student_name': Field(attrgetter('student.name'), related={'student': ('name',)}),
+    'student_email': Field(attrgetter('student.email'), related={'student': ('email',)}),
+    'student_phone': Field(attrgetter('student.phone'), related={'student': ('phone',)}),
+    'reviewed_by': Field(
+        lambda obj: obj.reviewer.email if obj.reviewer else None,
+        columns=('reviewed_by',), related={'reviewer': ('email',)}
+    ),
+}, default=[
+    'id', 'student_id', 'student_name', 'student_email', 'student_phone',
+    *[name for name in _APPLICATION_DETAILS if name != 'id'], 'reviewed_by'
+], always=('id', 'date_created'))
+
+
+def days_pending(application):
+    # The database hands back naive UTC timestamps
+    created = application.date_created
+    if created.tzinfo is None:
+        created = created.replace(tzinfo=timezone.utc)
+    return (datetime.now(timezone.utc) - created).days
+
+
+# Applications waiting for review on the admin dashboard
+PENDING_REVIEW_FIELDS = Fieldset(Application, {
+    'id': value('id'),
+    'student_name': Field(attrgetter('student.name'), related={'student': ('name',)}),
+    'course_applied': value('course_applied'),
+    'date_created': timestamp('date_created'),
+    'days_pending': Field(days_pending, columns=('date_created',)),
+}, default=['id', 'student_name', 'course_applied', 'date_created', 'days_pending'])
+
+# Users, for the admin listing and every account payload
+USER_FIELDS = Fieldset(User, {
+    'id': value('id'),
+    'name': value('name'),
+    'email': value('email'),
+    'phone': value('phone'),
+    'address': value('address'),
+    'country': value('country'),
+    'state': value('state'),
+    'district': value('district'),
+    'pincode': value('pincode'),
+    'roles': Field(lambda obj: [role.name for role in obj.roles], related={'roles': ('name',)}),
+    'date_created': timestamp('date_created'),
+    'is_active': value('active'),
+}, default=['id', 'name', 'email', 'phone', 'address', 'country', 'state', 'district', 'pincode',
+            'roles', 'date_created', 'is_active'], always=('id', 'date_created'))
+
+# Account payloads returned after login, registration and admin creation
+USER_ACCOUNT = ('id', 'name', 'email', 'phone', 'roles')
+# Profile payloads returned after profile edits
+USER_PROFILE = ('id', 'name', 'email', 'phone', 'address', 'country', 'state', 'district', 'pincode', 'roles')
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Flask JSON provider that encodes and decodes with orjson.
+
+    Output matches the default provider apart from non-ASCII text being
+    written as UTF-8 instead of escaped: keys are sorted, and the values
+    orjson would format differently (dates, Decimals) go through the
+    default provider's conversions. Calls with custom json arguments fall
+    back to the standard library.
+    """
+
+    options = (orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME) if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return super().dumps(obj, **kwargs)
+        return orjson.dumps(obj, default=self.default, option=self.options).decode()
+
+    def loads(self, s, **kwargs):
+        if kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        options = self.options | orjson.OPT_APPEND_NEWLINE
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            options |= orjson.OPT_INDENT_2
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=options), mimetype=self.mimetype
+        )
+
+
+def init_json_backend(app):
+    """Use orjson for JSON requests and responses when configured (and, for
+    ``auto``, installed)"""
+    backend = app.config['JSON_BACKEND']
+    if backend not in ('auto', 'orjson', 'stdlib'):
+        raise ValueError(f'Unknown JSON backend: {backend}')
+    if backend == 'orjson' and orjson is None:
+        raise ValueError('JSON_BACKEND is orjson but orjson is not installed')
+    if backend != 'stdlib' and orjson is not None:
+        app.json = OrjsonProvider(app)
+    return app.json
@@ -0,0 +1,35 @@
+import os
+
+from app.models import db
+from app.passwords import init_password_hashing
+
+
+def serving_plan(cpu_count, pool_size, max_overflow, max_connections, workers=0, threads=0):
+    """Worker processes and threads per worker for the pre-fork server.
+
+    A worker gets as many threads as its pool keeps connections, so request
+    threads do not queue for a connection. Workers default to two per core
+    plus one, capped so that every worker's full pool (with overflow) fits
+    in ``max_connections``. Explicit ``workers`` or ``threads`` win.
+    """
+    per_worker = pool_size + max_overflow
+    threads = threads or max(1, min(pool_size, per_worker))
+    workers = workers or max(1, min(2 * cpu_count + 1, max_connections // max(1, per_worker)))
+    return workers, threads
+
+
+def after_fork(app, workers):
+    """Prepare a worker process forked from a master that created the app.
+
+    Pooled connections opened in the master (database setup, default admin)
+    are left to it; the worker opens its own. The password hashing pool is
+    recreated in the worker, sized so that all workers together use about
+    half the cores unless PASSWORD_HASH_WORKERS is set.
+    """
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+    if not app.config['PASSWORD_HASH_WORKERS']:
+        app.config['PASSWORD_HASH_WORKERS'] = max(1, (os.cpu_count() or 1) // 2 // workers)
+    init_password_hashing(app)
@@ -0,0 +1,115 @@
+from collections import defaultdict
+from sqlalchemy import func, literal_column
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.functions import FunctionElement
+from sqlalchemy.types import String
+
+from app.models import db, Application, ApplicationCounter, User, UserCounter
+
+# Role key of the user counters under which every user is counted once
+ALL_USERS = '*'
+
+
+class year_month(FunctionElement):
+    """'YYYY-MM' label of a date column, rendered for the current database"""
+    type = String()
+    name = 'year_month'
+    inherit_cache = True
+
+
+@compiles(year_month)
+def compile_year_month(element, compiler, **kw):
+    # A literal format (not a bound parameter) keeps the SELECT and GROUP BY
+    # expressions identical for MySQL's ONLY_FULL_GROUP_BY check
+    return compiler.process(func.date_format(*element.clauses.clauses, literal_column("'%Y-%m'")), **kw)
+
+
+@compiles(year_month, 'sqlite')
+def compile_year_month_sqlite(element, compiler, **kw):
+    return compiler.process(func.strftime(literal_column("'%Y-%m'"), *element.clauses.clauses), **kw)
+
+
+# Counts are read from the counters tables that app/counters.py maintains,
+# so they cost the same however many applications and users there are. Only
+# the "recent" counts look at the application and user tables, and those
+# are range queries on date_created.
+
+def application_summary(recent_since):
+    """Count applications by status, plus submissions since ``recent_since``"""
+    status_counts = dict(db.session.query(
+        ApplicationCounter.status,
+        func.sum(ApplicationCounter.count)
+    ).group_by(ApplicationCounter.status).all())
+
+    summary = {
+        status: int(status_counts.get(status) or 0)
+        for status in ('pending', 'approved', 'rejected', 'draft')
+    }
+    summary['total'] = int(sum(count or 0 for count in status_counts.values()))
+    summary['recent'] = db.session.query(func.count(Application.id)).filter(
+        Application.date_created >= recent_since
+    ).scalar()
+
+    reviewed = summary['approved'] + summary['rejected']
+    summary['approval_rate'] = round(summary['approved'] / reviewed * 100, 2) if reviewed > 0 else 0
+    return summary
+
+
+def application_breakdowns(trend_since):
+    """Per-course totals and monthly counts from the month of ``trend_since`` on.
+
+    Returns ``(courses, months)``: courses as ``(course, count)`` pairs,
+    busiest first, and months as ``(month, count)`` pairs in order.
+    """
+    rows = db.session.query(
+        ApplicationCounter.course_applied,
+        ApplicationCounter.month,
+        func.sum(ApplicationCounter.count).label('count')
+    ).group_by(ApplicationCounter.course_applied, ApplicationCounter.month).all()
+
+    first_month = trend_since.strftime('%Y-%m')
+    courses = defaultdict(int)
+    months = defaultdict(int)
+    for course, month, count in rows:
+        count = int(count or 0)
+        courses[course] += count
+        if month >= first_month:
+            months[month] += count
+
+    return (
+        sorted((item for item in courses.items() if item[1] > 0), key=lambda item: (-item[1], item[0])),
+        sorted(item for item in months.items() if item[1] > 0)
+    )
+
+
+def user_summary(recent_since):
+    """Count users by active flag and role, plus registrations since ``recent_since``.
+
+    ``roles`` maps every role that has users to its user count.
+    """
+    summary = {'total': 0, 'active': 0, 'inactive': 0, 'students': 0, 'admins': 0}
+    roles = defaultdict(int)
+    for role, active, count in db.session.query(UserCounter.role, UserCounter.active, UserCounter.count):
+        if role == ALL_USERS:
+            summary['total'] += count
+            summary['active' if active else 'inactive'] += count
+        else:
+            roles[role] += count
+    summary['students'] = roles['student']
+    summary['admins'] = roles['admin']
+    summary['roles'] = {role: count for role, count in sorted(roles.items()) if count > 0}
+
+    summary['recent'] = db.session.query(func.count(User.id)).filter(
+        User.date_created >= recent_since
+    ).scalar()
+    return summary
+
+
+def monthly_registrations(since):
+    """(month, count) pairs of users registered since ``since``"""
+    return db.session.query(
+        year_month(User.date_created).label('month'),
+        func.count(User.id).label('count')
+    ).filter(
+        User.date_created >= since
+    ).group_by(literal_column('month')).order_by(literal_column('month')).all()
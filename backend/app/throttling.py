@@ -0,0 +1,251 @@
+import functools
+import hashlib
+import math
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import namedtuple
+from flask import current_app, jsonify, request
+from sqlalchemy import select
+
+from app.models import db, ThrottleCounter
+from app.counters import upsert_counter
+
+# Clients each action is counted by, the config key of its limit and the
+# response statuses counted (None: every attempt the view handles). Only
+# failed logins count per email, so signing in does not use up the limit
+THROTTLE_RULES = {
+    'login': (('ip', 'LOGIN_LIMIT_PER_IP', None), ('email', 'LOGIN_LIMIT_PER_EMAIL', (401,))),
+    'register': (('ip', 'REGISTER_LIMIT_PER_IP', None), ('email', 'REGISTER_LIMIT_PER_EMAIL', None)),
+}
+
+ThrottleBucket = namedtuple('ThrottleBucket', 'key limit statuses')
+
+
+def sliding_count(previous, current, elapsed, window):
+    """Attempts in the last ``window`` seconds, estimated from the counts of
+    the previous and current fixed windows as if the previous window's
+    attempts were spread evenly over it"""
+    return previous * (1 - elapsed / window) + current
+
+
+def seconds_until_allowed(previous, current, elapsed, window, limit):
+    """Seconds until one more attempt fits within ``limit``, that is until
+    the sliding count drops to ``limit - 1``"""
+    allowed = limit - 1
+    if current > allowed:
+        # Wait for this window to end and enough of it to slide past
+        wait = (window - elapsed) + window * (1 - allowed / current)
+    else:
+        wait = window * (1 - (allowed - current) / previous) - elapsed
+    return max(1, math.ceil(wait))
+
+
+class ThrottleBackend(ABC):
+    """Attempt counters per bucket, in fixed windows of ``window`` seconds"""
+
+    def __init__(self, window):
+        self.window = window
+
+    @abstractmethod
+    def hit(self, bucket, now):
+        """Count an attempt; returns the previous and current window's counts"""
+
+    @abstractmethod
+    def undo(self, bucket, now):
+        """Take back an attempt counted by ``hit`` at ``now``"""
+
+    def clear(self):
+        pass
+
+
+class MemoryThrottleBackend(ThrottleBackend):
+    """Counters in this process only: a dict of ``[period, previous, current]``
+    per bucket, swept of idle buckets once per window"""
+
+    def __init__(self, window):
+        super().__init__(window)
+        self._counters = {}
+        self._swept = 0
+        self._lock = threading.Lock()
+
+    def hit(self, bucket, now):
+        period = int(now // self.window)
+        with self._lock:
+            if period > self._swept:
+                self._sweep(period)
+            counter = self._counters.get(bucket)
+            if counter is None:
+                counter = self._counters[bucket] = [period, 0, 0]
+            elif counter[0] != period:
+                # Roll over: the current window becomes the previous one, or
+                # both are stale after a window without attempts
+                counter[1] = counter[2] if counter[0] == period - 1 else 0
+                counter[0], counter[2] = period, 0
+            counter[2] += 1
+            return counter[1], counter[2]
+
+    def undo(self, bucket, now):
+        period = int(now // self.window)
+        with self._lock:
+            counter = self._counters.get(bucket)
+            if counter is None:
+                return
+            # The window may have rolled over since the hit
+            if counter[0] == period:
+                counter[2] = max(0, counter[2] - 1)
+            elif counter[0] == period + 1:
+                counter[1] = max(0, counter[1] - 1)
+
+    def clear(self):
+        with self._lock:
+            self._counters.clear()
+
+    def _sweep(self, period):
+        self._counters = {
+            bucket: counter for bucket, counter in self._counters.items() if counter[0] >= period - 1
+        }
+        self._swept = period
+
+
+class DatabaseThrottleBackend(ThrottleBackend):
+    """Counters in the throttle_counter table, shared by every process using
+    the database. Each attempt is an upsert and a read on its own
+    connection, outside the request's transaction."""
+
+    def __init__(self, window):
+        super().__init__(window)
+        self._swept = 0
+
+    def hit(self, bucket, now):
+        period = int(now // self.window)
+        with db.engine.begin() as connection:
+            upsert_counter(connection, ThrottleCounter, {'bucket': bucket, 'period': period}, 1)
+            counts = dict(connection.execute(
+                select(ThrottleCounter.period, ThrottleCounter.count)
+                .where(ThrottleCounter.bucket == bucket, ThrottleCounter.period >= period - 1)
+            ).all())
+            if period > self._swept:
+                connection.execute(ThrottleCounter.__table__.delete().where(ThrottleCounter.period < period - 1))
+                self._swept = period
+        return counts.get(period - 1, 0), counts.get(period, 0)
+
+    def undo(self, bucket, now):
+        period = int(now // self.window)
+        table = ThrottleCounter.__table__
+        with db.engine.begin() as connection:
+            connection.execute(
+                table.update()
+                .where(table.c.bucket == bucket, table.c.period == period, table.c.count > 0)
+                .values(count=table.c.count - 1)
+            )
+
+    def clear(self):
+        with db.engine.begin() as connection:
+            connection.execute(ThrottleCounter.__table__.delete())
+
+
+THROTTLE_BACKENDS = {
+    'memory': MemoryThrottleBackend,
+    'database': DatabaseThrottleBackend,
+}
+
+
+def init_throttling(app):
+    backend = app.config['THROTTLE_BACKEND']
+    if backend not in THROTTLE_BACKENDS:
+        raise ValueError(f'Unknown throttle backend: {backend}')
+    throttle = THROTTLE_BACKENDS[backend](app.config['THROTTLE_WINDOW'])
+    app.extensions['throttle'] = throttle
+    return throttle
+
+
+def request_clients():
+    """The client IP and the email address a login or registration is for"""
+    data = request.get_json(silent=True)
+    email = data.get('email') if isinstance(data, dict) else None
+    return {
+        'ip': request.remote_addr or '',
+        'email': email.strip().lower() if isinstance(email, str) else '',
+    }
+
+
+def throttle_buckets(action):
+    """The request's buckets under the action's limits"""
+    clients = request_clients()
+    buckets = []
+    for scope, limit_key, statuses in THROTTLE_RULES[action]:
+        limit = current_app.config[limit_key]
+        if not limit or not clients[scope]:
+            continue
+        key = hashlib.sha256(f'{action}:{scope}:{clients[scope]}'.encode()).hexdigest()
+        buckets.append(ThrottleBucket(key, limit, statuses))
+    return buckets
+
+
+def throttle_retry_after(buckets, now):
+    """Count an attempt in every bucket and decide from the counts the
+    increments return, so a burst of concurrent attempts cannot all slip
+    under a limit. When a limit is exceeded the attempt is taken back from
+    every bucket, as rejected requests do not count, and the seconds to
+    wait are returned; else None."""
+    throttle = current_app.extensions['throttle']
+    elapsed = now % throttle.window
+    retry_after = None
+    counted = []
+    try:
+        for bucket in buckets:
+            previous, current = throttle.hit(bucket.key, now)
+            counted.append(bucket)
+            if sliding_count(previous, current, elapsed, throttle.window) > bucket.limit:
+                wait = seconds_until_allowed(previous, current - 1, elapsed, throttle.window, bucket.limit)
+                retry_after = max(retry_after or 0, wait)
+    except Exception:
+        undo_attempt(counted, now)
+        raise
+    if retry_after:
+        undo_attempt(counted, now)
+    return retry_after
+
+
+def undo_attempt(buckets, now):
+    throttle = current_app.extensions['throttle']
+    for bucket in buckets:
+        throttle.undo(bucket.key, now)
+
+
+def throttled(action):
+    """Answer requests over the action's limits with a 429 and Retry-After
+    before the view, and its password hashing, runs.
+
+    Every allowed attempt is counted before the view runs; limits on
+    failures only give the attempt back when the view did not fail.
+    Rejected attempts are not counted, so a blocked client is let in again
+    once its attempts slide out of the window. If the backend fails,
+    requests are let through.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            now = time.time()
+            try:
+                buckets = throttle_buckets(action)
+                retry_after = throttle_retry_after(buckets, now)
+            except Exception as e:
+                current_app.logger.warning('Throttling unavailable: %s', e)
+                buckets, retry_after = [], None
+            if retry_after:
+                return jsonify({
+                    'error': 'Too many attempts, please try again later',
+                    'retry_after': retry_after
+                }), 429, {'Retry-After': str(retry_after)}
+
+            response = current_app.make_response(view(*args, **kwargs))
+            try:
+                undo_attempt([bucket for bucket in buckets
+                              if bucket.statuses and response.status_code not in bucket.statuses], now)
+            except Exception as e:
+                current_app.logger.warning('Throttling unavailable: %s', e)
+            return response
+        return wrapper
+    return decorator
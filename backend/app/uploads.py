@@ -0,0 +1,264 @@
+import base64
+import binascii
+import hashlib
+import itertools
+import os
+import re
+import tempfile
+from flask import after_this_request, current_app, request
+from werkzeug.formparser import parse_form_data
+
+from app.documents import DOCUMENT_TYPES, FILE_SIGNATURES, detect_mimetype, get_document_store
+from app.json_stream import StreamingJSONParser
+
+# Per-document limits, shared by the multipart and JSON upload paths
+MAX_DOCUMENT_SIZE = 5 * 1024 * 1024  # 5MB
+MIN_DOCUMENT_SIZE = 100  # At least 100 bytes
+
+# Size of the reads from the request body when streaming JSON
+JSON_CHUNK_SIZE = 64 * 1024
+
+# Bytes needed to recognise every accepted file type
+SIGNATURE_LENGTH = max(len(signature) for signature, _ in FILE_SIGNATURES)
+
+
+class UploadError(ValueError):
+    """Raised when an uploaded document fails validation"""
+
+
+def sanitize_filename(filename, file_type):
+    """Return a safe stored filename for an uploaded document"""
+    if not isinstance(filename, str) or not filename or len(filename) > 255:
+        filename = f'{file_type}_document'
+    return re.sub(r'[^a-zA-Z0-9._-]', '_', filename)
+
+
+class DocumentSpool:
+    """Temporary file that validates and hashes a document while it is written.
+
+    Data is written through in chunks, so the document is never held in
+    memory as a whole. The size limit and magic bytes are checked as soon as
+    enough data has arrived, which aborts oversized or unsupported uploads
+    without reading the rest of the request.
+    """
+
+    def __init__(self, label, directory=None, max_size=MAX_DOCUMENT_SIZE):
+        self.label = label
+        self.max_size = max_size
+        self.size = 0
+        self.mimetype = None
+        self.ref = None
+        self.filename = None
+        self._header = b''
+        self._digest = hashlib.sha256()
+        fd, self.path = tempfile.mkstemp(dir=directory, prefix='.upload-')
+        self._file = os.fdopen(fd, 'w+b')
+
+    def write(self, data):
+        self.size += len(data)
+        if self.size > self.max_size:
+            raise UploadError(f"{self.label} file size exceeds {self.max_size // (1024 * 1024)}MB limit")
+
+        if len(self._header) < SIGNATURE_LENGTH:
+            self._header += data[:SIGNATURE_LENGTH - len(self._header)]
+            if len(self._header) == SIGNATURE_LENGTH:
+                self._check_file_type()
+
+        self._digest.update(data)
+        self._file.write(data)
+        return len(data)
+
+    def _check_file_type(self):
+        self.mimetype = detect_mimetype(self._header)
+        if self.mimetype is None:
+            raise UploadError(f"{self.label} file type not supported. Only PDF, JPG, and PNG files are allowed")
+
+    def finish(self):
+        """Validate the complete document and close the spool file"""
+        if self.size < MIN_DOCUMENT_SIZE:
+            raise UploadError(f"{self.label} file is too small or empty")
+        if self.mimetype is None:
+            self._check_file_type()
+        self._file.close()
+        self.ref = self._digest.hexdigest()
+        return self
+
+    # File-like methods used by werkzeug while parsing
+    def seek(self, *args):
+        if not self._file.closed:
+            return self._file.seek(*args)
+        return 0
+
+    def close(self):
+        self._file.close()
+
+    def release(self):
+        """Hand the finished file over to the caller, who now owns it"""
+        path, self.path = self.path, None
+        return path
+
+    def discard(self):
+        """Delete the spool file unless it has been released to the store"""
+        self._file.close()
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+            self.path = None
+
+
+def parse_multipart_submission():
+    """Parse a multipart application submission without buffering documents.
+
+    Returns the form fields as a dict and the finished document spools keyed
+    by document type. Document parts are streamed straight into spool files
+    next to the document store, so storing them later is a rename.
+    """
+    spools = []
+    spool_dir = get_document_store().spool_dir
+
+    def stream_factory(total_content_length, content_type, filename, content_length=None):
+        spool = DocumentSpool(filename or 'uploaded', directory=spool_dir)
+        spools.append(spool)
+        return spool
+
+    documents = {}
+    try:
+        _, form, files = parse_form_data(
+            request.environ,
+            stream_factory=stream_factory,
+            max_content_length=current_app.config['MAX_CONTENT_LENGTH'],
+            silent=False
+        )
+
+        for document_type in DOCUMENT_TYPES:
+            upload = files.get(document_type)
+            if upload and upload.filename:
+                spool = upload.stream
+                spool.label = document_type
+                spool.filename = sanitize_filename(upload.filename, document_type)
+                documents[document_type] = spool.finish()
+    except Exception:
+        for spool in spools:
+            spool.discard()
+        raise
+
+    # Whatever was not moved into the store is removed once the request is done
+    @after_this_request
+    def discard_spools(response):
+        for spool in spools:
+            spool.discard()
+        return response
+
+    return form.to_dict(), documents
+
+
+class Base64DocumentSink:
+    """Decode a base64 (or data URL) string into a spool as it streams in"""
+
+    # A data URL header ("data:application/pdf;base64,") must end within this many characters
+    MAX_PREFIX_LENGTH = 256
+
+    def __init__(self, spool):
+        self.spool = spool
+        self._pending = ''
+        self._in_prefix = True
+        self._padded = False
+
+    def write(self, text):
+        try:
+            if self._in_prefix:
+                self._pending += text
+                comma = self._pending.find(',')
+                if comma != -1:
+                    self._pending = self._pending[comma + 1:]
+                elif len(self._pending) < self.MAX_PREFIX_LENGTH:
+                    return
+                self._in_prefix = False
+                text, self._pending = self._pending, ''
+
+            # Decode whole 4-character groups and carry the remainder over
+            data = self._pending + text
+            usable = len(data) - len(data) % 4
+            self._pending = data[usable:]
+            if usable:
+                self._decode(data[:usable])
+        except (binascii.Error, UploadError) as e:
+            raise UploadError(f"Invalid {self.spool.label} file: {str(e)}")
+
+    def _decode(self, text):
+        if self._padded:
+            raise binascii.Error('Excess data after padding')
+        self.spool.write(base64.b64decode(text, validate=True))
+        self._padded = text.endswith('=')
+
+    def close(self):
+        self._in_prefix = False
+        if self._pending:
+            if len(self._pending) % 4:
+                raise UploadError(f"Invalid {self.spool.label} file: Incorrect padding")
+            try:
+                self._decode(self._pending)
+            except (binascii.Error, UploadError) as e:
+                raise UploadError(f"Invalid {self.spool.label} file: {str(e)}")
+            self._pending = ''
+        return self.spool
+
+
+def parse_json_submission():
+    """Parse a JSON application submission without building the documents in memory.
+
+    The ``data`` fields of ``degree_certificate`` and ``id_proof`` are
+    base64-decoded into spool files while the body is read, so peak memory
+    stays at a few chunks whatever the document size. Returns the remaining
+    fields as a dict and the finished document spools keyed by document
+    type, or None if the body has already been read by someone else.
+    """
+    chunks = iter(lambda: request.stream.read(JSON_CHUNK_SIZE), b'')
+    first_chunk = next(chunks, None)
+    if first_chunk is None:
+        return None
+
+    spools = []
+    spool_dir = get_document_store().spool_dir
+
+    def document_sink(document_type):
+        def create_sink():
+            spool = DocumentSpool(document_type, directory=spool_dir)
+            spools.append(spool)
+            return Base64DocumentSink(spool)
+        return create_sink
+
+    parser = StreamingJSONParser(
+        itertools.chain([first_chunk], chunks),
+        stream_strings={
+            (document_type, 'data'): document_sink(document_type)
+            for document_type in DOCUMENT_TYPES
+        }
+    )
+
+    documents = {}
+    try:
+        data = parser.parse()
+        if not isinstance(data, dict):
+            raise UploadError('Submission must be a JSON object')
+
+        for document_type in DOCUMENT_TYPES:
+            upload = data.pop(document_type, None)
+            if isinstance(upload, dict) and isinstance(upload.get('data'), DocumentSpool):
+                spool = upload['data']
+                spool.filename = sanitize_filename(upload.get('filename'), document_type)
+                documents[document_type] = spool.finish()
+    except Exception:
+        for spool in spools:
+            spool.discard()
+        raise
+
+    @after_this_request
+    def discard_spools(response):
+        for spool in spools:
+            spool.discard()
+        return response
+
+    return data, documents
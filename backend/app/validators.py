@@ -0,0 +1,22 @@
+import re
+from datetime import datetime
+
+
+def validate_email(email):
+    """Validate email format"""
+    pattern = r'^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$'
+    return re.match(pattern, email) is not None
+
+
+def validate_phone(phone):
+    """Validate phone number format"""
+    pattern = r'^[0-9]{10}$'
+    return re.match(pattern, phone) is not None
+
+
+def parse_date(value):
+    """Parse a YYYY-MM-DD date into a datetime at midnight; None when empty.
+    Raises ValueError for anything else."""
+    if not value:
+        return None
+    return datetime.strptime(str(value), '%Y-%m-%d')
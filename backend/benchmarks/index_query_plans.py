@@ -0,0 +1,195 @@
+#!/usr/bin/env python3
+"""
+Benchmark the hot application queries before and after the model indexes
+
+Seeds a scratch database with applications (1M by default), then runs the
+queries the routes issue most (a student's draft, per-status listings,
+recent counts, a deep cursor page and a course filter) once without the
+indexes declared in app/models.py and once with them. For each query it
+prints the median time and the plan the database chose.
+
+Point --database-url at an empty MySQL database to see InnoDB plans; the
+default is a throwaway SQLite file. Note that MySQL already has an index
+on student_id from its foreign key, SQLite does not.
+
+Usage: python benchmarks/index_query_plans.py [--rows N] [--database-url URL]
+"""
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from sqlalchemy import create_engine, text
+
+from app.models import db, Application, User
+
+COURSES = [f'Course {number:02d}' for number in range(20)]
+STATUSES = ['approved'] * 3 + ['rejected'] * 2 + ['pending'] * 4 + ['draft']
+START = datetime(2023, 1, 1)
+SPAN_SECONDS = 3 * 365 * 24 * 3600
+CHUNK = 20000
+
+QUERIES = [
+    ('student draft',
+     "SELECT * FROM application WHERE student_id = :student_id AND status = 'draft'"),
+    ('pending, newest first',
+     "SELECT * FROM application WHERE status = 'pending' "
+     "ORDER BY date_created DESC, id DESC LIMIT 10"),
+    ('recent submissions',
+     "SELECT COUNT(*) FROM application WHERE date_created >= :since"),
+    ('deep cursor page',
+     "SELECT * FROM application WHERE date_created <= :date_created "
+     "AND (date_created < :date_created OR date_created = :date_created AND id < :id) "
+     "ORDER BY date_created DESC, id DESC LIMIT 10"),
+    ('course, percentage range',
+     "SELECT * FROM application WHERE course_applied = :course "
+     "AND twelfth_percentage >= :min_percentage"),
+]
+
+
+def seed(engine, rows, rng):
+    """Insert ``rows`` applications from one student per five applications"""
+    students = max(rows // 5, 1)
+    user_table = User.__table__
+    application_table = Application.__table__
+
+    with engine.begin() as connection:
+        for first in range(1, students + 1, CHUNK):
+            connection.execute(user_table.insert(), [{
+                'id': user_id,
+                'fs_uniquifier': uuid.uuid4().hex,
+                'name': f'Student {user_id}',
+                'email': f'student{user_id}@example.com',
+                'phone': f'{user_id:010d}',
+                'password': 'x',
+                'address': 'Street', 'country': 'India', 'state': 'State',
+                'district': 'District', 'pincode': '560001',
+                'active': True,
+                'date_created': START
+            } for user_id in range(first, min(first + CHUNK, students + 1))])
+
+        for first in range(1, rows + 1, CHUNK):
+            connection.execute(application_table.insert(), [{
+                'id': application_id,
+                'student_id': rng.randint(1, students),
+                'course_applied': rng.choice(COURSES),
+                'tenth_percentage': round(rng.uniform(50, 100), 1),
+                'tenth_board': 'CBSE',
+                'twelfth_percentage': round(rng.uniform(50, 100), 1),
+                'twelfth_board': 'CBSE',
+                'previous_qualification': 'Higher Secondary',
+                'previous_institution': 'High School',
+                'graduation_year': 2024,
+                'address': 'Street', 'country': 'India', 'state': 'State',
+                'district': 'District', 'pincode': '560001',
+                'degree_certificate_filename': 'degree.pdf',
+                'id_proof_filename': 'id.pdf',
+                'status': rng.choice(STATUSES),
+                'date_created': START + timedelta(seconds=rng.randrange(SPAN_SECONDS))
+            } for application_id in range(first, min(first + CHUNK, rows + 1))])
+    return students
+
+
+def query_plan(connection, sql, params):
+    if connection.dialect.name == 'sqlite':
+        rows = connection.execute(text('EXPLAIN QUERY PLAN ' + sql), params).all()
+        return '; '.join(row[-1] for row in rows)
+    rows = connection.execute(text('EXPLAIN ' + sql), params).mappings().all()
+    return '; '.join(
+        f"{row['table']}: key={row['key']} rows={row['rows']} {row['Extra'] or ''}".strip()
+        for row in rows
+    )
+
+
+def measure(engine, params, repeat):
+    """Median milliseconds and plan of every query"""
+    results = {}
+    with engine.connect() as connection:
+        for label, sql in QUERIES:
+            timings = []
+            for _ in range(repeat):
+                start = time.perf_counter()
+                connection.execute(text(sql), params).all()
+                timings.append(time.perf_counter() - start)
+            results[label] = (statistics.median(timings) * 1000, query_plan(connection, sql, params))
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=1_000_000,
+                        help='applications to seed (default: 1000000)')
+    parser.add_argument('--repeat', type=int, default=5,
+                        help='runs per query, the median is reported (default: 5)')
+    parser.add_argument('--database-url',
+                        help='empty scratch database to use (default: a temporary SQLite file)')
+    args = parser.parse_args()
+
+    scratch = None
+    if args.database_url:
+        url = args.database_url
+    else:
+        scratch = tempfile.NamedTemporaryFile(suffix='.db', delete=False)
+        scratch.close()
+        url = f'sqlite:///{scratch.name}'
+
+    engine = create_engine(url)
+    tables = [User.__table__, Application.__table__]
+    indexes = [index for table in tables for index in table.indexes]
+    rng = random.Random(42)
+
+    try:
+        db.metadata.create_all(engine, tables=tables)
+        for index in indexes:
+            index.drop(engine)
+
+        print(f"Seeding {args.rows} applications...")
+        start = time.perf_counter()
+        students = seed(engine, args.rows, rng)
+        print(f"Seeded in {time.perf_counter() - start:.1f}s")
+
+        with engine.connect() as connection:
+            deep_row = connection.execute(text(
+                "SELECT date_created, id FROM application "
+                "ORDER BY date_created DESC, id DESC LIMIT 1 OFFSET :offset"
+            ), {'offset': args.rows // 2}).one()
+        params = {
+            'student_id': rng.randint(1, students),
+            'since': START + timedelta(seconds=SPAN_SECONDS - 7 * 24 * 3600),
+            'date_created': deep_row.date_created,
+            'id': deep_row.id,
+            'course': COURSES[0],
+            'min_percentage': 95.0
+        }
+
+        before = measure(engine, params, args.repeat)
+        print("Creating indexes...")
+        start = time.perf_counter()
+        for index in indexes:
+            index.create(engine)
+        print(f"Indexed in {time.perf_counter() - start:.1f}s")
+        after = measure(engine, params, args.repeat)
+    finally:
+        engine.dispose()
+        if scratch:
+            os.unlink(scratch.name)
+
+    print(f"Query plans on {engine.dialect.name}, {args.rows} applications")
+    print("=" * 50)
+    for label, _ in QUERIES:
+        (before_ms, before_plan), (after_ms, after_plan) = before[label], after[label]
+        print(f"{label:<26} {before_ms:9.2f} ms -> {after_ms:8.2f} ms  ({before_ms / max(after_ms, 1e-6):.0f}x)")
+        print(f"    without: {before_plan}")
+        print(f"    with:    {after_plan}")
+
+
+if __name__ == "__main__":
+    main()
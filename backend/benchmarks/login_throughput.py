@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Benchmark logins under a login storm
+
+Starts the app on a throwaway SQLite database, registers a student and
+fires --logins logins from --concurrency client threads, while another
+thread keeps requesting /health to see how the rest of the application
+fares. It runs twice:
+
+- hashing on every request thread, as logins did before the hashing pool
+  (a pool with one worker per client and no queue limit)
+- the bounded hashing pool from the configuration (PASSWORD_HASH_WORKERS,
+  PASSWORD_HASH_QUEUE, PASSWORD_HASH_TIMEOUT)
+
+and prints logins per second, login and /health latencies and how many
+logins were turned away with a 503, or a 429 from the login throttle, which
+is turned off here since every login comes from one client. The Argon2
+parameters come from the configuration (ARGON2_TIME_COST,
+ARGON2_MEMORY_COST, ARGON2_PARALLELISM).
+
+Usage: python benchmarks/login_throughput.py [--logins N] [--concurrency N]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+STUDENT = dict(name='Storm Student', email='storm@example.com', phone='9876543210', password='storm-password',
+               address='Street 1', country='India', state='Karnataka', district='Bengaluru', pincode='560001')
+
+
+def percentile(timings, fraction):
+    ordered = sorted(timings)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def storm(app, logins, concurrency):
+    local = threading.local()
+    done = threading.Event()
+    health = []
+
+    def login(_):
+        if not hasattr(local, 'client'):
+            local.client = app.test_client()
+        start = time.perf_counter()
+        response = local.client.post('/api/auth/login', json={'email': STUDENT['email'],
+                                                              'password': STUDENT['password']})
+        return response.status_code, time.perf_counter() - start
+
+    def probe():
+        client = app.test_client()
+        while not done.is_set():
+            start = time.perf_counter()
+            client.get('/health')
+            health.append(time.perf_counter() - start)
+            time.sleep(0.01)
+
+    prober = threading.Thread(target=probe)
+    prober.start()
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as clients:
+        results = list(clients.map(login, range(logins)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    prober.join()
+
+    succeeded = [seconds for status, seconds in results if status == 200]
+    busy = sum(1 for status, _ in results if status == 503)
+    throttled = sum(1 for status, _ in results if status == 429)
+    return elapsed, succeeded, busy, throttled, health
+
+
+def report(label, elapsed, succeeded, busy, throttled, health):
+    print(f"{label:<22} {len(succeeded) / elapsed:7.2f} logins/s   "
+          f"login p50 {percentile(succeeded, 0.5) * 1000:7.0f} ms  p95 {percentile(succeeded, 0.95) * 1000:7.0f} ms   "
+          f"/health p50 {percentile(health, 0.5) * 1000:6.1f} ms  p95 {percentile(health, 0.95) * 1000:6.1f} ms   "
+          f"503s {busy}  429s {throttled}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--logins', type=int, default=32,
+                        help='logins per run (default: 32)')
+    parser.add_argument('--concurrency', type=int, default=16,
+                        help='client threads logging in at once (default: 16)')
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp()
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(scratch, 'logins.db')}"
+    os.environ.setdefault('DOCUMENT_STORE_PATH', os.path.join(scratch, 'documents'))
+    os.environ.setdefault('OFFER_LETTER_CACHE_PATH', os.path.join(scratch, 'offer_letters'))
+    os.environ['LOGIN_LIMIT_PER_IP'] = os.environ['LOGIN_LIMIT_PER_EMAIL'] = '0'
+
+    from app import create_app, init_database
+    from app.passwords import PasswordHashingPool, argon2_parameters
+
+    app = create_app()
+    init_database(app)
+    app.test_client().post('/api/auth/register', json=STUDENT)
+    configured = app.extensions['password_hashing']
+    rounds, memory, parallelism = argon2_parameters(app.config['SECURITY_PASSWORD_HASH_PASSLIB_OPTIONS'])
+
+    print()
+    print(f"Login storm, {args.logins} logins from {args.concurrency} clients, Argon2 time cost "
+          f"{rounds}, memory {memory} KiB, parallelism {parallelism}, {os.cpu_count()} CPU cores")
+    print("=" * 50)
+
+    app.extensions['password_hashing'] = PasswordHashingPool(args.concurrency, 0, 3600)
+    report('hash on request thread', *storm(app, args.logins, args.concurrency))
+    app.extensions['password_hashing'].shutdown()
+
+    app.extensions['password_hashing'] = configured
+    report(f'pool of {configured.workers}', *storm(app, args.logins, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Benchmark offer letter rendering with and without the precompiled template
+
+The "per-request" path builds a fresh OfferLetterTemplate for every letter,
+which does the same work the download route used to do on each request:
+build the style sheet, every style and table style, and parse every
+paragraph. The "precompiled" path reuses one template and only fills in
+the student fields.
+
+Usage: python benchmarks/offer_letter_render.py [--iterations N]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.offer_letters import OfferLetterTemplate
+
+
+def sample_application(index):
+    student = SimpleNamespace(
+        name=f'Student Number {index}',
+        email=f'student{index}@example.com',
+        phone='+1-555-0100'
+    )
+    return SimpleNamespace(
+        id=index,
+        student=student,
+        course_applied='Computer Science',
+        graduation_year=2025,
+        tenth_percentage=91.2,
+        tenth_board='CBSE',
+        twelfth_percentage=88.4,
+        twelfth_board='CBSE',
+        previous_qualification='Higher Secondary',
+        previous_institution='Academic City High School'
+    )
+
+
+def per_request(application):
+    return OfferLetterTemplate().render(application)
+
+
+def measure(render, iterations):
+    """Return per-letter timings and the mean bytes allocated per letter"""
+    applications = [sample_application(i + 1) for i in range(iterations)]
+    render(applications[0])  # warm up imports and font metrics
+
+    timings = []
+    for application in applications:
+        start = time.perf_counter()
+        render(application)
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    allocated = 0
+    for application in applications[:min(iterations, 20)]:
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        render(application)
+        _, peak = tracemalloc.get_traced_memory()
+        allocated += peak - before
+    tracemalloc.stop()
+
+    return timings, allocated / min(iterations, 20)
+
+
+def report(label, timings, allocated):
+    print(f"{label:<14} median {statistics.median(timings) * 1000:7.2f} ms   "
+          f"p95 {sorted(timings)[int(len(timings) * 0.95) - 1] * 1000:7.2f} ms   "
+          f"peak alloc {allocated / 1024:8.1f} KB/letter")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=200,
+                        help='letters rendered per path (default: 200)')
+    args = parser.parse_args()
+
+    template = OfferLetterTemplate()
+
+    baseline = measure(per_request, args.iterations)
+    compiled = measure(template.render, args.iterations)
+
+    print(f"Offer letter rendering, {args.iterations} letters per path")
+    print("=" * 50)
+    report('per-request', *baseline)
+    report('precompiled', *compiled)
+    print(f"speedup: {statistics.median(baseline[0]) / statistics.median(compiled[0]):.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Benchmark serializing the admin application listing
+
+Builds transient Application rows (with a student and a reviewer, as the
+listing loads them) and times the two halves of a listing response:
+
+- building the dicts, once with the hand-written per-row dict the routes
+  used to build and once with the ADMIN_APPLICATION_FIELDS plan
+- encoding them, once with Flask's default provider (the standard library
+  json module) and once with the orjson provider, when orjson is installed
+
+Usage: python benchmarks/serializers.py [--rows N] [--repeat N]
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from app.models import Application, User
+from app.serializers import ADMIN_APPLICATION_FIELDS, OrjsonProvider, orjson
+
+START = datetime(2024, 1, 1)
+
+
+def sample_applications(rows):
+    reviewer = User(id=1, name='Admin', email='admin@email.com', phone='1234567890')
+    applications = []
+    for index in range(rows):
+        student = User(
+            id=index + 2,
+            name=f'Student Number {index}',
+            email=f'student{index}@example.com',
+            phone=f'{index:010d}'
+        )
+        reviewed = index % 3 == 0
+        applications.append(Application(
+            id=index + 1,
+            student=student,
+            course_applied='Computer Science',
+            status='approved' if reviewed else 'pending',
+            tenth_percentage=91.2,
+            tenth_board='CBSE',
+            twelfth_percentage=88.4,
+            twelfth_board='CBSE',
+            previous_qualification='Higher Secondary',
+            previous_institution='Academic City High School',
+            graduation_year=2025,
+            date_created=START + timedelta(minutes=index),
+            review_comments='Meets the criteria' if reviewed else None,
+            reviewed_at=START + timedelta(days=1, minutes=index) if reviewed else None,
+            reviewer=reviewer if reviewed else None,
+            address='Street 1',
+            country='India',
+            state='Karnataka',
+            district='Bengaluru',
+            pincode='560001',
+            degree_certificate_filename='degree.pdf',
+            id_proof_filename='id.png',
+            degree_certificate_length=182044,
+            id_proof_length=96310
+        ))
+    return applications
+
+
+def hand_written(applications):
+    """The per-row dict the admin listing built before field plans"""
+    applications_list = []
+    for app in applications:
+        app_data = {
+            'id': app.id,
+            'student': {
+                'id': app.student.id,
+                'name': app.student.name,
+                'email': app.student.email,
+                'phone': app.student.phone
+            },
+            'course_applied': app.course_applied,
+            'status': app.status,
+            'tenth_percentage': app.tenth_percentage,
+            'tenth_board': app.tenth_board,
+            'twelfth_percentage': app.twelfth_percentage,
+            'twelfth_board': app.twelfth_board,
+            'previous_qualification': app.previous_qualification,
+            'previous_institution': app.previous_institution,
+            'graduation_year': app.graduation_year,
+            'date_created': app.date_created.isoformat(),
+            'review_comments': app.review_comments,
+            'reviewed_at': app.reviewed_at.isoformat() if app.reviewed_at else None,
+            'address': app.address,
+            'country': app.country,
+            'state': app.state,
+            'district': app.district,
+            'pincode': app.pincode,
+            'degree_certificate_filename': app.degree_certificate_filename,
+            'id_proof_filename': app.id_proof_filename,
+            'has_degree_certificate': bool(app.degree_certificate_length),
+            'has_id_proof': bool(app.id_proof_length),
+            'degree_certificate_size': app.degree_certificate_length,
+            'id_proof_size': app.id_proof_length
+        }
+        if app.reviewer:
+            app_data['reviewed_by'] = {
+                'name': app.reviewer.name,
+                'email': app.reviewer.email
+            }
+        applications_list.append(app_data)
+    return applications_list
+
+
+def measure(function, argument, repeat):
+    function(argument)  # warm up
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function(argument)
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def report(label, seconds, rows, baseline=None):
+    speedup = f"   {baseline / seconds:5.2f}x" if baseline else ''
+    print(f"{label:<22} {seconds * 1000:8.2f} ms   {rows / seconds:12,.0f} rows/s{speedup}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rows', type=int, default=5000,
+                        help='applications serialized per run (default: 5000)')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='runs per path, the median is reported (default: 20)')
+    args = parser.parse_args()
+
+    applications = sample_applications(args.rows)
+    records = hand_written(applications)
+    assert records == ADMIN_APPLICATION_FIELDS.serialize_many(applications)
+
+    flask_app = Flask(__name__)
+    stdlib = DefaultJSONProvider(flask_app)
+
+    print(f"Admin listing serialization, {args.rows} rows, median of {args.repeat} runs")
+    print("=" * 50)
+    baseline = measure(hand_written, applications, args.repeat)
+    report('hand-written dicts', baseline, args.rows)
+    report('field plan', measure(ADMIN_APPLICATION_FIELDS.serialize_many, applications, args.repeat),
+           args.rows, baseline)
+
+    baseline = measure(stdlib.dumps, records, args.repeat)
+    report('json (stdlib)', baseline, args.rows)
+    if orjson is None:
+        print("orjson is not installed, skipping the orjson encoder")
+    else:
+        report('orjson', measure(OrjsonProvider(flask_app).dumps, records, args.repeat), args.rows, baseline)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Load test the development server against the production server
+
+Sets up a throwaway SQLite database with a logged-in student, then serves
+it twice on a local port:
+
+- the development server run.py starts (Werkzeug, one threaded process)
+- gunicorn with gunicorn.conf.py (pre-forked gthread workers)
+
+and for each keeps --concurrency keep-alive clients requesting a mix of
+/health, the student's profile, application status and application list
+for --seconds, printing requests per second, latency percentiles and
+errors.
+
+The clients run on the same machine and take CPU from the server, so the
+numbers are for comparing the two servers, not capacity planning; point
+real load tools at a staging server for that. --workers and --threads
+override the sizing gunicorn.conf.py picks.
+
+Usage: python benchmarks/serving_load.py [--seconds N] [--concurrency N] [--workers N] [--threads N]
+"""
+
+import argparse
+import http.client
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+HOST = '127.0.0.1'
+PORT = 5077
+STUDENT = dict(name='Load Student', email='load@example.com', phone='9876543211', password='load-password',
+               address='Street 1', country='India', state='Karnataka', district='Bengaluru', pincode='560001')
+PATHS = ['/health', '/api/auth/profile', '/api/application/status', '/api/application/list']
+
+SERVERS = {
+    'development server': [sys.executable, '-c',
+                           f"from wsgi import app; app.run(host='{HOST}', port={PORT}, threaded=True)"],
+    'gunicorn': [sys.executable, '-m', 'gunicorn', '-c', 'gunicorn.conf.py', 'wsgi:app'],
+}
+
+
+def prepare():
+    """Create the database and a student with a draft application; returns
+    the student's token"""
+    from app import create_app, init_database
+
+    app = create_app()
+    init_database(app)
+    client = app.test_client()
+    client.post('/api/auth/register', json=STUDENT)
+    token = client.post('/api/auth/login', json={'email': STUDENT['email'],
+                                                 'password': STUDENT['password']}).json['token']
+    client.post('/api/application/save-draft', json={'course_applied': 'Computer Science'},
+                headers={'Authentication-Token': token})
+    return token
+
+
+def wait_until_up(process, timeout=60):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError('server exited during startup')
+        try:
+            connection = http.client.HTTPConnection(HOST, PORT, timeout=1)
+            connection.request('GET', '/health')
+            connection.getresponse().read()
+            return
+        except OSError:
+            time.sleep(0.2)
+    raise RuntimeError('server did not start')
+
+
+def load(token, seconds, concurrency):
+    latencies, errors = [], []
+    lock = threading.Lock()
+    stop = time.monotonic() + seconds
+
+    def client(offset):
+        connection = http.client.HTTPConnection(HOST, PORT, timeout=30)
+        mine, failed = [], 0
+        index = offset
+        while time.monotonic() < stop:
+            path = PATHS[index % len(PATHS)]
+            index += 1
+            start = time.perf_counter()
+            try:
+                connection.request('GET', path, headers={'Authentication-Token': token})
+                response = connection.getresponse()
+                response.read()
+                if response.status != 200:
+                    failed += 1
+            except (OSError, http.client.HTTPException):
+                failed += 1
+                connection.close()
+                connection = http.client.HTTPConnection(HOST, PORT, timeout=30)
+            mine.append(time.perf_counter() - start)
+        with lock:
+            latencies.extend(mine)
+            errors.append(failed)
+
+    threads = [threading.Thread(target=client, args=(index,)) for index in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, sum(errors)
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+def report(label, latencies, errors, seconds):
+    ordered = sorted(latencies)
+    print(f"{label:<20} {len(ordered) / seconds:8.0f} req/s   "
+          f"p50 {percentile(ordered, 0.5) * 1000:6.1f} ms  p95 {percentile(ordered, 0.95) * 1000:6.1f} ms  "
+          f"p99 {percentile(ordered, 0.99) * 1000:6.1f} ms   errors {errors}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seconds', type=float, default=10,
+                        help='load duration per server (default: 10)')
+    parser.add_argument('--concurrency', type=int, default=16,
+                        help='concurrent keep-alive clients (default: 16)')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='gunicorn worker processes (default: from gunicorn.conf.py)')
+    parser.add_argument('--threads', type=int, default=0,
+                        help='threads per gunicorn worker (default: from gunicorn.conf.py)')
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp()
+    env = dict(
+        os.environ,
+        DATABASE_URL=f"sqlite:///{os.path.join(scratch, 'load.db')}",
+        DOCUMENT_STORE_PATH=os.path.join(scratch, 'documents'),
+        OFFER_LETTER_CACHE_PATH=os.path.join(scratch, 'offer_letters'),
+        WEB_BIND=f'{HOST}:{PORT}',
+        WEB_WORKERS=str(args.workers or ''),
+        WEB_THREADS=str(args.threads or ''),
+    )
+    os.environ.update(env)
+    token = prepare()
+
+    from app.config import Config
+    from app.serving import serving_plan
+    workers, threads = serving_plan(os.cpu_count() or 1, Config.DB_POOL_SIZE, Config.DB_MAX_OVERFLOW,
+                                    Config.DB_MAX_CONNECTIONS, args.workers, args.threads)
+
+    print()
+    print(f"Serving load, {args.concurrency} clients for {args.seconds:.0f}s each, {os.cpu_count()} CPU cores, "
+          f"gunicorn with {workers} workers x {threads} threads")
+    print("=" * 50)
+    for label, command in SERVERS.items():
+        process = subprocess.Popen(command, cwd=BACKEND, env=env,
+                                   stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        try:
+            wait_until_up(process)
+            load(token, 1, args.concurrency)  # warm up caches and connections
+            report(label, *load(token, args.seconds, args.concurrency), args.seconds)
+        finally:
+            process.terminate()
+            process.wait()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Pick Argon2 parameters that make one password hash take about the target
+time on this machine
+
+Keeps the memory cost (lowering it only when even one pass is too slow),
+then finds the number of passes closest to the target. Run it on the
+production hardware and set the printed environment variables; existing
+hashes are upgraded as their users log in.
+"""
+
+import argparse
+import os
+import statistics
+import time
+from passlib.hash import argon2
+
+from app.config import Config
+from app.passwords import argon2_parameters
+
+# OWASP's lower bound for Argon2id memory (19 MiB)
+MIN_MEMORY_COST = 19 * 1024
+
+
+def hash_seconds(time_cost, memory_cost, parallelism, samples):
+    handler = argon2.using(rounds=time_cost, memory_cost=memory_cost, parallelism=parallelism)
+    timings = []
+    for _ in range(samples):
+        start = time.perf_counter()
+        handler.hash('calibration password')
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def calibrate(target, memory_cost, parallelism, samples):
+    """Returns (time_cost, memory_cost, seconds) closest to the target"""
+    seconds = hash_seconds(1, memory_cost, parallelism, samples)
+    while seconds > target and memory_cost // 2 >= MIN_MEMORY_COST:
+        memory_cost //= 2
+        seconds = hash_seconds(1, memory_cost, parallelism, samples)
+
+    # Time grows about linearly with the passes; estimate, then step to the closest
+    time_cost = max(1, round(target / seconds))
+    seconds = hash_seconds(time_cost, memory_cost, parallelism, samples)
+    while seconds < target:
+        slower = hash_seconds(time_cost + 1, memory_cost, parallelism, samples)
+        if abs(slower - target) >= abs(seconds - target):
+            break
+        time_cost, seconds = time_cost + 1, slower
+    while time_cost > 1 and seconds > target:
+        faster = hash_seconds(time_cost - 1, memory_cost, parallelism, samples)
+        if abs(faster - target) >= abs(seconds - target):
+            break
+        time_cost, seconds = time_cost - 1, faster
+    return time_cost, memory_cost, seconds
+
+
+def main():
+    rounds, memory, parallelism = argon2_parameters(Config.SECURITY_PASSWORD_HASH_PASSLIB_OPTIONS)
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--target-ms', type=float, default=250,
+                        help='time one hash should take, in milliseconds (default: 250)')
+    parser.add_argument('--memory-cost', type=int, default=memory,
+                        help='memory per hash in KiB (default: ARGON2_MEMORY_COST)')
+    parser.add_argument('--parallelism', type=int, default=parallelism,
+                        help='lanes per hash (default: ARGON2_PARALLELISM)')
+    parser.add_argument('--samples', type=int, default=3,
+                        help='hashes timed per candidate, the median is used (default: 3)')
+    args = parser.parse_args()
+
+    current = hash_seconds(rounds, memory, parallelism, args.samples)
+    print(f"Current: time cost {rounds}, memory {memory} KiB, "
+          f"parallelism {parallelism}: {current * 1000:.0f} ms per hash")
+    print(f"Calibrating for {args.target_ms:.0f} ms...")
+
+    time_cost, memory_cost, seconds = calibrate(args.target_ms / 1000, args.memory_cost, args.parallelism, args.samples)
+    workers = Config.PASSWORD_HASH_WORKERS or max(1, (os.cpu_count() or 1) // 2)
+
+    print("✅ Calibrated!")
+    print(f"   - time cost {time_cost}, memory {memory_cost} KiB, parallelism {args.parallelism}: "
+          f"{seconds * 1000:.0f} ms per hash")
+    print(f"   - about {workers / seconds:.1f} logins/s per process with {workers} hashing workers")
+    if memory_cost < args.memory_cost:
+        print(f"   - memory lowered from {args.memory_cost} KiB to reach the target")
+    if seconds > args.target_ms / 1000 * 1.5:
+        print("   ❌ even the cheapest parameters are slower than the target on this machine")
+    print()
+    print(f"ARGON2_TIME_COST={time_cost}")
+    print(f"ARGON2_MEMORY_COST={memory_cost}")
+    print(f"ARGON2_PARALLELISM={args.parallelism}")
+
+
+if __name__ == "__main__":
+    print("Argon2 Calibration")
+    print("=" * 50)
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Export the applications matching the admin search filters to a CSV or
+NDJSON file, streaming them from the database in constant memory
+"""
+
+import argparse
+import os
+import time
+from app import create_app
+from app.exports import EXPORT_FORMATS, export_query, iter_export, iter_records
+from app.models import db
+from app.search import InvalidFilter, search_filters
+from app.serializers import EXPORT_FIELDS, InvalidFields
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('output', help='file to write, e.g. applications.csv')
+    parser.add_argument('--format', choices=list(EXPORT_FORMATS),
+                        help='export format (default: from the output file extension, else csv)')
+    parser.add_argument('--fields', help=f"comma separated fields (default: all of {', '.join(EXPORT_FIELDS.default)})")
+    parser.add_argument('--status', help='only applications with this status')
+    parser.add_argument('--course', help='course search term')
+    parser.add_argument('--student-name', help='student name search term')
+    parser.add_argument('--start-date', help='created on or after this date (YYYY-MM-DD)')
+    parser.add_argument('--end-date', help='created on or before this date (YYYY-MM-DD)')
+    parser.add_argument('--min-percentage', type=float, help='minimum 12th percentage')
+    parser.add_argument('--max-percentage', type=float, help='maximum 12th percentage')
+    parser.add_argument('--batch-size', type=int, default=0,
+                        help='rows fetched per round trip (default: EXPORT_BATCH_SIZE)')
+    args = parser.parse_args()
+
+    export_format = args.format or os.path.splitext(args.output)[1].lstrip('.').lower()
+    if export_format not in EXPORT_FORMATS:
+        export_format = 'csv'
+
+    app = create_app()
+    with app.app_context():
+        try:
+            fields = EXPORT_FIELDS.parse(args.fields)
+            batch_size = args.batch_size or app.config['EXPORT_BATCH_SIZE']
+            query = export_query(search_filters(vars(args)), fields)
+
+            exported = 0
+
+            def counted(records):
+                nonlocal exported
+                for record in records:
+                    exported += 1
+                    yield record
+
+            print(f"Exporting applications to {args.output} ({export_format})...")
+            start = time.perf_counter()
+            with open(args.output, 'wb') as f:
+                for chunk in iter_export(counted(iter_records(query, fields, batch_size)), fields,
+                                         export_format, batch_size):
+                    f.write(chunk)
+            elapsed = time.perf_counter() - start
+
+            print("✅ Applications exported!")
+            print(f"   - rows: {exported}")
+            print(f"   - size: {os.path.getsize(args.output) / (1024 * 1024):.1f} MB")
+            print(f"   - time: {elapsed:.1f}s ({exported / elapsed:,.0f} rows/s)")
+        except (InvalidFields, InvalidFilter) as e:
+            print(f"❌ {e}")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error exporting applications: {e}")
+
+
+if __name__ == "__main__":
+    print("Application Export")
+    print("=" * 50)
+    main()
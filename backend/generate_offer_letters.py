@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Generate offer letters for approved applications in bulk, either into the
+offer letter store or into a ZIP archive
+"""
+
+import argparse
+import os
+import time
+from app import create_app
+from app.models import db
+from app.offer_letter_batch import (
+    batch_worker_count, iter_offer_letter_zip, offer_letter_snapshot,
+    select_approved_applications, store_offer_letters
+)
+
+
+def parse_ids(value):
+    return [int(application_id) for application_id in value.split(',') if application_id.strip()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--ids', type=parse_ids, default=[],
+                        help='comma separated application ids')
+    parser.add_argument('--course', help='only applications for this course')
+    parser.add_argument('--start-date', help='approved on or after this date (YYYY-MM-DD)')
+    parser.add_argument('--end-date', help='approved on or before this date (YYYY-MM-DD)')
+    parser.add_argument('--zip', metavar='PATH',
+                        help='write the letters to a ZIP archive instead of only the store')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='worker processes (default: OFFER_LETTER_WORKERS, or one per CPU core)')
+    args = parser.parse_args()
+
+    if not (args.ids or args.course or args.start_date or args.end_date):
+        parser.error('provide --ids, --course or a date range')
+
+    app = create_app()
+    with app.app_context():
+        try:
+            snapshots = [
+                offer_letter_snapshot(application)
+                for application in select_approved_applications(
+                    args.ids, args.course, args.start_date, args.end_date
+                )
+            ]
+            if not snapshots:
+                print("No approved applications found")
+                return
+
+            workers = args.workers or batch_worker_count(len(snapshots))
+            print(f"Generating {len(snapshots)} offer letters with {workers} workers...")
+            start = time.perf_counter()
+
+            if args.zip:
+                with open(args.zip, 'wb') as f:
+                    for chunk in iter_offer_letter_zip(snapshots, workers):
+                        f.write(chunk)
+                generated = len(snapshots)
+            else:
+                generated = store_offer_letters(snapshots, workers)
+
+            elapsed = time.perf_counter() - start
+            print("✅ Offer letters generated!")
+            print(f"   - letters: {generated}")
+            print(f"   - time: {elapsed:.1f}s ({generated / elapsed:.1f} letters/s)")
+            if args.zip:
+                print(f"   - archive: {os.path.abspath(args.zip)}")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error generating offer letters: {e}")
+
+
+if __name__ == "__main__":
+    print("Batch Offer Letter Generation")
+    print("=" * 50)
+    main()
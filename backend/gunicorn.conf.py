@@ -0,0 +1,56 @@
+"""
+Gunicorn settings for serving UniAdmit in production:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+Pre-forks WEB_WORKERS processes of WEB_THREADS threads each, sized from
+the CPU cores and the database connection pool unless set. The master
+sets up the database and the default admin once on start, before any
+worker runs; with WEB_PRELOAD the app is also created once in the master
+and each worker then drops the inherited connections, see app/serving.py.
+
+Signals to the master: HUP rereads this file and replaces the workers
+gracefully, letting in-flight requests finish. With WEB_PRELOAD (the
+default) the new workers are forked from the app already loaded in the
+master, so HUP does not pick up new code; to deploy new code send USR2,
+which starts a new master that loads it, then TERM to the old master.
+"""
+
+import os
+from app.config import Config
+from app.serving import after_fork, serving_plan
+
+bind = Config.WEB_BIND
+workers, threads = serving_plan(
+    os.cpu_count() or 1,
+    Config.DB_POOL_SIZE,
+    Config.DB_MAX_OVERFLOW,
+    Config.DB_MAX_CONNECTIONS,
+    Config.WEB_WORKERS,
+    Config.WEB_THREADS
+)
+worker_class = 'gthread'
+preload_app = Config.WEB_PRELOAD
+
+# Logins hash passwords for a few seconds at most; uploads and exports
+# stream, so a worker silent for longer than this is stuck
+timeout = Config.WEB_TIMEOUT
+graceful_timeout = Config.WEB_TIMEOUT
+keepalive = 5
+
+# Replace workers now and then, staggered, to return memory
+max_requests = Config.WEB_MAX_REQUESTS
+max_requests_jitter = Config.WEB_MAX_REQUESTS // 10
+
+accesslog = '-'
+
+
+def post_fork(server, worker):
+    from wsgi import app
+    after_fork(app, workers)
+
+
+def on_starting(server):
+    from app import create_app, init_database
+    init_database(create_app())
+    server.log.info("Serving with %d workers x %d threads", workers, threads)
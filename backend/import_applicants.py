@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Import students, and optionally draft applications, from a CSV file
+
+The header needs name, email, phone, password, address, country, state,
+district and pincode. Rows with a course_applied also get a draft
+application; tenth_percentage, tenth_board, twelfth_percentage,
+twelfth_board, previous_qualification, previous_institution and
+graduation_year are optional.
+"""
+
+import argparse
+import csv
+from concurrent.futures import ProcessPoolExecutor
+from app import create_app
+from app.imports import import_applicants, import_worker_count, missing_columns
+from app.models import db
+
+# Errors printed to the console; --errors writes all of them
+SHOWN_ERRORS = 20
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('path', help='CSV file to import')
+    parser.add_argument('--batch-size', type=int, default=0,
+                        help='rows inserted per transaction (default: IMPORT_BATCH_SIZE)')
+    parser.add_argument('--workers', type=int, default=0,
+                        help='password hashing processes (default: IMPORT_WORKERS, or one per CPU core)')
+    parser.add_argument('--errors', metavar='PATH',
+                        help='write the rows that failed, with the reason, to this CSV file')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        try:
+            with open(args.path, newline='', encoding='utf-8-sig') as f:
+                reader = csv.DictReader(f)
+                missing = missing_columns(reader.fieldnames)
+                if missing:
+                    print(f"❌ Missing columns: {', '.join(missing)}")
+                    return
+
+                workers = args.workers or import_worker_count()
+                print(f"Importing {args.path} with {workers} hashing workers...")
+                # Workers only hash; they never use the database connections
+                # a forked child inherits
+                executor = ProcessPoolExecutor(max_workers=workers) if workers > 1 else None
+                try:
+                    report = import_applicants(
+                        reader, args.batch_size or app.config['IMPORT_BATCH_SIZE'], executor
+                    ).to_dict()
+                finally:
+                    if executor is not None:
+                        executor.shutdown()
+
+            print("✅ Import finished!")
+            print(f"   - rows: {report['total_rows']}")
+            print(f"   - students created: {report['created_users']}")
+            print(f"   - draft applications created: {report['created_applications']}")
+            print(f"   - rows failed: {report['failed_rows']}")
+            print(f"   - time: {report['elapsed_seconds']:.1f}s ({report['rows_per_second']:.1f} rows/s, "
+                  f"{report['hashing_seconds']:.1f}s hashing passwords)")
+
+            for error in report['errors'][:SHOWN_ERRORS]:
+                print(f"   ❌ row {error['row']} ({error['email']}): {error['error']}")
+            if report['failed_rows'] > SHOWN_ERRORS and not args.errors:
+                print(f"   ... {report['failed_rows'] - SHOWN_ERRORS} more, use --errors to save them all")
+
+            if args.errors:
+                with open(args.errors, 'w', newline='', encoding='utf-8') as f:
+                    writer = csv.DictWriter(f, fieldnames=['row', 'email', 'error'])
+                    writer.writeheader()
+                    writer.writerows(report['errors'])
+                print(f"   - error report: {args.errors}")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error importing applicants: {e}")
+
+
+if __name__ == "__main__":
+    print("Applicant Import")
+    print("=" * 50)
+    main()
@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Migration script to move application documents out of the LONGBLOB columns
+and into the content-addressed document store
+"""
+
+import argparse
+from sqlalchemy import inspect, or_, text
+from app import create_app
+from app.models import db, Application
+from app.documents import DOCUMENT_TYPES, detect_mimetype, get_document_store
+
+# Columns that replace the inline blobs
+REFERENCE_COLUMNS = {
+    '{}_ref': 'VARCHAR(64) NULL',
+    '{}_size': 'INTEGER NULL',
+    '{}_mimetype': 'VARCHAR(100) NULL',
+}
+
+# Drafts used to be saved with this placeholder instead of a real document
+DRAFT_PLACEHOLDER = b'draft'
+
+
+def add_reference_columns():
+    """Add the document reference columns to an existing application table"""
+    existing = {column['name'] for column in inspect(db.engine).get_columns('application')}
+    is_mysql = db.engine.dialect.name == 'mysql'
+
+    with db.engine.begin() as connection:
+        for document_type in DOCUMENT_TYPES:
+            for column_pattern, column_type in REFERENCE_COLUMNS.items():
+                column = column_pattern.format(document_type)
+                if column not in existing:
+                    print(f"Adding column {column}...")
+                    connection.execute(text(f"ALTER TABLE application ADD COLUMN {column} {column_type}"))
+
+            if is_mysql:
+                # New rows no longer write the blob columns
+                print(f"Making {document_type} column nullable...")
+                connection.execute(text(f"ALTER TABLE application MODIFY COLUMN {document_type} LONGBLOB NULL"))
+
+
+def migrate_documents(batch_size, dry_run=False):
+    """Move inline documents into the store, one batch of applications at a time"""
+    store = get_document_store()
+    pending_filter = or_(*[
+        getattr(Application, document_type).isnot(None) for document_type in DOCUMENT_TYPES
+    ])
+
+    last_id = 0
+    moved_documents = 0
+    migrated_rows = 0
+
+    while True:
+        # Only the id and blob columns are loaded, never full rows
+        rows = db.session.query(
+            Application.id,
+            *[getattr(Application, document_type) for document_type in DOCUMENT_TYPES]
+        ).filter(
+            Application.id > last_id,
+            pending_filter
+        ).order_by(Application.id).limit(batch_size).all()
+
+        if not rows:
+            break
+
+        mappings = []
+        for row in rows:
+            mapping = {'id': row.id}
+            for document_type in DOCUMENT_TYPES:
+                data = getattr(row, document_type)
+                if data is None:
+                    continue
+                if data and data != DRAFT_PLACEHOLDER:
+                    if not dry_run:
+                        mapping[f'{document_type}_ref'] = store.put(data)
+                    mapping[f'{document_type}_size'] = len(data)
+                    mapping[f'{document_type}_mimetype'] = detect_mimetype(data)
+                    moved_documents += 1
+                mapping[document_type] = None
+            mappings.append(mapping)
+
+        last_id = rows[-1].id
+        migrated_rows += len(rows)
+
+        if dry_run:
+            db.session.rollback()
+        else:
+            db.session.bulk_update_mappings(Application, mappings)
+            db.session.commit()
+        # Drop references to this batch's blobs before loading the next one
+        db.session.expunge_all()
+
+        print(f"Processed {migrated_rows} applications (up to id {last_id}), {moved_documents} documents moved")
+
+    return migrated_rows, moved_documents
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--batch-size', type=int, default=50,
+                        help='applications loaded per batch (default: 50)')
+    parser.add_argument('--dry-run', action='store_true',
+                        help='report what would be moved without writing anything')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        try:
+            if not args.dry_run:
+                add_reference_columns()
+            rows, documents = migrate_documents(args.batch_size, dry_run=args.dry_run)
+            print("✅ Document migration complete!")
+            print(f"   - applications processed: {rows}")
+            print(f"   - documents moved to store: {documents}")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error migrating documents: {e}")
+
+
+if __name__ == "__main__":
+    print("Document Storage Migration")
+    print("=" * 50)
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Database migration script to add the query and FULLTEXT search indexes
+declared on the models to an existing database without blocking reads
+(or, for all but FULLTEXT, writes) while they build
+"""
+
+import argparse
+import mysql.connector
+from mysql.connector import Error
+from app.config import Config
+from app.models import Application, User
+
+TABLES = [User.__table__, Application.__table__]
+
+
+def missing_indexes(cursor):
+    """Indexes declared on the models that the database does not have yet"""
+    cursor.execute("""
+        SELECT DISTINCT table_name, index_name
+        FROM information_schema.statistics
+        WHERE table_schema = %s
+    """, (Config.DB_NAME,))
+    existing = {(table.lower(), index.lower()) for table, index in cursor.fetchall()}
+
+    return [
+        index
+        for table in TABLES
+        for index in sorted(table.indexes, key=lambda index: index.name)
+        if (table.name.lower(), index.name.lower()) not in existing
+    ]
+
+
+def add_index_statement(index):
+    columns = ', '.join(f'`{column.name}`' for column in index.columns)
+    options = index.dialect_options['mysql']
+    if options['prefix'] == 'FULLTEXT':
+        # FULLTEXT indexes build in place but block writes while they do
+        parser = f" WITH PARSER {options['with_parser']}" if options['with_parser'] else ''
+        return (
+            f"ALTER TABLE `{index.table.name}` "
+            f"ADD FULLTEXT INDEX `{index.name}` ({columns}){parser}, ALGORITHM=INPLACE, LOCK=SHARED"
+        )
+    # INPLACE with LOCK=NONE builds the index while the table stays writable;
+    # MySQL refuses the statement instead of silently locking the table
+    return (
+        f"ALTER TABLE `{index.table.name}` "
+        f"ADD INDEX `{index.name}` ({columns}), ALGORITHM=INPLACE, LOCK=NONE"
+    )
+
+
+def add_indexes(dry_run=False):
+    """Create every missing index, one online ALTER TABLE at a time"""
+    connection = None
+    try:
+        # Connect to database
+        connection = mysql.connector.connect(
+            host=Config.DB_HOST,
+            user=Config.DB_USER,
+            password=Config.DB_PASSWORD,
+            database=Config.DB_NAME
+        )
+
+        if connection.is_connected():
+            cursor = connection.cursor()
+
+            print("Connected to MySQL database")
+            indexes = missing_indexes(cursor)
+            if not indexes:
+                print("✅ All indexes already exist")
+                return
+
+            for index in indexes:
+                statement = add_index_statement(index)
+                if dry_run:
+                    print(statement)
+                    continue
+                print(f"Adding {index.name} on {index.table.name}...")
+                cursor.execute(statement)
+
+            if not dry_run:
+                print("✅ Indexes added successfully!")
+                for index in indexes:
+                    print(f"   - {index.table.name}.{index.name} ({', '.join(column.name for column in index.columns)})")
+
+    except Error as e:
+        print(f"❌ Error adding indexes: {e}")
+
+    finally:
+        if connection and connection.is_connected():
+            cursor.close()
+            connection.close()
+            print("Database connection closed")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--dry-run', action='store_true',
+                        help='print the ALTER TABLE statements instead of running them')
+    args = parser.parse_args()
+
+    print("Database Index Migration")
+    print("=" * 50)
+    add_indexes(args.dry_run)
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+Rebuild the admin search index from the application and user tables
+"""
+
+import time
+from app import create_app
+from app.models import db
+from app.search import FulltextSearchIndex, get_search_index
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        index = get_search_index()
+        if isinstance(index, FulltextSearchIndex):
+            print("✅ Nothing to rebuild: MySQL maintains the FULLTEXT indexes")
+            print("   - add them to an existing database with migrate_indexes.py")
+            return
+
+        try:
+            start = time.perf_counter()
+            indexed = index.rebuild()
+            print("✅ Search index rebuilt!")
+            print(f"   - records indexed: {indexed}")
+            print(f"   - time: {time.perf_counter() - start:.1f}s")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error rebuilding search index: {e}")
+
+
+if __name__ == "__main__":
+    print("Search Index Rebuild")
+    print("=" * 50)
+    main()
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Rebuild the dashboard counters tables from the application and user tables
+"""
+
+from app import create_app
+from app.models import db, ApplicationCounter, UserCounter
+from app.counters import rebuild_counters
+
+
+def counter_snapshot():
+    return (
+        {(row.status, row.course_applied, row.month): row.count for row in ApplicationCounter.query if row.count},
+        {(row.role, row.active): row.count for row in UserCounter.query if row.count},
+    )
+
+
+def main():
+    app = create_app()
+    with app.app_context():
+        try:
+            before = counter_snapshot()
+            db.session.rollback()
+            rebuild_counters()
+            after = counter_snapshot()
+
+            drifted = [
+                key for old, new in zip(before, after)
+                for key in set(old) | set(new) if old.get(key) != new.get(key)
+            ]
+            print("✅ Counters rebuilt!")
+            print(f"   - application counters: {len(after[0])}")
+            print(f"   - user counters: {len(after[1])}")
+            print(f"   - counters corrected: {len(drifted)}")
+        except Exception as e:
+            db.session.rollback()
+            print(f"❌ Error rebuilding counters: {e}")
+
+
+if __name__ == "__main__":
+    print("Dashboard Counters Reconciliation")
+    print("=" * 50)
+    main()
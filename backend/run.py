@@ -1,8 +1,12 @@
-from app import create_app
+from app import create_app, init_database
 import os
 
 app = create_app()
 
 if __name__ == '__main__':
-    # Temporarily enable debug to see error details
+    # Create the database, tables and default admin if needed
+    init_database(app)
+
+    # Development server with the debugger; production serves wsgi.py
+    # with gunicorn (see gunicorn.conf.py)
     app.run(debug=True, host='0.0.0.0', port=5000)
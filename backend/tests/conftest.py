@@ -0,0 +1,39 @@
+import os
+import sys
+import tempfile
+
+import pytest
+
+BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND)
+
+# The configuration is read when app.config is imported: point it at a
+# throwaway SQLite database and keep password hashing cheap
+SCRATCH = tempfile.mkdtemp()
+os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(SCRATCH, 'tests.db')}"
+os.environ['DOCUMENT_STORE_PATH'] = os.path.join(SCRATCH, 'documents')
+os.environ['OFFER_LETTER_CACHE_PATH'] = os.path.join(SCRATCH, 'offer_letters')
+os.environ['ARGON2_TIME_COST'] = '1'
+os.environ['ARGON2_MEMORY_COST'] = '1024'
+os.environ['ARGON2_PARALLELISM'] = '1'
+os.environ['RESPONSE_CACHE_TTL'] = '0'
+
+
+@pytest.fixture(scope='session')
+def app():
+    from app import create_app, init_database
+    app = create_app()
+    init_database(app)
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture(scope='session')
+def admin_headers(app):
+    response = app.test_client().post('/api/auth/login', json={'email': app.config['ADMIN_EMAIL'],
+                                                              'password': app.config['ADMIN_PASSWORD']})
+    return {'Authentication-Token': response.json['token']}
@@ -0,0 +1,80 @@
+"""
+The streaming JSON parser gives the same values as the json module however
+the body is split into chunks, and rejects truncated input
+"""
+
+import json
+
+import pytest
+
+from app.json_stream import JSONStreamError, StreamingJSONParser
+
+DOCUMENTS = [
+    r'{"text": "quote \" backslash \\ slash \/ controls \b\f\n\r\t"}',
+    r'{"escaped": "caf\u00e9 \u20ac", "raw": "café €"}',
+    r'["\ud83d\ude00", "x\ud83d\ude00y", "raw 😀"]',
+    r'["lone \ud83d high", "\ud83dA", "\ude00 low"]',
+    '{"nested": [1, -2.5e3, true, false, null, {"empty": [], "object": {}}]}',
+    '  "top level string"  ',
+]
+
+
+def parse(text, chunk_size=None, **kwargs):
+    data = text.encode('utf-8')
+    chunk_size = chunk_size or len(data) or 1
+    chunks = [data[start:start + chunk_size] for start in range(0, len(data), chunk_size)]
+    return StreamingJSONParser(chunks, **kwargs).parse()
+
+
+@pytest.mark.parametrize('text', DOCUMENTS)
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, None])
+def test_values_match_the_json_module(text, chunk_size):
+    assert parse(text, chunk_size) == json.loads(text)
+
+
+def test_surrogate_pair_becomes_one_character():
+    assert parse(r'"\ud83d\ude00"', 1) == '\U0001F600'
+
+
+@pytest.mark.parametrize('text', DOCUMENTS[:5])
+def test_truncated_input_is_rejected(text):
+    for end in range(len(text.rstrip()) - 1, -1, -1):
+        with pytest.raises(JSONStreamError):
+            parse(text[:end], 3)
+
+
+@pytest.mark.parametrize('text', [
+    r'"bad \x escape"',
+    r'"bad \u12G4 escape"',
+    '{"a" 1}',
+    '[1 2]',
+    '{"a": 1} extra',
+    '"unterminated',
+])
+def test_invalid_input_is_rejected(text):
+    with pytest.raises(JSONStreamError):
+        parse(text, 2)
+
+
+def test_streamed_strings_go_to_their_sink_in_pieces():
+    pieces = []
+
+    class Sink:
+        def write(self, text):
+            pieces.append(text)
+
+        def close(self):
+            return 'streamed'
+
+    text = r'{"document": {"data": "abc\ndef"}, "data": "kept"}'
+    value = parse(text, 4, stream_strings={('document', 'data'): Sink})
+
+    assert value == {'document': {'data': 'streamed'}, 'data': 'kept'}
+    assert len(pieces) > 1
+    assert ''.join(pieces) == 'abc\ndef'
+
+
+def test_other_strings_are_capped():
+    assert parse('"12345"', 2, max_string_length=5) == '12345'
+    with pytest.raises(JSONStreamError):
+        parse('"123456"', 2, max_string_length=5)
@@ -0,0 +1,68 @@
+"""
+The offer letter cache evicts by a running total without listing its
+directory, and a cached letter is only served on the day it was issued
+"""
+
+import os
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+
+import pytest
+
+from app import offer_letters
+from app.offer_letters import OfferLetterCache, offer_letter_name
+
+LETTER = b'%PDF' + b'x' * 96
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return OfferLetterCache(str(tmp_path), max_bytes=3 * len(LETTER))
+
+
+def names(cache):
+    return sorted(os.listdir(cache.root))
+
+
+def test_least_recently_used_letters_are_evicted_without_a_rescan(cache, monkeypatch):
+    cache.evict()
+    monkeypatch.setattr(offer_letters.os, 'scandir', lambda path: pytest.fail('cache directory listed'))
+
+    for index in range(3):
+        cache.put(f'offer_letter_{index}.pdf', LETTER)
+    assert cache.get('offer_letter_0.pdf')
+    cache.put('offer_letter_3.pdf', LETTER)
+
+    assert names(cache) == ['offer_letter_0.pdf', 'offer_letter_2.pdf', 'offer_letter_3.pdf']
+
+
+def test_invalidate_removes_only_the_named_letter(cache):
+    cache.put('offer_letter_1_a.pdf', LETTER)
+    cache.put('offer_letter_1_b.pdf', LETTER)
+    cache.invalidate('offer_letter_1_a.pdf')
+
+    assert names(cache) == ['offer_letter_1_b.pdf']
+    assert cache.get('offer_letter_1_a.pdf') is None
+
+
+def test_letters_from_other_processes_are_counted_on_rescan(cache):
+    for index in range(4):
+        with open(os.path.join(cache.root, f'offer_letter_{index}.pdf'), 'wb') as f:
+            f.write(LETTER)
+        os.utime(f.name, (index, index))
+    cache.evict()
+
+    assert names(cache) == ['offer_letter_1.pdf', 'offer_letter_2.pdf', 'offer_letter_3.pdf']
+
+
+def test_letter_name_changes_with_the_issue_day():
+    student = SimpleNamespace(name='Student', email='student@example.com', phone='1234567890')
+    application = SimpleNamespace(
+        id=1, status='approved', reviewed_at=None, course_applied='Computer Science', graduation_year=2024,
+        tenth_percentage=90, tenth_board='CBSE', twelfth_percentage=85, twelfth_board='CBSE',
+        previous_qualification='12th', previous_institution='School', student=student
+    )
+    today = datetime(2024, 6, 1, 9, 30)
+
+    assert offer_letter_name(application, today) == offer_letter_name(application, today.replace(hour=17))
+    assert offer_letter_name(application, today) != offer_letter_name(application, today + timedelta(days=1))
@@ -0,0 +1,33 @@
+"""
+Compiled offer letter paragraphs split across frames like plain ones,
+without changing the layout other letters share
+"""
+
+from reportlab.platypus import Paragraph
+
+from app.offer_letters import OfferLetterTemplate
+
+WIDTH = 300
+
+
+def line_words(paragraph):
+    return [[word.text for word in line.words] for line in paragraph.blPara.lines]
+
+
+def test_compiled_paragraph_splits_into_plain_paragraphs():
+    template = OfferLetterTemplate()
+    contact = template._paragraph(template.paragraphs['contact'])
+    _, height = contact.wrap(WIDTH, 1000)
+    shared = line_words(contact)
+
+    parts = contact.split(WIDTH, height / 2)
+
+    assert len(parts) == 2
+    assert all(type(part) is Paragraph for part in parts)
+    for part in parts:
+        part.wrap(WIDTH, 1000)
+    assert sum(len(part.blPara.lines) for part in parts) == len(shared)
+
+    again = template._paragraph(template.paragraphs['contact'])
+    assert again.wrap(WIDTH, 1000) == (WIDTH, height)
+    assert line_words(again) == shared
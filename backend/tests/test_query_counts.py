@@ -0,0 +1,115 @@
+"""
+The admin listings load related users and roles in a fixed number of
+queries, however many rows a page holds
+"""
+
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from sqlalchemy import event
+
+from app.models import db, Application, User
+
+SMALL, LARGE = 5, 25
+
+
+@contextmanager
+def counting_queries(app):
+    statements = []
+
+    def count(conn, cursor, statement, parameters, context, executemany):
+        statements.append(statement)
+
+    with app.app_context():
+        engine = db.engine
+    event.listen(engine, 'before_cursor_execute', count)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, 'before_cursor_execute', count)
+
+
+def query_count(app, request):
+    with counting_queries(app) as statements:
+        response = request()
+    assert response.status_code == 200, response.get_data(as_text=True)
+    return len(statements)
+
+
+def add_students(app, count, status='pending'):
+    """Add students with one application each; returns the application ids"""
+    with app.app_context():
+        datastore = app.extensions['security'].datastore
+        student_role = datastore.find_or_create_role(name='student')
+        admin = User.query.filter_by(email=app.config['ADMIN_EMAIL']).one()
+        now = datetime.now(timezone.utc)
+        applications = []
+        for _ in range(count):
+            token = uuid.uuid4().hex
+            student = datastore.create_user(
+                name=f'Student {token[:8]}', email=f'{token}@example.com', phone=token[:15], password='unused',
+                fs_uniquifier=token, address='Street 1', country='India', state='Karnataka',
+                district='Bengaluru', pincode='560001', active=True, date_created=now, roles=[student_role]
+            )
+            reviewed = status in ('approved', 'rejected')
+            application = Application(
+                student=student, course_applied='Computer Science', tenth_percentage=90, tenth_board='CBSE',
+                twelfth_percentage=85, twelfth_board='CBSE', previous_qualification='12th',
+                previous_institution='School', graduation_year=2024, address='Street 1', country='India',
+                state='Karnataka', district='Bengaluru', pincode='560001',
+                degree_certificate_filename='degree.pdf', id_proof_filename='id.png', status=status,
+                date_created=now - timedelta(days=1), reviewed_by=admin.id if reviewed else None,
+                reviewed_at=now if reviewed else None
+            )
+            db.session.add(application)
+            applications.append(application)
+        db.session.commit()
+        return [application.id for application in applications]
+
+
+@pytest.fixture(scope='module', autouse=True)
+def students(app):
+    add_students(app, LARGE, 'pending')
+    add_students(app, LARGE, 'approved')
+
+
+@pytest.mark.parametrize('path', [
+    '/api/application/admin/list-all?per_page={}',
+    '/api/application/admin/list-all?per_page={}&cursor=',
+    '/api/application/admin/search?status=pending&per_page={}',
+    '/api/application/admin/search?student_name=Student&per_page={}',
+    '/api/auth/admin/users?per_page={}',
+    '/api/auth/admin/users?role=student&per_page={}',
+])
+def test_page_query_count_does_not_grow_with_page_size(app, client, admin_headers, path):
+    # The first request loads the token's user into the token cache
+    client.get(path.format(SMALL), headers=admin_headers)
+
+    small = query_count(app, lambda: client.get(path.format(SMALL), headers=admin_headers))
+    large = query_count(app, lambda: client.get(path.format(LARGE), headers=admin_headers))
+    assert small == large, f'{small} queries for {SMALL} rows, {large} for {LARGE}'
+
+
+def test_bulk_action_query_count_does_not_grow_with_ids(app, client, admin_headers):
+    small_ids = add_students(app, SMALL)
+    large_ids = add_students(app, LARGE)
+
+    def approve(ids):
+        return lambda: client.post('/api/application/admin/bulk-action', headers=admin_headers,
+                                   json={'application_ids': ids, 'action': 'approve'})
+
+    small = query_count(app, approve(small_ids))
+    large = query_count(app, approve(large_ids))
+    assert small == large
+
+
+def test_dashboard_query_count_does_not_grow_with_applications(app, client, admin_headers):
+    dashboard = lambda: client.get('/api/auth/admin/dashboard', headers=admin_headers)
+    dashboard()
+
+    before = query_count(app, dashboard)
+    add_students(app, LARGE)
+    after = query_count(app, dashboard)
+    assert before == after
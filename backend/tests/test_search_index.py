@@ -0,0 +1,32 @@
+"""
+The trigram search index drops the rows of applications the database
+cascade deletes along with their student
+"""
+
+from sqlalchemy import func, select
+
+from app.models import db, Application, SearchTrigram, User
+from test_query_counts import add_students
+
+
+def trigram_count(source, record_ids):
+    return db.session.scalar(select(func.count()).select_from(SearchTrigram).where(
+        SearchTrigram.source == source, SearchTrigram.record_id.in_(record_ids)
+    ))
+
+
+def test_deleting_a_student_removes_their_applications_from_the_index(app):
+    application_ids = add_students(app, 2)
+    with app.app_context():
+        student_ids = db.session.scalars(
+            select(Application.student_id).where(Application.id.in_(application_ids))
+        ).all()
+        assert trigram_count('application', application_ids) > 0
+
+        # The applications are never loaded: only the database cascade deletes them
+        db.session.delete(db.session.get(User, student_ids[0]))
+        db.session.commit()
+
+        assert trigram_count('user', student_ids[:1]) == 0
+        assert trigram_count('application', application_ids[:1]) == 0
+        assert trigram_count('application', application_ids[1:]) > 0
@@ -0,0 +1,72 @@
+"""
+Login throttling counts attempts atomically, per IP and per email, and
+does not count successful logins against the email or rejected requests
+against anything
+"""
+
+import threading
+
+import pytest
+
+from app.throttling import THROTTLE_BACKENDS
+
+EMAIL_LIMIT, IP_LIMIT = 5, 10
+
+
+@pytest.fixture(params=list(THROTTLE_BACKENDS))
+def throttle(app, request):
+    """A fresh throttle of each backend with small login limits"""
+    configured = app.extensions['throttle']
+    limits = {key: app.config[key] for key in ('LOGIN_LIMIT_PER_EMAIL', 'LOGIN_LIMIT_PER_IP')}
+    app.config.update(LOGIN_LIMIT_PER_EMAIL=EMAIL_LIMIT, LOGIN_LIMIT_PER_IP=IP_LIMIT)
+    with app.app_context():
+        throttle = app.extensions['throttle'] = THROTTLE_BACKENDS[request.param](3600)
+        throttle.clear()
+        yield throttle
+        throttle.clear()
+    app.extensions['throttle'] = configured
+    app.config.update(limits)
+
+
+def login(client, email, password, ip):
+    return client.post('/api/auth/login', json={'email': email, 'password': password},
+                       environ_base={'REMOTE_ADDR': ip}).status_code
+
+
+def test_concurrent_failed_logins_stop_at_the_email_limit(app, throttle):
+    start = threading.Barrier(20)
+    statuses = []
+
+    def attempt(index):
+        client = app.test_client()
+        start.wait()
+        statuses.append(login(client, 'nobody@example.com', 'wrong', f'10.0.0.{index}'))
+
+    threads = [threading.Thread(target=attempt, args=(index,)) for index in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert statuses.count(401) == EMAIL_LIMIT
+    assert statuses.count(429) == 20 - EMAIL_LIMIT
+
+
+def test_failed_logins_from_many_ips_are_throttled_per_email(app, client, throttle):
+    statuses = [login(client, 'nobody@example.com', 'wrong', f'10.0.1.{index}') for index in range(EMAIL_LIMIT + 2)]
+    assert statuses == [401] * EMAIL_LIMIT + [429] * 2
+
+
+def test_successful_logins_do_not_count_against_the_email(app, client, throttle):
+    email, password = app.config['ADMIN_EMAIL'], app.config['ADMIN_PASSWORD']
+    statuses = [login(client, email, password, f'10.0.2.{index}') for index in range(EMAIL_LIMIT * 2)]
+    assert statuses == [200] * EMAIL_LIMIT * 2
+
+
+def test_rejected_logins_are_not_counted(app, client, throttle):
+    statuses = [login(client, 'nobody@example.com', 'wrong', '10.0.3.1') for _ in range(IP_LIMIT * 2)]
+    assert statuses == [401] * EMAIL_LIMIT + [429] * (IP_LIMIT * 2 - EMAIL_LIMIT)
+
+    # The IP only used EMAIL_LIMIT of its attempts; the 429s took none
+    other = [login(client, f'user{index}@example.com', 'wrong', '10.0.3.1') for index in range(IP_LIMIT)]
+    assert other == [401] * (IP_LIMIT - EMAIL_LIMIT) + [429] * EMAIL_LIMIT
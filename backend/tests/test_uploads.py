@@ -0,0 +1,85 @@
+"""
+Document spools reject oversized and unsupported documents as the data
+arrives, and base64 documents decode the same however they are split
+"""
+
+import base64
+import os
+
+import pytest
+
+from app.uploads import Base64DocumentSink, DocumentSpool, UploadError
+
+PDF = b'%PDF-1.4\n' + bytes(range(256)) * 4
+
+
+@pytest.fixture
+def spool(tmp_path):
+    spool = DocumentSpool('id_proof', directory=str(tmp_path), max_size=len(PDF))
+    yield spool
+    spool.discard()
+
+
+def read(spool):
+    with open(spool.path, 'rb') as f:
+        return f.read()
+
+
+def test_document_is_spooled_and_hashed(spool):
+    for start in range(0, len(PDF), 100):
+        spool.write(PDF[start:start + 100])
+    spool.finish()
+
+    assert spool.mimetype == 'application/pdf'
+    assert read(spool) == PDF
+    assert len(spool.ref) == 64
+
+
+def test_oversized_document_is_rejected_on_the_write_that_crosses_the_limit(spool):
+    spool.write(PDF)
+    with pytest.raises(UploadError, match='exceeds'):
+        spool.write(b'x')
+
+
+def test_unsupported_magic_bytes_are_rejected_before_the_rest_arrives(spool):
+    with pytest.raises(UploadError, match='not supported'):
+        spool.write(b'GIF89a' + b'\0' * 10)
+
+
+def test_short_document_is_rejected(spool):
+    spool.write(PDF[:50])
+    with pytest.raises(UploadError, match='too small'):
+        spool.finish()
+
+
+def test_discard_removes_the_spool_file(tmp_path):
+    spool = DocumentSpool('id_proof', directory=str(tmp_path))
+    path = spool.path
+    spool.discard()
+    assert not os.path.exists(path)
+
+
+@pytest.mark.parametrize('prefix', ['', 'data:application/pdf;base64,'])
+@pytest.mark.parametrize('piece', [1, 3, 5, 1000])
+def test_base64_decodes_however_it_is_split(spool, prefix, piece):
+    text = prefix + base64.b64encode(PDF[:-1]).decode()
+    sink = Base64DocumentSink(spool)
+    for start in range(0, len(text), piece):
+        sink.write(text[start:start + piece])
+    sink.close().finish()
+
+    assert read(spool) == PDF[:-1]
+
+
+@pytest.mark.parametrize('text', [
+    base64.b64encode(PDF[:200]).decode()[:-1],             # missing padding
+    '*' + base64.b64encode(PDF[:200]).decode()[1:],        # not base64
+    base64.b64encode(PDF[:200]).decode() + 'QUJD',         # data after padding
+    base64.b64encode(b'GIF89a' + b'\0' * 200).decode(),    # not a PDF, JPEG or PNG
+    base64.b64encode(PDF + b'x').decode(),                 # too large
+])
+def test_malformed_base64_is_rejected(spool, text):
+    sink = Base64DocumentSink(spool)
+    with pytest.raises(UploadError, match='Invalid id_proof file'):
+        sink.write(text)
+        sink.close()
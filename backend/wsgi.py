@@ -0,0 +1,15 @@
+"""
+WSGI entry point for production servers:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+run.py starts the development server instead.
+"""
+
+from werkzeug.middleware.proxy_fix import ProxyFix
+from app import create_app
+
+app = create_app()
+
+if app.config['WEB_PROXY_COUNT']:
+    app.wsgi_app = ProxyFix(app.wsgi_app, x_for=app.config['WEB_PROXY_COUNT'], x_proto=app.config['WEB_PROXY_COUNT'])